@@ -1,13 +1,13 @@
 
 from fastapi import APIRouter
+from keyword_scorer import keyword_scorer
 from resume_data import ResumeData
 
 router = APIRouter()
 
 def check_adaptability(text):
-    adaptability_keywords = ["fast learner", "adapt", "new skills", "multitasking", "cross-functional"]
-    score = sum(text.lower().count(word) for word in adaptability_keywords) * 10
-    return min(score, 100)
+    # Keywords come from scoring_keywords.json; 10 points per occurrence, capped at 100
+    return keyword_scorer.score(text)["adaptability_score"]
 
 @router.post("/check-adaptability")
 async def check_adaptability_api(resume: ResumeData):
@@ -1,18 +1,40 @@
 from fastapi import FastAPI, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
-import pdfplumber
 import os
-import json
+import uuid
+from contextlib import asynccontextmanager, suppress
+from typing import Optional
 import numpy as np
-from sentence_transformers import SentenceTransformer, util
-import spacy
-from tensorflow.keras.models import load_model
-import pickle
-from keras.utils import pad_sequences
 from fastapi.middleware.cors import CORSMiddleware
+from bilstm_inference import predict_probabilities
+from embedding_cache import get_embedding_cache
+from feature_store import get_feature_store
+from jd_registry import DEFAULT_JD_ID, JDRegistry, is_valid_id
+from lexical_ranker import tfidf_engine
+from model_registry import MODEL_WARMUP, bilstm_model_loader, pickle_loader, registry as models, router as health_router
+from pdf_extraction import PDF_AVAILABLE, extract_text_async, extract_texts_async, shutdown_pool, start_pool
+from results_store import get_results_store
+from skill_lexicon import skill_lexicon
+from scoring_engine import (
+    CRITERIA_PROMPTS, TFIDF_SCORER, encode_job, score_resumes, scorer_name, scores_to_records
+)
+from upload_store import RequestBudget, UploadTooLarge, store_upload, stream_upload
+
+# Models load in the background after startup (or on first use)
+@asynccontextmanager
+async def lifespan(app):
+    # The PDF pool forks before any other thread exists in this process
+    if PDF_AVAILABLE:
+        start_pool()
+    if MODEL_WARMUP:
+        models.start_warm_up()
+    yield
+    shutdown_pool()
 
 # Create the FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+app.include_router(health_router)
 
 # Add CORS middleware with more permissive settings
 app.add_middleware(
@@ -23,155 +45,211 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load NLP models
-try:
-    nlp = spacy.load("en_core_web_sm")
-    embed_model = SentenceTransformer("paraphrase-MiniLM-L6-v2")
-
-    # Load trained BiLSTM model & tokenizer
-    model_path = os.path.join("saved_models", "bilstm_model.h5")
-    tokenizer_path = os.path.join("saved_models", "tokenizer.pkl")
-
-    bilstm_model = load_model(model_path)
-    with open(tokenizer_path, "rb") as f:
-        tokenizer = pickle.load(f)
-except Exception as e:
-    print(f"Error loading models: {e}")
-    # Create dummy models for testing if needed
-    nlp = None
-    embed_model = None
-    bilstm_model = None
-    tokenizer = None
-
-# Constants for text preprocessing (same as training)
-max_len = 100  # must match your training max_len
-
-# File paths
-JD_PATH = "job_description.txt"
+# Register trained BiLSTM model & tokenizer (the embedding model is shared)
+models.register("bilstm_model", bilstm_model_loader(os.path.join("saved_models", "bilstm_model.h5")))
+models.register("bilstm_tokenizer", pickle_loader(os.path.join("saved_models", "tokenizer.pkl")))
+
+# File paths (job descriptions and their rankings live in the JD registry)
 RESUME_FOLDER = "resumes"
-RESULT_PATH = "ranked_results.json"
+
+threshold = 0.5108  # Adjust as needed
+FALLBACK_PROBABILITY = 0.55  # Decides the label when the BiLSTM isn't loaded
 
 os.makedirs(RESUME_FOLDER, exist_ok=True)
 
-def extract_text_from_pdf(file_path):
-    try:
-        with pdfplumber.open(file_path) as pdf:
-            texts = [p.extract_text() for p in pdf.pages if p.extract_text()]
-            return "\n".join(texts)
-    except Exception as e:
-        print(f"Error extracting text from PDF: {e}")
-        return ""
+def extract_jd_skills(jd_text):
+    # Canonical taxonomy skills, no spaCy pass needed
+    return skill_lexicon.extract(jd_text)
 
-def calculate_similarity(text1, text2):
-    try:
-        emb1 = embed_model.encode(text1, convert_to_tensor=True)
-        emb2 = embed_model.encode(text2, convert_to_tensor=True)
-        score = util.pytorch_cos_sim(emb1, emb2).item()
-        return round(score * 100, 2)
-    except Exception as e:
-        print(f"Error calculating similarity: {e}")
-        return "vidhhi"  # Return a default value
+# Each JD has its own id, text, embedding, skills and ranking
+def embed_jd(jd_text):
+    embed_model = models.get("sentence_transformer")
+    return encode_job(embed_model, jd_text) if embed_model is not None else None
+
+jd_registry = JDRegistry(embed_fn=embed_jd, skills_fn=extract_jd_skills)
 
 @app.post("/upload-jd")
-async def upload_jd(file: UploadFile = File(...)):
+async def upload_jd(file: UploadFile = File(...), jd_id: str = DEFAULT_JD_ID):
+    if not is_valid_id(jd_id):
+        return JSONResponse(status_code=400, content={"error": f"Invalid job description id: {jd_id}"})
+    # Save the uploaded file temporarily
+    temp_path = os.path.join(jd_registry.directory, f"temp_{uuid.uuid4().hex}.pdf")
     try:
-        # Save the uploaded file temporarily
-        temp_path = f"temp_{file.filename}"
-        with open(temp_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
+        await stream_upload(file, temp_path)
         
         # Extract text from the PDF
-        jd_text = extract_text_from_pdf(temp_path)
+        jd_text = await extract_text_async(temp_path)
         
-        # Save the extracted text
-        with open(JD_PATH, "w", encoding="utf-8") as f:
-            f.write(jd_text)
-            
-        # Clean up the temporary file
-        os.remove(temp_path)
+        # Store the text with its embedding and skills under the JD id (encodes it, off the event loop)
+        jd = await run_in_threadpool(jd_registry.put, jd_text, file.filename, jd_id)
         
-        return {"message": "Job description uploaded successfully."}
+        return {"message": "Job description uploaded successfully.", "jd_id": jd.id}
+    except UploadTooLarge as e:
+        return JSONResponse(status_code=413, content={"error": str(e)})
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": f"Error uploading job description: {str(e)}"})
+    finally:
+        # Clean up the temporary file, whether or not extraction succeeded
+        with suppress(FileNotFoundError):
+            os.remove(temp_path)
+
+def build_record(resume_id, filename, scores, prediction_prob):
+    skill_match = scores["skill_match"]
+    experience_score = scores["experience_score"]
+    soft_skills = scores["soft_skills_score"]
+    adaptability = scores["adaptability_score"]
+
+    final_score = round(
+        (0.4 * skill_match) +
+        (0.3 * experience_score) +
+        (0.2 * soft_skills) +
+        (0.1 * adaptability), 2
+    )
+
+    # Combined logic to decide label
+    label_prob = FALLBACK_PROBABILITY if prediction_prob is None else prediction_prob
+    if final_score < 35 and label_prob < threshold:
+        label = "Not Matched"
+        predicted_class = 0
+    else:
+        label = "Matched"
+        predicted_class = 1
+
+    return {
+        "resume_id": resume_id,
+        "resume_filename": filename,
+        "skill_match": skill_match,
+        "experience_score": experience_score,
+        "soft_skills_score": soft_skills,
+        "adaptability_score": adaptability,
+        "final_ats_score": final_score,
+        "bilstm_predicted_class": predicted_class,
+        "bilstm_prediction_probability": None if prediction_prob is None else round(prediction_prob, 4),
+        "bilstm_label": label
+    }
+
+def score_texts(jd, resume_texts):
+    # Score records and the scorer that produced them (the feature store's provenance)
+    embed_model = models.get("sentence_transformer")
+    if embed_model is not None:
+        try:
+            scores = score_resumes(embed_model, jd.text, resume_texts, queries=jd.queries)
+            return scores_to_records(scores), scorer_name(embed_model)
+        except Exception as e:
+            print(f"Error in batched similarity scoring: {e}")
+    # Fallback: every resume against the JD and all criteria in one sparse product
+    engine = tfidf_engine([jd.text] + list(CRITERIA_PROMPTS.values()))
+    return scores_to_records(np.round(engine.similarities(resume_texts) * 100, 2)), TFIDF_SCORER
+
+def bilstm_version():
+    return models.artifact_version("bilstm_model", "bilstm_tokenizer")
+
+def predict_match_probabilities(resume_texts):
+    # One batched BiLSTM forward pass, and the BiLSTM that made it; None for both without one
+    bilstm_model = models.get("bilstm_model")
+    tokenizer = models.get("bilstm_tokenizer")
+    if tokenizer and bilstm_model:
+        try:
+            return predict_probabilities(bilstm_model, tokenizer, resume_texts), bilstm_version()
+        except Exception as e:
+            print(f"Error in BiLSTM prediction: {e}")
+    # No BiLSTM prediction: stored as NULL; FALLBACK_PROBABILITY decides the label
+    return [None] * len(resume_texts), None
+
+def known_resume_ids(resume_ids):
+    # Stored features count only when the current encoder and BiLSTM produced them;
+    # fallback-scored or outdated rows are processed again
+    store = get_feature_store()
+    scorer = scorer_name(models.get("sentence_transformer"))
+    return store.existing(resume_ids) - set(store.stale(scorer, bilstm_version(), resume_ids))
+
+def score_known_resumes(jd, uploads):
+    # Criterion scores and BiLSTM probability come from the feature store; the
+    # stored texts' embeddings come from the embedding cache
+    if not uploads:
+        return []
+    filenames = {upload.resume_id: upload.filename for upload in uploads}
+    ids, _, texts, features = get_feature_store().load(list(filenames), include_text=True)
+    skill_match, _ = score_texts(jd, texts)
+    results = []
+    for i, resume_id in enumerate(ids):
+        scores = {"skill_match": skill_match[i]["skill_match"]}
+        for column in CRITERIA_PROMPTS:
+            scores[column] = float(features[column][i])
+        prob = features["bilstm_prediction_probability"][i]
+        results.append(build_record(resume_id, filenames[resume_id], scores, None if np.isnan(prob) else float(prob)))
+    return results
 
 @app.post("/upload-resumes")
-async def upload_resumes(files: list[UploadFile] = File(...)):
+async def upload_resumes(files: list[UploadFile] = File(...), jd_id: str = DEFAULT_JD_ID):
     try:
-        if not os.path.exists(JD_PATH):
+        jd = jd_registry.get(jd_id)
+        if jd is None:
             return JSONResponse(status_code=400, content={"error": "Job description not uploaded yet."})
 
-        with open(JD_PATH, "r", encoding="utf-8") as f:
-            jd_text = f.read()
+        # Streamed to disk under their content hash; repeated content is scored once
+        budget = RequestBudget()
+        uploads = {}
+        for file in files:
+            upload = await store_upload(file, RESUME_FOLDER, budget=budget)
+            uploads.setdefault(upload.resume_id, upload)
 
-        threshold = 0.5108  # Adjust as needed
-        results = []
+        # Content seen before keeps its stored features: no extraction, criterion
+        # scoring or BiLSTM pass, only skill_match against this JD
+        feature_store = get_feature_store()
+        known = await run_in_threadpool(known_resume_ids, list(uploads))
+        new = [upload for resume_id, upload in uploads.items() if resume_id not in known]
+        results = await run_in_threadpool(score_known_resumes, jd, [uploads[resume_id] for resume_id in known])
 
-        for file in files:
-            resume_path = os.path.join(RESUME_FOLDER, file.filename)
-            with open(resume_path, "wb") as f:
-                content = await file.read()
-                f.write(content)
-
-            resume_text = extract_text_from_pdf(resume_path)
-
-            # Run ATS Agent Logic
-            skill_match = calculate_similarity(jd_text, resume_text)
-            experience_score = calculate_similarity("Experience in AI and ML", resume_text)
-            soft_skills = calculate_similarity("Strong communication and collaboration", resume_text)
-            adaptability = calculate_similarity("Adaptable to cross-industry roles", resume_text)
-
-            final_score = round(
-                (0.4 * skill_match) +
-                (0.3 * experience_score) +
-                (0.2 * soft_skills) +
-                (0.1 * adaptability), 2
-            )
+        if new:
+            resume_ids = [upload.resume_id for upload in new]
+            filenames = [upload.filename for upload in new]
 
-            # Prepare text input for BiLSTM model using tokenizer and padding
-            if tokenizer and bilstm_model:
-                seq = tokenizer.texts_to_sequences([resume_text])
-                padded_seq = pad_sequences(seq, maxlen=max_len, padding='post')
-                prediction_prob = float(bilstm_model.predict(padded_seq)[0][0])
-                predicted_class = int(prediction_prob > threshold)
-            else:
-                # Fallback if models aren't loaded
-                prediction_prob = 0.55
-                predicted_class = 1
-
-            # Combined logic to decide label
-            if final_score < 35 and prediction_prob < threshold:
-                label = "Not Matched"
-                predicted_class = 0
-            else:
-                label = "Matched"
-                predicted_class = 1
-
-            results.append({
-                "resume_filename": file.filename,
-                "skill_match": skill_match,
-                "experience_score": experience_score,
-                "soft_skills_score": soft_skills,
-                "adaptability_score": adaptability,
-                "final_ats_score": final_score,
-                "bilstm_predicted_class": predicted_class,
-                "bilstm_prediction_probability": round(prediction_prob, 4),
-                "bilstm_label": label
-            })
+            # PDF parsing runs in parallel across the extraction process pool
+            resume_texts = await extract_texts_async([upload.path for upload in new])
+
+            # Run ATS Agent Logic: JD and criterion prompts encoded once, resumes in one batch
+            score_records, scorer = await run_in_threadpool(score_texts, jd, resume_texts)
+
+            # One batched BiLSTM forward pass for the whole request
+            prediction_probs, bilstm = await run_in_threadpool(predict_match_probabilities, resume_texts)
+
+            features = [
+                dict(scores, bilstm_prediction_probability=prob)
+                for scores, prob in zip(score_records, prediction_probs)
+            ]
+            await run_in_threadpool(
+                feature_store.upsert, resume_ids, filenames, resume_texts, features, scorer, bilstm
+            )
+            for resume_id, filename, scores, prediction_prob in zip(resume_ids, filenames, score_records, prediction_probs):
+                results.append(build_record(resume_id, filename, scores, prediction_prob))
 
         # Sort and save results
         results.sort(key=lambda x: x["final_ats_score"], reverse=True)
-        with open(RESULT_PATH, "w", encoding="utf-8") as f:
-            json.dump(results, f, indent=2)
+        await run_in_threadpool(get_results_store().upsert, jd.id, results)
 
         return {"message": "Resumes processed and ranked successfully."}
+    except UploadTooLarge as e:
+        return JSONResponse(status_code=413, content={"error": str(e)})
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": f"Error processing resumes: {str(e)}"})
 
 @app.get("/ranked-results")
-async def get_ranked_results():
+async def get_ranked_results(
+    jd_id: str = DEFAULT_JD_ID,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    label: Optional[str] = None
+):
+    if limit is not None and limit < 1:
+        return JSONResponse(status_code=400, content={"error": "limit must be at least 1."})
     try:
-        if not os.path.exists(RESULT_PATH):
+        jd = jd_registry.get(jd_id)
+        store = get_results_store()
+        filtered = any(value is not None for value in (cursor, min_score, max_score, label))
+        if jd is None or (not filtered and store.count(jd.id) == 0):
             # For testing, return dummy data if no results exist
             dummy_results = [
                 {
@@ -190,17 +268,20 @@ async def get_ranked_results():
             # Uncomment below to return error instead of dummy data
             # return JSONResponse(status_code=404, content={"error": "No ranking results found."})
         
-        with open(RESULT_PATH, "r", encoding="utf-8") as f:
-            results = json.load(f)
-        
-        return results
+        try:
+            results, next_cursor = store.query(jd.id, limit, cursor, min_score, max_score, label)
+        except ValueError as e:
+            return JSONResponse(status_code=400, content={"error": str(e)})
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        return JSONResponse(content=results, headers=headers)
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": f"Error retrieving results: {str(e)}"})
 
 # Add a simple health check endpoint
 @app.get("/")
 async def root():
-    return {"status": "API is running"}
+    cache = get_embedding_cache()
+    return {"status": "API is running", "embedding_cache": cache.stats() if cache is not None else None}
 
 # If you're running this file directly
 if __name__ == "__main__":
@@ -1,10 +1,10 @@
-import spacy
-from sentence_transformers import SentenceTransformer, util
 import autogen
+from model_registry import registry as models
+from nlp_pipeline import extract_noun_tokens
+from scoring_engine import pair_similarity
 
-# Load NLP Models
-nlp = spacy.load("en_core_web_sm")  # Small model for text processing
-bert_model = SentenceTransformer("paraphrase-MiniLM-L6-v2")  # Embedding model for similarity
+# NLP Models: a POS-only spaCy pipeline (nlp_pipeline) and the shared
+# "sentence_transformer" embedding model, both loaded on first use
 
 # Define Agents
 orchestrator = autogen.AssistantAgent(name="Orchestrator")
@@ -17,24 +17,21 @@ ranking_agent = autogen.AssistantAgent(name="FinalRankingAgent")
 
 # Extract Skills from Text
 def extract_skills(text):
-    doc = nlp(text)
-    skills = [token.text for token in doc if token.pos_ in ["NOUN", "PROPN"]]
-    return set(skills)
+    return set(extract_noun_tokens([text])[0])
+
+def extract_skills_many(texts):
+    # One batched nlp.pipe call for every text not already cached
+    return [set(tokens) for tokens in extract_noun_tokens(texts)]
 
 # Calculate Similarity Score
 def calculate_similarity(job_desc, resume_text):
-    job_embedding = bert_model.encode(job_desc, convert_to_tensor=True)
-    resume_embedding = bert_model.encode(resume_text, convert_to_tensor=True)
-    similarity = util.pytorch_cos_sim(job_embedding, resume_embedding).item()
-    return round(similarity * 100, 2)  # Convert to percentage
+    # Embeddings come from the shared on-disk cache when this text was seen before
+    return pair_similarity(models.get("sentence_transformer"), job_desc, resume_text)  # Percentage
 
 # Process Resume
 def process_resume(job_description, resume_text):
-    print("🔹 Extracting Job Requirements...")
-    job_skills = extract_skills(job_description)
-
-    print("🔹 Extracting Resume Skills...")
-    resume_skills = extract_skills(resume_text)
+    print("🔹 Extracting Job Requirements and Resume Skills...")
+    job_skills, resume_skills = extract_skills_many([job_description, resume_text])
 
     print(f"🔹 Job Skills: {job_skills}")
     print(f"🔹 Resume Skills: {resume_skills}")
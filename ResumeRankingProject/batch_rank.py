@@ -0,0 +1,355 @@
+"""Rank a whole resume archive against one JD, outside the API process.
+
+Usage:
+    python batch_rank.py --jd job_description.txt --resumes archive/ --out rankings.jsonl
+    python batch_rank.py --jd-id 3f2a9c1b7d4e --resumes manifest.txt --out rankings.parquet --workers 8
+
+--resumes is a directory (searched recursively for .pdf/.txt) or a manifest
+with one path per line (relative paths are taken from the manifest's
+directory). Chunks of --chunk-size files are extracted and scored on a
+pool of --workers processes with the API's own scoring functions
+(score_resume_texts, predict_match_probabilities, build_result), and each
+finished chunk is appended to the output right away: JSON lines for .jsonl,
+a directory of part-NNNNNN.parquet files for .parquet (needs pyarrow).
+Records are in completion order; sort on final_ats_score downstream.
+
+The output doubles as the checkpoint: rerunning the same command skips
+every resume already written, so an interrupted run resumes where it
+stopped. A <out>.run.json sidecar pins the JD; resuming with a different
+JD is refused unless --restart, which starts the output over. Nothing is
+written to the feature store, resume index or results store.
+
+Per-stage throughput (text extraction, embedding scores, BiLSTM, output)
+is printed as chunks complete and again at the end.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+RESUME_EXTENSIONS = (".pdf", ".txt")
+STAGES = ["extract", "score", "bilstm", "write"]
+REPORT_EVERY_SECONDS = 10.0
+RUN_FILE_SUFFIX = ".run.json"
+# BLAS/OpenMP/onnxruntime pools sized per worker, so N workers do not each
+# start one thread per core
+THREAD_ENV_VARS = ["OMP_NUM_THREADS", "MKL_NUM_THREADS", "TF_NUM_INTRAOP_THREADS", "ONNX_NUM_THREADS"]
+
+
+# === Inputs ===
+def list_resumes(source):
+    """(resume_id, path) for every resume in a directory or manifest, in a stable order."""
+    if os.path.isdir(source):
+        found = []
+        for directory, _, names in os.walk(source):
+            for name in names:
+                if name.lower().endswith(RESUME_EXTENSIONS):
+                    path = os.path.join(directory, name)
+                    found.append((os.path.relpath(path, source), path))
+        return sorted(found)
+
+    base = os.path.dirname(os.path.abspath(source))
+    found = []
+    with open(source, "r", encoding="utf-8") as f:
+        for line in f:
+            entry = line.strip()
+            if entry and not entry.startswith("#"):
+                found.append((entry, entry if os.path.isabs(entry) else os.path.join(base, entry)))
+    return list(dict.fromkeys(found))
+
+
+def read_jd_text(path):
+    if path.lower().endswith(".pdf"):
+        from pdf_extraction import extract_text_from_pdf
+        return extract_text_from_pdf(path)
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def load_jd(jd_path=None, jd_id=None):
+    # A registry JD keeps its id (and stored embeddings); a file becomes a one-off JD
+    from jd_registry import JobDescription
+    from main import get_jd
+
+    if jd_id is not None:
+        jd = get_jd(jd_id)
+        if jd is None:
+            raise SystemExit(f"Job description {jd_id} not found")
+        return jd
+    return JobDescription("batch", None, read_jd_text(jd_path), {"filename": os.path.basename(jd_path)})
+
+
+# === Workers ===
+_worker_jd = None
+
+
+def _init_worker(jd):
+    # Models that were not preloaded before the fork (TensorFlow, TFLite)
+    # load here, so their load time stays out of the stage timings
+    global _worker_jd
+    from main import get_embed_model, models
+
+    _worker_jd = jd
+    get_embed_model()
+    models.get("bilstm_model")
+    models.get("bilstm_tokenizer")
+
+
+def read_resume(path):
+    if path.lower().endswith(".pdf"):
+        # Already in a pool process: extract here, with the same page and time caps
+        from pdf_extraction import MAX_PAGES, MAX_SECONDS, _extract_in_worker
+        return _extract_in_worker(path, MAX_PAGES, MAX_SECONDS)
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def rank_chunk(chunk):
+    """Score one chunk of (resume_id, path); returns the records and seconds per stage."""
+    from main import build_result, predict_match_probabilities, score_resume_texts
+
+    timings = {}
+    start = time.perf_counter()
+    texts = [read_resume(path) for _, path in chunk]
+    timings["extract"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    score_records, _ = score_resume_texts(_worker_jd, texts)
+    timings["score"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    prediction_probs = predict_match_probabilities(texts)
+    timings["bilstm"] = time.perf_counter() - start
+
+    records = []
+    for (resume_id, path), scores, prob in zip(chunk, score_records, prediction_probs):
+        record = build_result(os.path.basename(path), scores, prob)
+        records.append(dict(record, resume_id=resume_id, resume_path=path))
+    return records, timings
+
+
+# === Output ===
+class JsonlOutput:
+    """Append-only JSON lines; every line is flushed to disk before the next chunk."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def completed(self):
+        done = set()
+        if not os.path.exists(self.path):
+            return done
+        with open(self.path, "rb+") as f:
+            valid = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn last line of an interrupted run
+                done.add(json.loads(line)["resume_id"])
+                valid += len(line)
+            f.truncate(valid)
+        return done
+
+    def write(self, records):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class ParquetOutput:
+    """A directory of Parquet parts, one per chunk, each renamed into place whole."""
+
+    def __init__(self, path):
+        import pyarrow as pa
+
+        self.path = path
+        self.schema = pa.schema([
+            ("resume_id", pa.string()),
+            ("resume_path", pa.string()),
+            ("resume_filename", pa.string()),
+            ("skill_match", pa.float64()),
+            ("experience_score", pa.float64()),
+            ("soft_skills_score", pa.float64()),
+            ("adaptability_score", pa.float64()),
+            ("final_ats_score", pa.float64()),
+            ("bilstm_predicted_class", pa.int64()),
+            ("bilstm_prediction_probability", pa.float64()),
+            ("bilstm_label", pa.string()),
+        ])
+        self._next_part = 0
+
+    def _parts(self):
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(name for name in os.listdir(self.path) if name.startswith("part-") and name.endswith(".parquet"))
+
+    def completed(self):
+        import pyarrow.parquet as pq
+
+        done = set()
+        parts = self._parts()
+        for name in parts:
+            done.update(pq.read_table(os.path.join(self.path, name), columns=["resume_id"]).column(0).to_pylist())
+        self._next_part = int(parts[-1][5:-8]) + 1 if parts else 0
+        return done
+
+    def write(self, records):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        os.makedirs(self.path, exist_ok=True)
+        part = os.path.join(self.path, f"part-{self._next_part:06d}.parquet")
+        pq.write_table(pa.Table.from_pylist(records, schema=self.schema), part + ".tmp")
+        os.replace(part + ".tmp", part)
+        self._next_part += 1
+
+    def remove(self):
+        if os.path.isdir(self.path):
+            shutil.rmtree(self.path)
+
+
+def open_output(path):
+    if path.lower().endswith(".parquet"):
+        try:
+            return ParquetOutput(path)
+        except ImportError:
+            raise SystemExit("Parquet output needs pyarrow (pip install pyarrow); use a .jsonl path instead")
+    return JsonlOutput(path)
+
+
+def check_run(path, jd, restart=False):
+    # Pins the output to its JD, so a resumed run never mixes two rankings
+    run_path = path + RUN_FILE_SUFFIX
+    run = {"jd_id": jd.id, "jd_sha256": hashlib.sha256(jd.text.encode("utf-8")).hexdigest()}
+    if os.path.exists(run_path) and not restart:
+        with open(run_path, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        if previous.get("jd_sha256") != run["jd_sha256"]:
+            raise SystemExit(f"{path} was ranked against a different JD; pass --restart to start it over")
+        return
+    with open(run_path, "w", encoding="utf-8") as f:
+        json.dump(dict(run, started_at=time.time()), f)
+
+
+# === Reporting ===
+class StageTimer:
+    """Files and seconds per stage; worker stages are summed over all workers."""
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.seconds = dict.fromkeys(STAGES, 0.0)
+        self.files = 0
+        self.chunks = 0
+        self.start = time.perf_counter()
+
+    def add(self, files, timings):
+        self.files += files
+        self.chunks += 1
+        for stage, seconds in timings.items():
+            self.seconds[stage] += seconds
+
+    def report(self, total):
+        elapsed = time.perf_counter() - self.start
+        stages = ", ".join(
+            f"{stage} {self.files / seconds:.1f}/s" for stage, seconds in self.seconds.items() if seconds > 0
+        )
+        print(f"[{self.files}/{total}] {self.files / elapsed:.1f} resumes/s on {self.workers} workers "
+              f"({elapsed:.0f}s); per worker: {stages}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    jd_source = parser.add_mutually_exclusive_group(required=True)
+    jd_source.add_argument("--jd", help="job description .txt/.pdf file")
+    jd_source.add_argument("--jd-id", help="id of a JD in the registry")
+    parser.add_argument("--resumes", required=True, help="directory of .pdf/.txt resumes, or a manifest of paths")
+    parser.add_argument("--out", required=True, help="results .jsonl file or .parquet directory")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=64, help="resumes per scoring batch")
+    parser.add_argument("--threads-per-worker", type=int, default=0, help="0 = cores / workers")
+    parser.add_argument("--restart", action="store_true", help="discard existing output and rank everything")
+    args = parser.parse_args()
+
+    threads = args.threads_per_worker or max(1, (os.cpu_count() or 1) // args.workers)
+    for name in THREAD_ENV_VARS:
+        os.environ.setdefault(name, str(threads))
+    os.environ["MODEL_WARMUP"] = "0"
+
+    from embedding_cache import EmbeddingCache
+    from model_registry import registry
+    from pdf_extraction import START_METHOD
+
+    resumes = list_resumes(args.resumes)
+    jd = load_jd(args.jd, args.jd_id)
+    output = open_output(args.out)
+    check_run(args.out, jd, args.restart)
+    if args.restart:
+        output.remove()
+    done = output.completed()
+    pending = [entry for entry in resumes if entry[0] not in done]
+    print(f"{len(resumes)} resumes, {len(resumes) - len(pending)} already ranked, {len(pending)} to go")
+    if not pending:
+        return
+
+    # Like gunicorn's preload: fork-safe models load once here and are
+    # shared copy-on-write; workers load the rest in _init_worker
+    method = START_METHOD if START_METHOD in multiprocessing.get_all_start_methods() else "spawn"
+    try:
+        # Create the shared embedding cache up front: workers opening a new
+        # SQLite file at the same moment race on its schema and WAL switch
+        EmbeddingCache().close()
+    except Exception as e:
+        print(f"Embedding cache disabled: {e}")
+    if method == "fork":
+        registry.preload()
+
+    chunks = [pending[i:i + args.chunk_size] for i in range(0, len(pending), args.chunk_size)]
+    timer = StageTimer(args.workers)
+    failed = 0
+    last_report = time.perf_counter()
+    pool = ProcessPoolExecutor(
+        max_workers=args.workers, mp_context=multiprocessing.get_context(method),
+        initializer=_init_worker, initargs=(jd,)
+    )
+    try:
+        futures = {pool.submit(rank_chunk, chunk): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            chunk = futures[future]
+            try:
+                records, timings = future.result()
+            except Exception as e:
+                # Left unwritten, so the next run retries these files
+                print(f"Error ranking chunk starting at {chunk[0][1]}: {e}")
+                failed += len(chunk)
+                continue
+            start = time.perf_counter()
+            output.write(records)
+            timings["write"] = time.perf_counter() - start
+            timer.add(len(records), timings)
+            if time.perf_counter() - last_report >= REPORT_EVERY_SECONDS:
+                timer.report(len(pending))
+                last_report = time.perf_counter()
+    except KeyboardInterrupt:
+        pool.shutdown(wait=False, cancel_futures=True)
+        timer.report(len(pending))
+        raise SystemExit("Interrupted; rerun the same command to resume")
+    pool.shutdown()
+
+    timer.report(len(pending))
+    if failed:
+        print(f"{failed} resumes failed and were not written; rerun to retry them")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Compare a Keras BiLSTM with its TFLite exports: accuracy, latency and memory.
+
+Usage:
+    python bench_bilstm_backends.py saved_models/bilstm_model.h5 saved_models/tokenizer.pkl [--layout match]
+    python bench_bilstm_backends.py models/domain_model.h5 encoders/tokenizer.pkl --layout classifier \\
+        --dataset resume_dataset.json
+
+Every quantization is converted in memory and run on the same padded
+inputs as Keras. Reported per backend: the largest absolute difference
+in output probabilities, label agreement with Keras (threshold for a
+single sigmoid unit, argmax otherwise), single-row p50/p95 latency,
+batched throughput, and the RSS of a fresh process after importing the
+runtime and loading the model. Needs TensorFlow for the Keras baseline
+and for conversion.
+"""
+import argparse
+import json
+import os
+import pickle
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from bilstm_inference import (
+    CLASSIFIER_MAX_LEN,
+    CLASSIFIER_PADDING,
+    MATCH_MAX_LEN,
+    MATCH_PADDING,
+    PREDICT_BATCH_SIZE,
+    pad_texts,
+)
+from tflite_backend import QUANTIZATIONS, TFLiteModel, convert, save_tflite_model
+
+LAYOUTS = {
+    "match": (MATCH_MAX_LEN, MATCH_PADDING),
+    "classifier": (CLASSIFIER_MAX_LEN, CLASSIFIER_PADDING),
+}
+MATCH_THRESHOLD = 0.5108  # main.py threshold for "Matched"
+
+# Run in a fresh interpreter so each backend's RSS includes its own imports only
+MEMORY_PROBE = """
+import sys, time
+import numpy as np
+from model_registry import current_rss
+start = time.perf_counter()
+if sys.argv[1] == "keras":
+    from tensorflow.keras.models import load_model
+    model = load_model(sys.argv[2])
+else:
+    from tflite_backend import TFLiteModel
+    model = TFLiteModel(model_path=sys.argv[2])
+model.predict(np.zeros((1, int(sys.argv[3])), dtype=np.int32), batch_size=1, verbose=0)
+print(current_rss(), time.perf_counter() - start)
+"""
+
+
+def load_texts(dataset, samples):
+    if dataset:
+        with open(dataset, "r", encoding="utf-8") as f:
+            texts = [item["text"] if isinstance(item, dict) else item for item in json.load(f)]
+    else:
+        words = ["python", "java", "sql", "team", "lead", "cloud", "aws", "data", "project", "manager",
+                 "design", "testing", "agile", "react", "docker", "analysis", "sales", "finance"]
+        texts = [" ".join(random.choices(words, k=random.randint(20, 400))) for _ in range(samples)]
+    random.shuffle(texts)
+    return texts[:samples]
+
+
+def heads(outputs):
+    return outputs if isinstance(outputs, list) else [outputs]
+
+
+def labels(head):
+    if head.shape[-1] == 1:
+        return head[:, 0] >= MATCH_THRESHOLD
+    return np.argmax(head, axis=1)
+
+
+def latency(model, padded, calls):
+    timings = []
+    for i in range(calls):
+        row = padded[i % len(padded):i % len(padded) + 1]
+        start = time.perf_counter()
+        model.predict(row, batch_size=1, verbose=0)
+        timings.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    model.predict(padded, batch_size=PREDICT_BATCH_SIZE, verbose=0)
+    throughput = len(padded) / (time.perf_counter() - start)
+    return np.percentile(timings, 50) * 1000, np.percentile(timings, 95) * 1000, throughput
+
+
+def memory(backend, path, max_len):
+    here = os.path.dirname(os.path.abspath(__file__))
+    output = subprocess.run(
+        [sys.executable, "-c", MEMORY_PROBE, backend, path, str(max_len)],
+        capture_output=True, text=True, cwd=here, env=dict(os.environ, PYTHONPATH=here), check=True,
+    ).stdout.split()
+    return int(output[-2]) / 1e6, float(output[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("model", help="Keras .h5 model")
+    parser.add_argument("tokenizer", help="pickled Keras tokenizer the model was trained with")
+    parser.add_argument("--layout", choices=LAYOUTS, default="match")
+    parser.add_argument("--dataset", help="JSON list of texts or {'text': ...} records (default: synthetic)")
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--calls", type=int, default=200, help="single-row calls per latency measurement")
+    parser.add_argument("--quantize", nargs="+", choices=QUANTIZATIONS, default=list(QUANTIZATIONS))
+    args = parser.parse_args()
+
+    from tensorflow.keras.models import load_model
+
+    random.seed(0)
+    max_len, padding = LAYOUTS[args.layout]
+    with open(args.tokenizer, "rb") as f:
+        tokenizer = pickle.load(f)
+    padded = pad_texts(tokenizer, load_texts(args.dataset, args.samples), max_len, padding)
+    keras_model = load_model(args.model)
+    expected = heads(keras_model.predict(padded, batch_size=PREDICT_BATCH_SIZE, verbose=0))
+
+    p50, p95, throughput = latency(keras_model, padded, args.calls)
+    rss, load_s = memory("keras", args.model, max_len)
+    print(f"{'backend':<16}{'size MB':>9}{'max |diff|':>12}{'agree':>8}{'p50 ms':>9}{'p95 ms':>9}"
+          f"{'rows/s':>10}{'RSS MB':>9}{'load s':>8}")
+    print(f"{'keras':<16}{os.path.getsize(args.model) / 1e6:>9.1f}{0:>12.2e}{1:>8.1%}{p50:>9.2f}{p95:>9.2f}"
+          f"{throughput:>10.0f}{rss:>9.0f}{load_s:>8.2f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for quantization in args.quantize:
+            content = convert(keras_model, quantization)
+            path = os.path.join(tmp, f"{quantization}.tflite")
+            save_tflite_model(path, content, keras_model.output_names)
+            model = TFLiteModel(model_path=path)
+            actual = heads(model.predict(padded, batch_size=PREDICT_BATCH_SIZE))
+            diff = max(float(np.max(np.abs(a - e))) for a, e in zip(actual, expected))
+            agree = min(float(np.mean(labels(a) == labels(e))) for a, e in zip(actual, expected))
+            p50, p95, throughput = latency(model, padded, args.calls)
+            rss, load_s = memory("tflite", path, max_len)
+            print(f"{'tflite-' + quantization:<16}{len(content) / 1e6:>9.1f}{diff:>12.2e}{agree:>8.1%}"
+                  f"{p50:>9.2f}{p95:>9.2f}{throughput:>10.0f}{rss:>9.0f}{load_s:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
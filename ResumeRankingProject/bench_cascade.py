@@ -0,0 +1,118 @@
+"""Measure the throughput gain and recall loss of cascade ranking.
+
+Usage:
+    python bench_cascade.py --jd job_description.txt --resumes resumes/ [--k 10 50 100]
+    python bench_cascade.py [--pool 2000]    # synthetic pool
+
+Ranks the pool twice: the full pipeline (embeddings for every resume, plus
+the BiLSTM when its model is available) and the cascade (BM25 pre-filter,
+then the full pipeline on the selected candidates only). Reports both
+rates and recall@k, the share of the full ranking's top k that the cascade
+also puts in its top k. Texts are read up front so PDF parsing, which both
+modes pay for, is not part of the timings. The embedding cache is not used.
+"""
+import argparse
+import os
+import random
+import time
+
+import numpy as np
+
+from bilstm_inference import predict_probabilities
+from lexical_ranker import lexical_scores, select_candidates
+from main import build_result
+from model_registry import registry as models
+from pdf_extraction import extract_texts
+from scoring_engine import CRITERIA_PROMPTS, _encode_batch, score_embeddings, scores_to_records
+
+TOPICS = {
+    "ml": "python machine learning pytorch tensorflow model training data pipelines aws sagemaker",
+    "web": "javascript react node frontend css html typescript rest api web",
+    "ops": "kubernetes docker terraform ci cd monitoring linux aws cloud infrastructure",
+    "sales": "sales pipeline crm quota negotiation clients revenue territory accounts",
+    "nursing": "patient care nursing clinical hospital medication charting triage",
+    "finance": "accounting ledger audit tax reconciliation excel reporting budgets",
+}
+FILLER = "responsible for team projects deadlines stakeholders communication delivered improved managed".split()
+
+
+def synthetic_pool(size):
+    jd = "Machine learning engineer: Python, PyTorch, data pipelines and model training on AWS."
+    texts = []
+    for _ in range(size):
+        # Most applicants are off-topic; a few are relevant
+        topic = "ml" if random.random() < 0.08 else random.choice(list(TOPICS))
+        words = TOPICS[topic].split() * 6 + FILLER * 4 + random.choice(list(TOPICS.values())).split()
+        texts.append(" ".join(random.sample(words, k=min(len(words), 90))))
+    return jd, [f"resume_{i}.txt" for i in range(size)], texts
+
+
+def read_pool(jd_path, directory):
+    with open(jd_path, "r", encoding="utf-8") as f:
+        jd = f.read()
+    filenames = sorted(name for name in os.listdir(directory) if name.lower().endswith((".pdf", ".txt")))
+    paths = [os.path.join(directory, name) for name in filenames]
+    texts = [""] * len(paths)
+    pdfs = [i for i, path in enumerate(paths) if path.lower().endswith(".pdf")]
+    for i, text in zip(pdfs, extract_texts([paths[i] for i in pdfs])):
+        texts[i] = text
+    pdf_positions = set(pdfs)
+    for i, path in enumerate(paths):
+        if i not in pdf_positions:
+            with open(path, "r", encoding="utf-8") as f:
+                texts[i] = f.read()
+    return jd, filenames, texts
+
+
+def full_pipeline(embed_model, jd, filenames, texts):
+    queries = _encode_batch(embed_model, [jd] + list(CRITERIA_PROMPTS.values()))
+    records = scores_to_records(score_embeddings(queries, _encode_batch(embed_model, texts)))
+    bilstm_model, tokenizer = models.get("bilstm_model"), models.get("bilstm_tokenizer")
+    if bilstm_model is not None and tokenizer is not None:
+        probabilities = predict_probabilities(bilstm_model, tokenizer, texts)
+    else:
+        probabilities = [None] * len(texts)
+    return [build_result(name, scores, p) for name, scores, p in zip(filenames, records, probabilities)]
+
+
+def top_k(results, k):
+    ranked = sorted(results, key=lambda r: r["final_ats_score"], reverse=True)
+    return [r["resume_filename"] for r in ranked[:k]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jd", help="job description text file")
+    parser.add_argument("--resumes", help="directory of .pdf/.txt resumes")
+    parser.add_argument("--pool", type=int, default=2000, help="synthetic pool size")
+    parser.add_argument("--k", type=int, nargs="+", default=[10, 50, 100])
+    args = parser.parse_args()
+
+    random.seed(0)
+    jd, filenames, texts = read_pool(args.jd, args.resumes) if args.jd and args.resumes else synthetic_pool(args.pool)
+    embed_model = models.get("sentence_transformer")
+    if embed_model is None:
+        raise SystemExit("Sentence encoder not available")
+    full_pipeline(embed_model, jd, filenames[:8], texts[:8])  # load models and warm up
+
+    start = time.perf_counter()
+    full = full_pipeline(embed_model, jd, filenames, texts)
+    full_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    lexical = lexical_scores(jd, texts)
+    keep = np.flatnonzero(select_candidates(lexical))
+    cascade = full_pipeline(embed_model, jd, [filenames[i] for i in keep], [texts[i] for i in keep])
+    cascade_seconds = time.perf_counter() - start
+
+    print(f"pool {len(texts)}: full {len(texts) / full_seconds:.0f} resumes/s, "
+          f"cascade {len(texts) / cascade_seconds:.0f} resumes/s ({full_seconds / cascade_seconds:.1f}x), "
+          f"{len(keep)} fully scored")
+    for k in args.k:
+        expected = set(top_k(full, k))
+        if expected:
+            print(f"recall@{k}: {len(expected & set(top_k(cascade, k))) / len(expected):.3f}")
+
+
+if __name__ == "__main__":
+    main()
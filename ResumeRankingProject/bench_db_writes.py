@@ -0,0 +1,92 @@
+"""Compare per-document MongoDB writes with the bulk upserts used by db.py.
+
+Usage:
+    python bench_db_writes.py [--docs 2000] [--uri mongodb://localhost:27017/]
+
+Defaults to an in-memory mongomock client (--uri mongomock://), which
+measures client-side overhead only; point --uri at a real mongod to see
+the round-trip savings of bulk_write.
+"""
+import argparse
+import random
+import time
+
+from pymongo import UpdateOne
+
+import db
+
+BENCH_DB_NAME = "resume_ranking_bench"
+
+
+def make_records(count):
+    return [
+        {
+            "resume_filename": f"resume_{i}.pdf",
+            "skill_match": round(random.uniform(0, 100), 2),
+            "experience_score": round(random.uniform(0, 100), 2),
+            "soft_skills_score": round(random.uniform(0, 100), 2),
+            "adaptability_score": round(random.uniform(0, 100), 2),
+            "final_ats_score": round(random.uniform(0, 100), 2),
+            "bilstm_predicted_class": random.randint(0, 1),
+            "bilstm_prediction_probability": round(random.random(), 4),
+            "bilstm_label": random.choice(["Matched", "Not Matched"]),
+        }
+        for i in range(count)
+    ]
+
+
+def write_one_by_one(collection, job_id, records):
+    for record in records:
+        resume_id = record["resume_filename"]
+        collection.update_one(
+            {"_id": f"{job_id}:{resume_id}"},
+            {"$set": dict(record, job_id=job_id, resume_id=resume_id)},
+            upsert=True,
+        )
+
+
+def write_bulk(collection, job_id, records):
+    operations = [
+        UpdateOne(
+            {"_id": f"{job_id}:{record['resume_filename']}"},
+            {"$set": dict(record, job_id=job_id, resume_id=record["resume_filename"])},
+            upsert=True,
+        )
+        for record in records
+    ]
+    db.bulk_upsert(collection, operations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--uri", default="mongomock://")
+    args = parser.parse_args()
+
+    if args.uri.startswith("mongomock://"):
+        from tests.mongomock_compat import patch_bulk_sort
+        patch_bulk_sort()
+    client = db.create_client(args.uri)
+    database = client[BENCH_DB_NAME]
+    client.drop_database(BENCH_DB_NAME)
+    db.ensure_indexes(database)
+    collection = database[db.SCORES_COLLECTION]
+    records = make_records(args.docs)
+
+    timings = {}
+    for name, write in (("per-document update_one", write_one_by_one), ("bulk_write (unordered)", write_bulk)):
+        collection.delete_many({})
+        start = time.perf_counter()
+        write(collection, "bench", records)
+        timings[name] = time.perf_counter() - start
+        assert collection.count_documents({"job_id": "bench"}) == args.docs
+
+    client.drop_database(BENCH_DB_NAME)
+    for name, seconds in timings.items():
+        print(f"{name:26s} {seconds * 1000:10.1f} ms  {args.docs / seconds:12.0f} docs/s")
+    baseline, bulk = timings.values()
+    print(f"speedup: {baseline / bulk:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Check the exported MiniLM encoder against PyTorch and compare their throughput.
+
+Usage:
+    python bench_encoder.py [--model-dir saved_models/minilm_onnx] [--texts 512] [--tolerance 1.0]
+
+Parity: JD, criterion prompts and resumes are encoded by both backends and
+scored the way scoring_engine does (cosine similarity in percent). The
+check fails when any score differs by more than --tolerance points; the
+float32 and int8 graphs are checked separately. Throughput: texts/s of
+each backend for batch sizes 1 to 256, on the same texts.
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from onnx_encoder import ONNX_MODEL_DIR, OnnxSentenceEncoder
+from scoring_engine import CRITERIA_PROMPTS, EMBED_MODEL_NAME
+
+BATCH_SIZES = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+WORDS = [
+    "python", "machine", "learning", "engineer", "led", "team", "of", "five", "built", "data", "pipelines",
+    "aws", "docker", "kubernetes", "stakeholder", "communication", "agile", "sql", "dashboards", "reduced",
+    "latency", "by", "40%", "years", "experience", "in", "retail", "healthcare", "finance", "mentored",
+]
+
+
+def make_texts(count):
+    # Lengths from a short summary line to past the 128-token limit
+    return [" ".join(random.choices(WORDS, k=random.choice([8, 24, 60, 120, 250]))) for _ in range(count)]
+
+
+def encode(model, texts, batch_size=64):
+    return np.asarray(model.encode(
+        texts, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True, show_progress_bar=False
+    ), dtype=np.float32)
+
+
+def scores(model, jd_text, resume_texts):
+    queries = encode(model, [jd_text] + list(CRITERIA_PROMPTS.values()))
+    return encode(model, resume_texts) @ queries.T * 100
+
+
+def throughput(model, texts, batch_size, min_seconds=2.0):
+    encode(model, texts[:batch_size], batch_size)  # warm-up at this shape
+    done = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_seconds:
+        encode(model, texts, batch_size)
+        done += len(texts)
+    return done / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-dir", default=ONNX_MODEL_DIR)
+    parser.add_argument("--texts", type=int, default=512)
+    parser.add_argument("--tolerance", type=float, default=1.0, help="max score difference in percentage points")
+    parser.add_argument("--threads", type=int, default=0, help="onnxruntime intra-op threads (0 = default)")
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+
+    random.seed(0)
+    texts = make_texts(args.texts)
+    jd_text = " ".join(random.choices(WORDS, k=80))
+    backends = {"torch": SentenceTransformer(EMBED_MODEL_NAME, device="cpu")}
+    for quantized in (False, True):
+        encoder = OnnxSentenceEncoder(args.model_dir, quantized=quantized, num_threads=args.threads)
+        if encoder.quantized == quantized:
+            backends[encoder.cache_name.split(":", 1)[1]] = encoder
+
+    failed = False
+    expected = scores(backends["torch"], jd_text, texts)
+    for name, model in backends.items():
+        if name == "torch":
+            continue
+        diff = np.abs(scores(model, jd_text, texts) - expected)
+        ok = diff.max() <= args.tolerance
+        failed |= not ok
+        print(f"parity {name:<10} max |score diff| {diff.max():.3f} pts, mean {diff.mean():.3f} pts "
+              f"(tolerance {args.tolerance}) {'OK' if ok else 'FAILED'}")
+
+    print(f"\n{'batch':>6}" + "".join(f"{name + ' texts/s':>18}" for name in backends))
+    for batch_size in BATCH_SIZES:
+        rates = [throughput(model, texts, batch_size) for model in backends.values()]
+        print(f"{batch_size:>6}" + "".join(f"{rate:>18.1f}" for rate in rates))
+
+    if failed:
+        raise SystemExit("Exported encoder is outside the score tolerance")
+
+
+if __name__ == "__main__":
+    main()
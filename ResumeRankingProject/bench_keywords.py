@@ -0,0 +1,65 @@
+"""Compare per-keyword str.count with the single-scan regex of KeywordScorer.
+
+Usage:
+    python bench_keywords.py [--texts 500] [--words 600] [--sizes 16,32,64,128,256,512]
+
+For each keyword-set size (the shipped scoring_keywords.json lists padded
+with synthetic words), both strategies are checked for identical counts
+on every text, then timed over the same texts. The crossover decides
+keyword_scorer.REGEX_MIN_KEYWORDS.
+"""
+import argparse
+import random
+import string
+import time
+
+from keyword_scorer import KeywordScorer, load_keyword_config
+
+FILLER = (
+    "led a team of engineers and worked at a fast growing startup with strong communication "
+    "skills years of experience in python senior developer cross-functional projects adapt"
+).split()
+
+
+def make_keywords(size):
+    keywords = sorted({kw for kws in load_keyword_config().values() for kw in kws})
+    random.seed(size)
+    while len(keywords) < size:
+        word = "".join(random.choices(string.ascii_lowercase, k=random.randint(4, 10)))
+        if word not in keywords:
+            keywords.append(word)
+    return keywords[:size]
+
+
+def make_texts(count, words, keywords):
+    vocabulary = FILLER + keywords
+    return [" ".join(random.choices(vocabulary, k=words)) for _ in range(count)]
+
+
+def timed(scorer, texts):
+    start = time.perf_counter()
+    for text in texts:
+        scorer.counts(text)
+    return len(texts) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=500)
+    parser.add_argument("--words", type=int, default=600, help="words per resume")
+    parser.add_argument("--sizes", default="16,32,64,128,256,512", help="keyword-set sizes to compare")
+    args = parser.parse_args()
+
+    print(f"{'keywords':>9}{'str.count/s':>14}{'regex/s':>10}{'regex speedup':>15}")
+    for size in (int(size) for size in args.sizes.split(",")):
+        keywords = make_keywords(size)
+        texts = make_texts(args.texts, args.words, keywords)
+        per_keyword = KeywordScorer({"all": keywords}, regex_min_keywords=size + 1)
+        single_scan = KeywordScorer({"all": keywords}, regex_min_keywords=0)
+        assert all(per_keyword.counts(text) == single_scan.counts(text) for text in texts)
+        count_rate, regex_rate = timed(per_keyword, texts), timed(single_scan, texts)
+        print(f"{size:>9}{count_rate:>14.0f}{regex_rate:>10.0f}{regex_rate / count_rate:>14.2f}x")
+
+
+if __name__ == "__main__":
+    main()
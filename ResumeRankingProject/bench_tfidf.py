@@ -0,0 +1,86 @@
+"""Measure the TF-IDF fallback engine against an exact (unhashed) TF-IDF.
+
+Usage:
+    python bench_tfidf.py [--resumes 10000] [--words 400] [--batch 2000]
+
+Parity: scores from the hashed engine are compared with a dictionary-based
+TF-IDF using the same tokenizer, weighting, stop words and query-fitted
+IDF; hash collisions are the only source of difference. Each resume must
+also score the same alone as inside a batch. Throughput: resumes/s of
+TfidfEngine.similarities for the JD and the criterion prompts, in batches
+of --batch resumes, on one core.
+"""
+import argparse
+import math
+import random
+import time
+from collections import Counter
+
+import numpy as np
+
+from lexical_ranker import STOP_WORDS, TfidfEngine, tokenize
+from scoring_engine import CRITERIA_PROMPTS
+
+WORDS = (
+    "python machine learning engineer led team of five built data pipelines aws docker kubernetes "
+    "stakeholder communication agile sql dashboards reduced latency years experience in retail "
+    "healthcare finance mentored c++ c# react node java terraform sales nursing audit tax excel"
+).split()
+
+
+def make_texts(count, words):
+    vocabulary = WORDS + [f"term{i}" for i in range(5000)]
+    return [" ".join(random.choices(vocabulary, k=random.randint(words // 2, words * 3 // 2))) for _ in range(count)]
+
+
+def exact_similarities(queries, texts):
+    # IDF from the queries' document frequencies, like TfidfEngine
+    df = Counter(term for query in queries for term in set(tokenize(query)))
+    n = len(queries)
+
+    def vector(text):
+        weights = {
+            term: (1 + math.log(tf)) * (math.log((1 + n) / (1 + df[term])) + 1)
+            for term, tf in Counter(tokenize(text)).items() if term not in STOP_WORDS
+        }
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {term: w / norm for term, w in weights.items()}
+
+    query_vectors = [vector(q) for q in queries]
+    result = np.zeros((len(texts), len(queries)))
+    for row, text in enumerate(texts):
+        v = vector(text)
+        for col, q in enumerate(query_vectors):
+            result[row, col] = sum(w * q.get(term, 0.0) for term, w in v.items())
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=10000)
+    parser.add_argument("--words", type=int, default=400, help="average words per resume")
+    parser.add_argument("--batch", type=int, default=2000, help="resumes per similarities() call")
+    args = parser.parse_args()
+
+    random.seed(0)
+    jd = " ".join(random.choices(WORDS, k=120))
+    queries = [jd] + list(CRITERIA_PROMPTS.values())
+    texts = make_texts(args.resumes, args.words)
+    engine = TfidfEngine(queries)
+
+    sample = texts[:200]
+    diff = np.abs(engine.similarities(sample) - exact_similarities(queries, sample)) * 100
+    print(f"parity vs exact TF-IDF: max |score diff| {diff.max():.3f} pts, mean {diff.mean():.4f} pts")
+    alone = np.abs(np.vstack([engine.similarities([text]) for text in sample[:20]]) - engine.similarities(sample)[:20])
+    print(f"batch independence: max |score diff| alone vs in batch {alone.max() * 100:.3f} pts")
+
+    engine.similarities(texts[:args.batch])  # warm-up
+    start = time.perf_counter()
+    for i in range(0, len(texts), args.batch):
+        engine.similarities(texts[i:i + args.batch])
+    seconds = time.perf_counter() - start
+    print(f"{len(texts)} resumes of ~{args.words} words: {len(texts) / seconds:.0f} resumes/s")
+
+
+if __name__ == "__main__":
+    main()
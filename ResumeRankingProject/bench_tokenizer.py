@@ -0,0 +1,149 @@
+"""Compare Keras texts_to_sequences + pad_sequences with FastTokenizer.encode.
+
+Usage:
+    python bench_tokenizer.py [--texts 2000] [--words 400] [--tokenizer saved_models/tokenizer.pkl]
+
+Checks that both produce identical arrays for the match (post-padded) and
+classifier (pre-padded) layouts before timing them. Without --tokenizer a
+tokenizer is fitted on synthetic resumes. When TensorFlow is not installed
+the baseline is a line-for-line Python port of the Keras tokenizer.
+"""
+import argparse
+import pickle
+import random
+import string
+import time
+from collections import Counter
+
+import numpy as np
+
+from bilstm_inference import CLASSIFIER_MAX_LEN, CLASSIFIER_PADDING, MATCH_MAX_LEN, MATCH_PADDING
+from fast_tokenizer import KERAS_FILTERS, FastTokenizer
+
+LAYOUTS = {
+    "match": (MATCH_MAX_LEN, MATCH_PADDING),
+    "classifier": (CLASSIFIER_MAX_LEN, CLASSIFIER_PADDING),
+}
+
+
+class PortedTokenizer:
+    """The parts of keras Tokenizer used at inference, ported verbatim."""
+
+    def __init__(self, num_words=None, oov_token=None, filters=KERAS_FILTERS, lower=True, split=" "):
+        self.num_words = num_words
+        self.oov_token = oov_token
+        self.filters = filters
+        self.lower = lower
+        self.split = split
+        self.char_level = False
+        self.word_index = {}
+
+    def _words(self, text):
+        if self.lower:
+            text = text.lower()
+        text = text.translate(str.maketrans({c: self.split for c in self.filters}))
+        return [w for w in text.split(self.split) if w]
+
+    def fit_on_texts(self, texts):
+        counts = Counter(w for text in texts for w in self._words(text))
+        words = ([self.oov_token] if self.oov_token is not None else []) + [
+            w for w, _ in sorted(counts.items(), key=lambda item: item[1], reverse=True)
+        ]
+        self.word_index = {w: i for i, w in enumerate(words, start=1)}
+
+    def texts_to_sequences(self, texts):
+        oov_index = self.word_index.get(self.oov_token)
+        sequences = []
+        for text in texts:
+            vect = []
+            for w in self._words(text):
+                i = self.word_index.get(w)
+                if i is not None:
+                    if self.num_words and i >= self.num_words:
+                        if oov_index is not None:
+                            vect.append(oov_index)
+                    else:
+                        vect.append(i)
+                elif self.oov_token is not None:
+                    vect.append(oov_index)
+            sequences.append(vect)
+        return sequences
+
+
+def ported_pad_sequences(sequences, maxlen, padding="pre", truncating="pre"):
+    out = np.zeros((len(sequences), maxlen), dtype=np.int32)
+    for i, s in enumerate(sequences):
+        if not s:
+            continue
+        trunc = s[-maxlen:] if truncating == "pre" else s[:maxlen]
+        if padding == "post":
+            out[i, :len(trunc)] = trunc
+        else:
+            out[i, -len(trunc):] = trunc
+    return out
+
+
+def keras_backend():
+    try:
+        from tensorflow.keras.preprocessing.sequence import pad_sequences
+        from tensorflow.keras.preprocessing.text import Tokenizer
+        return Tokenizer, pad_sequences, "keras"
+    except ImportError:
+        return PortedTokenizer, ported_pad_sequences, "python port of keras"
+
+
+def make_texts(count, words):
+    vocab = ["".join(random.choices(string.ascii_lowercase, k=random.randint(2, 10))) for _ in range(20000)]
+    vocab += ["Python", "C++", "node.js", "e-mail", "R&D", "machine_learning", "(AWS)", "résumé"]
+    punctuation = [" ", " ", " ", ", ", ". ", "\n", " - ", "/", "\t"]
+    return [
+        "".join(random.choice(vocab) + random.choice(punctuation) for _ in range(random.randint(1, words)))
+        for _ in range(count)
+    ] + ["", "   ", "!!!"]
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=400, help="maximum words per text")
+    parser.add_argument("--tokenizer", help="pickled Keras tokenizer (default: fit one on the synthetic texts)")
+    args = parser.parse_args()
+
+    random.seed(0)
+    texts = make_texts(args.texts, args.words)
+    tokenizer_cls, pad_sequences, backend = keras_backend()
+    if args.tokenizer:
+        with open(args.tokenizer, "rb") as f:
+            tokenizer = pickle.load(f)
+    else:
+        tokenizer = tokenizer_cls(num_words=10000, oov_token="<OOV>")
+        tokenizer.fit_on_texts(texts[: len(texts) // 2])
+
+    start = time.perf_counter()
+    fast = FastTokenizer.from_keras(tokenizer)
+    print(f"Compiled {len(fast.vocab)} words in {(time.perf_counter() - start) * 1000:.1f} ms; baseline: {backend}")
+
+    for name, (max_len, padding) in LAYOUTS.items():
+        baseline_s, expected = timed(lambda: pad_sequences(tokenizer.texts_to_sequences(texts), maxlen=max_len, padding=padding))
+        fast_s, actual = timed(lambda: fast.encode(texts, max_len, padding))
+        identical = actual.dtype == np.int32 and np.array_equal(np.asarray(expected), actual)
+        print(
+            f"{name:<10} max_len={max_len:<4} padding={padding:<4} "
+            f"baseline {len(texts) / baseline_s:>9.0f} texts/s | fast {len(texts) / fast_s:>9.0f} texts/s | "
+            f"speedup {baseline_s / fast_s:.1f}x | identical={identical}"
+        )
+        if not identical:
+            raise SystemExit(f"FastTokenizer output differs from {backend} for the {name} layout")
+
+
+if __name__ == "__main__":
+    main()
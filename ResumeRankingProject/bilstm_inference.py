@@ -0,0 +1,75 @@
+import numpy as np
+
+from fast_tokenizer import get_fast_tokenizer
+
+# Rows per forward pass; padded inputs have a fixed length, so batching
+# changes only how many rows share a call, never a row's own input.
+PREDICT_BATCH_SIZE = 64
+
+# Input layout each model family was trained with
+MATCH_MAX_LEN = 100  # resume/JD match BiLSTM
+MATCH_PADDING = "post"
+CLASSIFIER_MAX_LEN = 200  # domain / experience classifiers (train_classification_models.py)
+CLASSIFIER_PADDING = "pre"
+
+
+def pad_texts(tokenizer, texts, max_len, padding="pre", truncating="pre"):
+    """int32 array of padded token ids, identical to Keras texts_to_sequences + pad_sequences."""
+    texts = list(texts)
+    fast = get_fast_tokenizer(tokenizer)
+    if fast is not None:
+        return fast.encode(texts, max_len, padding, truncating)
+
+    from tensorflow.keras.preprocessing.sequence import pad_sequences
+
+    sequences = tokenizer.texts_to_sequences(texts)
+    return pad_sequences(sequences, maxlen=max_len, padding=padding, truncating=truncating)
+
+
+def predict_batch(model, tokenizer, texts, max_len, padding, batch_size=PREDICT_BATCH_SIZE):
+    """Tokenize and pad all texts into one array and run a single batched predict.
+
+    Row i of the result is the model output for texts[i].
+    """
+    texts = list(texts)
+    if not texts:
+        return np.zeros((0,) + tuple(model.output_shape[1:]), dtype=np.float32)
+    padded = pad_texts(tokenizer, texts, max_len, padding)
+    return np.asarray(model.predict(padded, batch_size=batch_size, verbose=0))
+
+
+def predict_probabilities(model, tokenizer, texts, max_len=MATCH_MAX_LEN, padding=MATCH_PADDING, batch_size=PREDICT_BATCH_SIZE):
+    # Single sigmoid unit models (the resume/JD match BiLSTM)
+    return [float(row[0]) for row in predict_batch(model, tokenizer, texts, max_len, padding, batch_size)]
+
+
+def predict_heads(model, tokenizer, texts, max_len, padding, batch_size=PREDICT_BATCH_SIZE):
+    """Like predict_batch for a model with several outputs: one array per output head."""
+    texts = list(texts)
+    shapes = model.output_shape if isinstance(model.output_shape, list) else [model.output_shape]
+    if not texts:
+        return [np.zeros((0,) + tuple(shape[1:]), dtype=np.float32) for shape in shapes]
+    outputs = model.predict(pad_texts(tokenizer, texts, max_len, padding), batch_size=batch_size, verbose=0)
+    if not isinstance(outputs, (list, tuple)):
+        outputs = [outputs]
+    return [np.asarray(output) for output in outputs]
+
+
+def decode_labels(encoder, predictions):
+    if len(predictions) == 0:
+        return []
+    return list(encoder.inverse_transform(np.argmax(predictions, axis=1)))
+
+
+def predict_labels(model, tokenizer, encoder, texts, max_len=CLASSIFIER_MAX_LEN, padding=CLASSIFIER_PADDING, batch_size=PREDICT_BATCH_SIZE):
+    # Softmax classifiers with a fitted LabelEncoder (domain / experience level)
+    return decode_labels(encoder, predict_batch(model, tokenizer, texts, max_len, padding, batch_size))
+
+
+def predict_multi_labels(model, tokenizer, encoders, texts, max_len=CLASSIFIER_MAX_LEN, padding=CLASSIFIER_PADDING, batch_size=PREDICT_BATCH_SIZE):
+    """Labels from every softmax head of a multi-task classifier in one forward pass.
+
+    encoders[k] decodes output head k; returns one label list per head.
+    """
+    heads = predict_heads(model, tokenizer, texts, max_len, padding, batch_size)
+    return [decode_labels(encoder, predictions) for encoder, predictions in zip(encoders, heads)]
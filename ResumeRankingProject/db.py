@@ -1,13 +1,163 @@
-from pymongo import MongoClient
+import asyncio
+import hashlib
+import os
+import threading
+import time
 
-# Local MongoDB default URI (works with Compass too)
-client = MongoClient("mongodb://localhost:27017/")
-client = MongoClient("mongodb://localhost:27017/")
+try:
+    from pymongo import ASCENDING, DESCENDING, MongoClient, UpdateOne
+    PYMONGO_AVAILABLE = True
+except ImportError:
+    PYMONGO_AVAILABLE = False
+    print("pymongo not available - MongoDB persistence disabled")
 
+# === Configuration ===
+# Local MongoDB default URI (works with Compass too); "mongomock://" runs
+# against an in-memory mongomock client for tests and benchmarks.
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
+MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "resume_ranking_db")
+MONGO_ENABLED = os.getenv("MONGO_ENABLED", "0") == "1"  # mirror rankings into MongoDB from the API
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "2000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "2000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "10000"))
+MONGO_WRITE_BATCH_SIZE = int(os.getenv("MONGO_WRITE_BATCH_SIZE", "1000"))  # operations per bulk_write
 
-# Create/use the main database
-db = client["resume_ranking_db"]
+JOBS_COLLECTION = "jobs"
+RESUMES_COLLECTION = "resumes"
+SCORES_COLLECTION = "scores"
 
-# Collections
-job_collection = db["jobs"]
-resume_collection = db["resumes"]
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def create_client(uri=None):
+    uri = uri or MONGO_URI
+    if uri.startswith("mongomock://"):
+        # With pymongo >= 4.11 bulk writes also need tests.mongomock_compat.patch_bulk_sort()
+        import mongomock
+        return mongomock.MongoClient()
+    return MongoClient(
+        uri,
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+        socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+    )
+
+
+def ensure_indexes(database):
+    # Idempotent: create_index is a no-op when the index already exists
+    database[JOBS_COLLECTION].create_index([("job_id", ASCENDING)], unique=True)
+    database[RESUMES_COLLECTION].create_index([("content_hash", ASCENDING)])
+    database[SCORES_COLLECTION].create_index([("job_id", ASCENDING), ("final_ats_score", DESCENDING)])
+    database[SCORES_COLLECTION].create_index([("resume_id", ASCENDING)])
+
+
+def get_client():
+    """The process-wide pooled client, created on first use.
+
+    MongoClient is not fork-safe, so a worker process forked after the
+    parent connected gets its own client instead of the inherited one.
+    """
+    global _client, _client_pid
+    if not PYMONGO_AVAILABLE:
+        raise RuntimeError("pymongo is not installed")
+    if _client is None or _client_pid != os.getpid():
+        with _client_lock:
+            if _client is None or _client_pid != os.getpid():
+                client = create_client()
+                ensure_indexes(client[MONGO_DB_NAME])
+                _client, _client_pid = client, os.getpid()
+    return _client
+
+
+def get_db():
+    return get_client()[MONGO_DB_NAME]
+
+
+def bulk_upsert(collection, operations):
+    """Run UpdateOne operations as unordered bulk writes of MONGO_WRITE_BATCH_SIZE."""
+    upserted = modified = 0
+    for start in range(0, len(operations), MONGO_WRITE_BATCH_SIZE):
+        result = collection.bulk_write(operations[start:start + MONGO_WRITE_BATCH_SIZE], ordered=False)
+        upserted += result.upserted_count
+        modified += result.modified_count
+    return {"upserted": upserted, "modified": modified}
+
+
+# === Writes ===
+def save_job(job_id, text, meta=None, database=None):
+    database = database if database is not None else get_db()
+    document = dict(meta or {}, job_id=job_id, text=text, content_hash=content_hash(text), updated_at=time.time())
+    database[JOBS_COLLECTION].update_one({"job_id": job_id}, {"$set": document}, upsert=True)
+
+
+def save_resumes(resume_ids, filenames, texts, features=None, database=None):
+    """Upsert one document per resume, keyed by resume id, with its text hash and features."""
+    database = database if database is not None else get_db()
+    now = time.time()
+    features = features or [{} for _ in resume_ids]
+    operations = [
+        UpdateOne(
+            {"_id": resume_id},
+            {"$set": dict(record, resume_filename=filename, content_hash=content_hash(text), text=text, updated_at=now)},
+            upsert=True,
+        )
+        for resume_id, filename, text, record in zip(resume_ids, filenames, texts, features)
+    ]
+    return bulk_upsert(database[RESUMES_COLLECTION], operations)
+
+
+def save_scores(job_id, records, database=None):
+    """Upsert one score document per (job, resume) from ranking result records."""
+    database = database if database is not None else get_db()
+    now = time.time()
+    operations = []
+    for record in records:
+        resume_id = record.get("resume_id", record["resume_filename"])
+        document = dict(record, job_id=job_id, resume_id=resume_id, updated_at=now)
+        operations.append(UpdateOne({"_id": f"{job_id}:{resume_id}"}, {"$set": document}, upsert=True))
+    return bulk_upsert(database[SCORES_COLLECTION], operations)
+
+
+# === Reads ===
+def top_scores(job_id, limit=10, database=None):
+    database = database if database is not None else get_db()
+    cursor = (
+        database[SCORES_COLLECTION]
+        .find({"job_id": job_id}, {"_id": 0})
+        .sort("final_ats_score", DESCENDING)
+        .limit(limit)
+    )
+    return list(cursor)
+
+
+def find_resumes_by_hash(hashes, database=None):
+    database = database if database is not None else get_db()
+    return list(database[RESUMES_COLLECTION].find({"content_hash": {"$in": list(hashes)}}))
+
+
+# === Async access ===
+# pymongo is blocking; these run it in a worker thread so the event loop stays free.
+async def save_job_async(job_id, text, meta=None):
+    return await asyncio.to_thread(save_job, job_id, text, meta)
+
+
+async def save_resumes_async(resume_ids, filenames, texts, features=None):
+    return await asyncio.to_thread(save_resumes, resume_ids, filenames, texts, features)
+
+
+async def save_scores_async(job_id, records):
+    return await asyncio.to_thread(save_scores, job_id, records)
+
+
+async def top_scores_async(job_id, limit=10):
+    return await asyncio.to_thread(top_scores, job_id, limit)
@@ -0,0 +1,200 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+# === Configuration ===
+CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join("cache", "embeddings.sqlite3"))
+MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "100000"))
+# Cache hits update last_used in batches: once this many keys or seconds have accumulated
+TOUCH_FLUSH_ENTRIES = int(os.getenv("EMBEDDING_CACHE_TOUCH_FLUSH_ENTRIES", "1000"))
+TOUCH_FLUSH_SECONDS = float(os.getenv("EMBEDDING_CACHE_TOUCH_FLUSH_SECONDS", "30"))
+# The entry count is tracked in memory and re-read from SQLite at most this often,
+# to pick up rows other workers added
+RECOUNT_SECONDS = float(os.getenv("EMBEDDING_CACHE_RECOUNT_SECONDS", "60"))
+
+
+def content_key(model_name, text):
+    # Content-addressed: the same text under the same model always maps to one entry
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    """On-disk, size-bounded LRU cache of text embeddings.
+
+    Entries are float32 vectors stored in SQLite, keyed by a hash of the
+    model name and the text, so they survive restarts and are shared by
+    every worker pointing at the same file. Recency updates from hits are
+    buffered and written in one transaction, so reads stay read-only;
+    eviction order is therefore approximate by up to TOUCH_FLUSH_SECONDS.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._touched = {}  # key -> last hit time, not yet written
+        self._touched_since = time.monotonic()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " dim INTEGER NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+        self._conn.commit()
+        self._recount()
+
+    def get_many(self, model_name, texts):
+        """Return a list aligned with texts holding cached vectors or None."""
+        keys = [content_key(model_name, text) for text in texts]
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            unique_keys = list(dict.fromkeys(keys))
+            for start in range(0, len(unique_keys), 500):
+                chunk = unique_keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, dim, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, dim, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32, count=dim)
+            if found:
+                now = time.time()
+                self._touched.update((key, now) for key in found)
+                if (len(self._touched) >= TOUCH_FLUSH_ENTRIES
+                        or time.monotonic() - self._touched_since >= TOUCH_FLUSH_SECONDS):
+                    self._flush_touches()
+                    self._conn.commit()
+            results = [found.get(key) for key in keys]
+            hit_count = sum(vector is not None for vector in results)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+        return results
+
+    def put_many(self, model_name, texts, embeddings):
+        now = time.time()
+        rows = []
+        for text, vector in zip(texts, embeddings):
+            vector = np.ascontiguousarray(vector, dtype=np.float32)
+            rows.append((content_key(model_name, text), vector.shape[0], vector.tobytes(), now))
+        with self._lock:
+            # Keys are content hashes, so an existing row already holds this vector
+            inserted = self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, dim, vector, last_used) VALUES (?, ?, ?, ?)", rows
+            ).rowcount
+            self._count += max(inserted, 0)
+            # Pending hits are written first, so eviction sees them as recent
+            self._flush_touches()
+            if self._count > self.max_entries or time.monotonic() - self._counted_at >= RECOUNT_SECONDS:
+                self._recount()
+            self._evict()
+            self._conn.commit()
+
+    def _flush_touches(self):
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(used, key) for key, used in self._touched.items()],
+            )
+            self._touched.clear()
+        self._touched_since = time.monotonic()
+
+    def _recount(self):
+        self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        self._counted_at = time.monotonic()
+
+    def _evict(self):
+        overflow = self._count - self.max_entries
+        if overflow > 0:
+            deleted = self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN ("
+                " SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                (overflow,),
+            ).rowcount
+            self._count -= deleted
+
+    def stats(self):
+        # The running count put_many keeps for eviction; rows other workers
+        # added show up at its next recount, with no table scan per call
+        entries = self._count
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "path": self.path,
+        }
+
+    def close(self):
+        with self._lock:
+            self._flush_touches()
+            self._conn.commit()
+            self._conn.close()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._touched.clear()
+            self._count = 0
+            self.hits = 0
+            self.misses = 0
+
+
+def encode_cached(cache, embed_model, model_name, texts, encode_fn):
+    """Return embeddings for texts, running encode_fn only on cache misses (in one batch)."""
+    texts = list(texts)
+    if cache is None or not texts:
+        return encode_fn(embed_model, texts)
+
+    cached = cache.get_many(model_name, texts)
+    missing = [i for i, vector in enumerate(cached) if vector is None]
+    if missing:
+        # Encode each distinct missing text once
+        missing_texts = list(dict.fromkeys(texts[i] for i in missing))
+        encoded = encode_fn(embed_model, missing_texts)
+        cache.put_many(model_name, missing_texts, encoded)
+        by_text = dict(zip(missing_texts, encoded))
+        for i in missing:
+            cached[i] = by_text[texts[i]]
+    return np.vstack(cached).astype(np.float32, copy=False)
+
+
+_default_cache = None
+_default_cache_failed = False
+_default_cache_lock = threading.Lock()
+
+
+def get_embedding_cache():
+    # Shared process-wide instance, opened on first use
+    global _default_cache, _default_cache_failed
+    if _default_cache is None and not _default_cache_failed:
+        with _default_cache_lock:
+            if _default_cache is None and not _default_cache_failed:
+                try:
+                    _default_cache = EmbeddingCache()
+                except Exception as e:
+                    print(f"Embedding cache disabled: {e}")
+                    _default_cache_failed = True
+    return _default_cache
@@ -0,0 +1,54 @@
+"""Export the Keras BiLSTM models to TFLite for the lightweight serving backend.
+
+Usage:
+    python export_bilstm.py [--quantize none|float16|int8] [model.h5 ...]
+
+Each model.h5 is written next to itself as model.tflite, which the serving
+modules load instead of the .h5 (BILSTM_BACKEND=auto), plus
+model.outputs.json with the Keras output names in model.outputs order.
+Without arguments every BiLSTM the services register is exported,
+skipping missing files.
+Run bench_bilstm_backends.py on the result to check accuracy and latency.
+"""
+import argparse
+import os
+
+from tflite_backend import QUANTIZATIONS, convert, exported_path, save_tflite_model
+
+SERVED_MODELS = [
+    "saved_models/bilstm_model.h5",
+    "model_training/bilstm_model.h5",
+    "models/domain_model.h5",
+    "models/experience_model.h5",
+    "models/profile_model.h5",
+]
+
+
+def export(path, quantization):
+    from tensorflow.keras.models import load_model
+
+    target = exported_path(path)
+    model = load_model(path)
+    content = convert(model, quantization)
+    save_tflite_model(target, content, model.output_names)
+    print(
+        f"{path} ({os.path.getsize(path) / 1e6:.1f} MB) -> {target} "
+        f"({len(content) / 1e6:.1f} MB, quantization={quantization})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("models", nargs="*", help="Keras .h5 files (default: every served BiLSTM)")
+    parser.add_argument("--quantize", choices=QUANTIZATIONS, default="int8")
+    args = parser.parse_args()
+
+    paths = args.models or [path for path in SERVED_MODELS if os.path.exists(path)]
+    if not paths:
+        raise SystemExit("No Keras models found to export")
+    for path in paths:
+        export(path, args.quantize)
+
+
+if __name__ == "__main__":
+    main()
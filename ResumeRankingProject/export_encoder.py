@@ -0,0 +1,28 @@
+"""Export the MiniLM sentence encoder for the onnxruntime backend.
+
+Usage:
+    python export_encoder.py [--out saved_models/minilm_onnx] [--no-quantize]
+
+Writes model.onnx, its dynamic int8 quantization model.int8.onnx, the
+tokenizer and the pooling config. Serve it with EMBED_BACKEND=onnx, and
+check it against PyTorch with bench_encoder.py before switching over.
+"""
+import argparse
+
+from onnx_encoder import ONNX_MODEL_DIR, export_encoder
+from scoring_engine import EMBED_MODEL_NAME
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=EMBED_MODEL_NAME)
+    parser.add_argument("--out", default=ONNX_MODEL_DIR)
+    parser.add_argument("--no-quantize", action="store_true", help="skip the int8 model")
+    args = parser.parse_args()
+
+    out_dir = export_encoder(args.model, args.out, quantize=not args.no_quantize)
+    print(f"Exported {args.model} to {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
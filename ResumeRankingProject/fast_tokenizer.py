@@ -0,0 +1,121 @@
+import re
+import threading
+import weakref
+from itertools import repeat
+
+import numpy as np
+
+# Keras Tokenizer defaults, used when a pickled tokenizer predates an attribute
+KERAS_FILTERS = '!"#$%&()*+,-./:;<=>?@[\\]^_`{|}~\t\n'
+# Characters per kept word in the first suffix scanned when only the last
+# max_len words of a text can survive truncation
+TAIL_CHARS_PER_WORD = 16
+
+
+class FastTokenizer:
+    """Frozen copy of a fitted Keras Tokenizer for batch inference.
+
+    The word -> index lookup is resolved once: words outside num_words
+    already point at the OOV index (or are dropped when there is no OOV
+    token), so tokenizing a text is one regex scan for its words and one
+    C-level dict lookup per word. With an OOV token every word yields one
+    id, so when truncating="pre" only the suffix of a text holding its last
+    max_len words is scanned. encode() writes a whole batch straight into a
+    preallocated int32 array laid out exactly like
+    pad_sequences(texts_to_sequences(texts), maxlen, padding, truncating).
+    """
+
+    def __init__(self, word_index, num_words=None, oov_token=None, filters=KERAS_FILTERS, lower=True, split=" "):
+        if len(split) != 1:
+            raise ValueError("FastTokenizer needs a single-character split")
+        self.lower = lower
+        self.oov_index = word_index.get(oov_token) if oov_token is not None else None
+        self.vocab = {
+            word: index if not num_words or index < num_words else self.oov_index
+            for word, index in word_index.items()
+        }
+        if self.oov_index is None:
+            self.vocab = {word: index for word, index in self.vocab.items() if index is not None}
+        # A word is a maximal run of characters that are neither filtered nor the
+        # separator, which is what translate(filters -> split).split(split) yields
+        separators = set(filters) | {split}
+        self._words = re.compile("[^" + "".join(re.escape(char) for char in sorted(separators)) + "]+")
+
+    @classmethod
+    def from_keras(cls, tokenizer):
+        if getattr(tokenizer, "char_level", False) or getattr(tokenizer, "analyzer", None) is not None:
+            raise ValueError("FastTokenizer only supports word-level tokenizers without a custom analyzer")
+        return cls(
+            tokenizer.word_index,
+            num_words=tokenizer.num_words,
+            oov_token=tokenizer.oov_token,
+            filters=getattr(tokenizer, "filters", KERAS_FILTERS),
+            lower=getattr(tokenizer, "lower", True),
+            split=getattr(tokenizer, "split", " "),
+        )
+
+    def _tail_words(self, text, count):
+        # The first word of a suffix may be cut, so it needs more than count words
+        window = count * TAIL_CHARS_PER_WORD
+        while window < len(text):
+            words = self._words.findall(text, len(text) - window)
+            if len(words) > count:
+                return words[-count:]
+            window *= 4
+        return self._words.findall(text)[-count:]
+
+    def sequence(self, text, last=None):
+        """Token ids of text, as texts_to_sequences([text])[0].
+
+        last=n returns only the final n ids, scanning as little of the text as possible.
+        """
+        text = text.lower() if self.lower else text
+        if self.oov_index is not None and last is not None:
+            return list(map(self.vocab.get, self._tail_words(text, last), repeat(self.oov_index)))
+        words = self._words.findall(text)
+        if self.oov_index is not None:
+            return list(map(self.vocab.get, words, repeat(self.oov_index)))
+        return [index for index in map(self.vocab.get, words) if index is not None]
+
+    def encode(self, texts, max_len, padding="pre", truncating="pre"):
+        """(len(texts), max_len) int32 array of padded token ids."""
+        if padding not in ("pre", "post") or truncating not in ("pre", "post"):
+            raise ValueError("padding and truncating must be 'pre' or 'post'")
+        last = max_len if truncating == "pre" and max_len else None
+        sequences = [self.sequence(text, last) for text in texts]
+        if max_len is None:
+            max_len = max((len(sequence) for sequence in sequences), default=0)
+        out = np.zeros((len(sequences), max_len), dtype=np.int32)
+        if max_len == 0:
+            return out
+        for row, sequence in zip(out, sequences):
+            if not sequence:
+                continue
+            sequence = sequence[-max_len:] if truncating == "pre" else sequence[:max_len]
+            if padding == "post":
+                row[:len(sequence)] = sequence
+            else:
+                row[max_len - len(sequence):] = sequence
+        return out
+
+
+_compiled = weakref.WeakKeyDictionary()
+_compiled_lock = threading.Lock()
+
+
+def get_fast_tokenizer(tokenizer):
+    """FastTokenizer for a loaded Keras tokenizer, compiled once per object.
+
+    Returns None for configurations it does not reproduce (character-level
+    or custom analyzer); callers then use the Keras tokenizer itself.
+    """
+    with _compiled_lock:
+        fast = _compiled.get(tokenizer)
+        if fast is None:
+            try:
+                fast = FastTokenizer.from_keras(tokenizer)
+            except (AttributeError, ValueError) as e:
+                print(f"Fast tokenizer unavailable, using Keras tokenizer: {e}")
+                fast = False
+            _compiled[tokenizer] = fast
+    return fast or None
@@ -0,0 +1,172 @@
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from scoring_engine import CRITERIA_PROMPTS
+
+# === Configuration ===
+FEATURE_DB_PATH = os.getenv("FEATURE_DB_PATH", os.path.join("cache", "resume_features.sqlite3"))
+
+# JD-independent per-resume features; the embedding itself lives in resume_index
+FEATURE_COLUMNS = list(CRITERIA_PROMPTS) + ["bilstm_prediction_probability"]
+# NULL when no BiLSTM prediction was made for the resume
+NULLABLE_COLUMNS = {"bilstm_prediction_probability"}
+# Provenance of each row: the scorer of the criterion columns (encoder cache
+# namespace, or "tfidf") and the BiLSTM artifact key (NULL without a BiLSTM)
+VERSION_COLUMNS = ["scorer", "bilstm"]
+
+
+class FeatureStore:
+    """Per-resume features that do not depend on the job description.
+
+    Holds the extracted text, the three criterion similarities and the
+    BiLSTM probability, so a JD change only has to recompute skill_match
+    and the final score instead of re-parsing and re-scoring every file.
+    Each row records which scorer and BiLSTM produced it; rows from
+    anything else are reported by stale() so callers rescore them.
+    """
+
+    def __init__(self, path=FEATURE_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._create_table("resume_features")
+            self._migrate()
+
+    def _create_table(self, name):
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {name} ("
+            " resume_id TEXT PRIMARY KEY,"
+            " resume_filename TEXT NOT NULL,"
+            " text TEXT NOT NULL,"
+            + "".join(
+                f" {column} REAL{'' if column in NULLABLE_COLUMNS else ' NOT NULL'}," for column in FEATURE_COLUMNS
+            )
+            + "".join(f" {column} TEXT," for column in VERSION_COLUMNS)
+            + " updated_at REAL NOT NULL)"
+        )
+
+    def _migrate(self):
+        # Tables from before provenance tracking (or with a NOT NULL BiLSTM
+        # probability) are rebuilt; their rows keep a NULL scorer, so they
+        # count as stale and are rescored on next use
+        not_null = {row[1]: row[3] for row in self._conn.execute("PRAGMA table_info(resume_features)")}
+        if all(column in not_null for column in VERSION_COLUMNS) and not any(
+            not_null[column] for column in NULLABLE_COLUMNS
+        ):
+            return
+        kept = ", ".join(["resume_id", "resume_filename", "text"] + FEATURE_COLUMNS + ["updated_at"])
+        self._conn.execute("ALTER TABLE resume_features RENAME TO resume_features_old")
+        self._create_table("resume_features")
+        self._conn.execute(f"INSERT INTO resume_features ({kept}) SELECT {kept} FROM resume_features_old")
+        self._conn.execute("DROP TABLE resume_features_old")
+
+    def upsert(self, resume_ids, filenames, texts, feature_records, scorer=None, bilstm=None):
+        now = time.time()
+        rows = [
+            (
+                resume_id, filename, text,
+                *(None if record[column] is None else float(record[column]) for column in FEATURE_COLUMNS),
+                scorer, bilstm, now,
+            )
+            for resume_id, filename, text, record in zip(resume_ids, filenames, texts, feature_records)
+        ]
+        columns = ["resume_id", "resume_filename", "text"] + FEATURE_COLUMNS + VERSION_COLUMNS + ["updated_at"]
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO resume_features ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})",
+                rows,
+            )
+            self._conn.commit()
+
+    def load(self, resume_ids=None, include_text=False):
+        """Return (ids, filenames, texts or None, {column: float array}) for the stored resumes.
+
+        NULL features load as NaN.
+        """
+        columns = ["resume_id", "resume_filename"] + (["text"] if include_text else []) + FEATURE_COLUMNS
+        query = f"SELECT {', '.join(columns)} FROM resume_features"
+        with self._lock:
+            if resume_ids is None:
+                rows = self._conn.execute(query).fetchall()
+            else:
+                rows = []
+                resume_ids = list(resume_ids)
+                for start in range(0, len(resume_ids), 500):
+                    chunk = resume_ids[start:start + 500]
+                    rows.extend(self._conn.execute(
+                        f"{query} WHERE resume_id IN ({', '.join('?' * len(chunk))})", chunk
+                    ).fetchall())
+
+        ids = [row[0] for row in rows]
+        filenames = [row[1] for row in rows]
+        texts = [row[2] for row in rows] if include_text else None
+        offset = 3 if include_text else 2
+        features = {
+            column: np.array([np.nan if row[offset + i] is None else row[offset + i] for row in rows], dtype=np.float64)
+            for i, column in enumerate(FEATURE_COLUMNS)
+        }
+        return ids, filenames, texts, features
+
+    def texts(self, resume_ids):
+        """Stored texts aligned with resume_ids."""
+        ids, _, texts, _ = self.load(resume_ids, include_text=True)
+        by_id = dict(zip(ids, texts))
+        return [by_id[resume_id] for resume_id in resume_ids]
+
+    def existing(self, resume_ids):
+        """The subset of resume_ids that already have stored features."""
+        found = set()
+        resume_ids = list(resume_ids)
+        with self._lock:
+            for start in range(0, len(resume_ids), 500):
+                chunk = resume_ids[start:start + 500]
+                found.update(row[0] for row in self._conn.execute(
+                    f"SELECT resume_id FROM resume_features WHERE resume_id IN ({', '.join('?' * len(chunk))})", chunk
+                ))
+        return found
+
+    def stale(self, scorer, bilstm, resume_ids=None):
+        """Stored resume ids (of resume_ids, or all) not produced by this scorer and BiLSTM."""
+        condition = "NOT (scorer IS ? AND bilstm IS ?)"
+        with self._lock:
+            if resume_ids is None:
+                return [row[0] for row in self._conn.execute(
+                    f"SELECT resume_id FROM resume_features WHERE {condition}", (scorer, bilstm)
+                )]
+            stale = []
+            resume_ids = list(resume_ids)
+            for start in range(0, len(resume_ids), 500):
+                chunk = resume_ids[start:start + 500]
+                stale.extend(row[0] for row in self._conn.execute(
+                    f"SELECT resume_id FROM resume_features WHERE resume_id IN ({', '.join('?' * len(chunk))})"
+                    f" AND {condition}",
+                    chunk + [scorer, bilstm],
+                ))
+        return stale
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM resume_features").fetchone()[0]
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_feature_store():
+    global _default_store
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                _default_store = FeatureStore()
+    return _default_store
@@ -1,8 +1,8 @@
 from fastapi import APIRouter
 from pydantic import BaseModel
-from keras.models import load_model
-from keras.preprocessing.sequence import pad_sequences
-import pickle
+from bilstm_inference import predict_probabilities
+from micro_batcher import MicroBatcher
+from model_registry import bilstm_model_loader, pickle_loader, registry as models
 
 router = APIRouter()
 
@@ -18,22 +18,29 @@ class ScoreResponse(BaseModel):
     final_score: float
     match_probability: float
 
-# ----------------- Load Model & Tokenizer Once ------------------
-model = load_model("model_training/bilstm_model.h5")
-with open("model_training/tokenizer.pkl", "rb") as f:
-    tokenizer = pickle.load(f)
+# ----------------- Register Model & Tokenizer (loaded once, on first use) ------------------
+models.register("score_bilstm_model", bilstm_model_loader("model_training/bilstm_model.h5"))
+models.register("score_tokenizer", pickle_loader("model_training/tokenizer.pkl"))
+
+# ----------------- Prediction Functions ------------------
+def predict_resume_matches(texts):
+    # One batched forward pass; row i is the probability for texts[i]
+    model = models.get("score_bilstm_model")
+    tokenizer = models.get("score_tokenizer")
+    if model is None or tokenizer is None:
+        raise RuntimeError("BiLSTM scoring model not available")
+    return predict_probabilities(model, tokenizer, texts)
 
-# ----------------- Prediction Function ------------------
 def predict_resume_match(text):
-    seq = tokenizer.texts_to_sequences([text])
-    padded = pad_sequences(seq, maxlen=100, padding='post')
-    prediction = model.predict(padded)
-    return float(prediction[0][0])
+    return predict_resume_matches([text])[0]
+
+# Concurrent /calculate-score requests share one batched forward pass
+match_batcher = MicroBatcher("calculate-score", predict_resume_matches)
 
 # ----------------- API Route ------------------
 @router.post("/calculate-score", response_model=ScoreResponse)
 async def calculate_final_score(data: ResumeScoreRequest):
-    match_probability = predict_resume_match(data.resume_text)
+    match_probability = await match_batcher.submit(data.resume_text)
     
     final_score = (
         (data.skill_score * 0.4)
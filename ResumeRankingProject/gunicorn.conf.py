@@ -0,0 +1,20 @@
+# gunicorn -c gunicorn.conf.py main:app
+#
+# The app (and, in when_ready, every fork-safe model) is loaded once in the
+# master process; workers are forked from it and share those pages
+# copy-on-write. `uvicorn --workers` spawns fresh interpreters instead, so
+# each of its workers loads its own copy of every model.
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+
+
+def when_ready(server):
+    # Runs in the master after the app is imported and before any worker forks
+    from model_registry import registry
+    registry.preload()
+    server.log.info("Preloaded models: %s", registry.memory())
@@ -0,0 +1,168 @@
+import json
+import os
+import re
+import threading
+import time
+import uuid
+
+import numpy as np
+
+# === Configuration ===
+JD_REGISTRY_DIR = os.getenv("JD_REGISTRY_DIR", "job_descriptions")
+DEFAULT_JD_ID = "default"  # what the legacy /upload-jd endpoint writes to
+
+_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def is_valid_id(jd_id):
+    return bool(_ID_PATTERN.match(jd_id))
+
+
+def _write_atomic(path, write, binary=False):
+    """Write through a temporary file and os.replace it over path.
+
+    Another worker reading the JD sees either the old file or the new one,
+    never a partly written one.
+    """
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with (open(temp_path, "wb") if binary else open(temp_path, "w", encoding="utf-8")) as f:
+            write(f)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class JobDescription:
+    """One open requisition and its precomputed artifacts.
+
+    Everything lives under <JD_REGISTRY_DIR>/<id>/: jd.txt (text),
+    meta.json (filename, timestamps, extracted skills), embedding.npy
+    (JD + criterion prompt embeddings). Its ranking lives in the results
+    store, keyed by the JD id.
+    """
+
+    def __init__(self, jd_id, directory, text, meta, queries=None, mtime=None):
+        self.id = jd_id
+        self.directory = directory
+        self.text = text
+        self.meta = meta
+        self.queries = queries
+        self.mtime = mtime
+
+    @property
+    def skills(self):
+        return self.meta.get("skills", [])
+
+    def summary(self):
+        return {
+            "jd_id": self.id,
+            "filename": self.meta.get("filename"),
+            "created_at": self.meta.get("created_at"),
+            "updated_at": self.meta.get("updated_at"),
+            "skills": self.skills,
+            "has_embedding": self.queries is not None,
+        }
+
+
+class JDRegistry:
+    """Registry of job descriptions, each with its own id and artifacts.
+
+    embed_fn(text) -> (1 + n_criteria, dim) array and skills_fn(text) ->
+    list of str are computed once when a JD is stored; either may be None
+    (or fail) when the corresponding model is unavailable.
+    """
+
+    def __init__(self, directory=JD_REGISTRY_DIR, embed_fn=None, skills_fn=None):
+        self.directory = directory
+        self.embed_fn = embed_fn
+        self.skills_fn = skills_fn
+        self._jobs = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, jd_id):
+        if not is_valid_id(jd_id):
+            raise ValueError(f"Invalid job description id: {jd_id}")
+        return os.path.join(self.directory, jd_id)
+
+    def put(self, text, filename=None, jd_id=None):
+        """Create a JD (new id) or replace the text of an existing one."""
+        jd_id = jd_id or uuid.uuid4().hex[:12]
+        directory = self._path(jd_id)
+        os.makedirs(directory, exist_ok=True)
+
+        now = time.time()
+        previous = self.get(jd_id)
+        meta = {
+            "filename": filename,
+            "created_at": previous.meta.get("created_at", now) if previous else now,
+            "updated_at": now,
+            "skills": [],
+        }
+        queries = None
+        if self.skills_fn is not None:
+            try:
+                meta["skills"] = list(self.skills_fn(text))
+            except Exception as e:
+                print(f"Error extracting JD skills: {e}")
+        if self.embed_fn is not None:
+            try:
+                embedded = self.embed_fn(text)
+                if embedded is not None:
+                    queries = np.asarray(embedded, dtype=np.float32)
+            except Exception as e:
+                print(f"Error embedding JD: {e}")
+
+        _write_atomic(os.path.join(directory, "jd.txt"), lambda f: f.write(text))
+        embedding_path = os.path.join(directory, "embedding.npy")
+        if queries is not None:
+            _write_atomic(embedding_path, lambda f: np.save(f, queries), binary=True)
+        elif os.path.exists(embedding_path):
+            os.remove(embedding_path)
+        # meta.json is written last: its mtime marks the JD as changed for other workers
+        meta_path = os.path.join(directory, "meta.json")
+        _write_atomic(meta_path, lambda f: json.dump(meta, f, indent=2))
+
+        jd = JobDescription(jd_id, directory, text, meta, queries, os.stat(meta_path).st_mtime_ns)
+        with self._lock:
+            self._jobs[jd_id] = jd
+        return jd
+
+    def get(self, jd_id):
+        try:
+            directory = self._path(jd_id)
+        except ValueError:
+            return None
+        meta_path = os.path.join(directory, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        mtime = os.stat(meta_path).st_mtime_ns
+
+        with self._lock:
+            jd = self._jobs.get(jd_id)
+        # Reload only when another worker process replaced the JD
+        if jd is not None and jd.mtime == mtime:
+            return jd
+
+        with open(os.path.join(directory, "jd.txt"), "r", encoding="utf-8") as f:
+            text = f.read()
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        embedding_path = os.path.join(directory, "embedding.npy")
+        queries = np.load(embedding_path) if os.path.exists(embedding_path) else None
+
+        reloaded = JobDescription(jd_id, directory, text, meta, queries, mtime)
+        with self._lock:
+            self._jobs[jd_id] = reloaded
+        return reloaded
+
+    def list(self):
+        jds = []
+        for jd_id in sorted(os.listdir(self.directory)):
+            jd = self.get(jd_id)
+            if jd is not None:
+                jds.append(jd)
+        return jds
@@ -0,0 +1,127 @@
+import json
+import os
+import re
+from typing import List
+
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+
+from resume_data import ResumeData
+
+# === Configuration ===
+KEYWORD_CONFIG_PATH = os.getenv("KEYWORD_CONFIG_PATH", "scoring_keywords.json")
+KEYWORD_POINTS = 10  # points per keyword occurrence
+MAX_KEYWORD_SCORE = 100
+# Below this many distinct keywords, one C-level str.count per keyword beats
+# a regex scan of every position. bench_keywords.py on 600-word resumes:
+# str.count is 8x faster at the shipped 16 keywords, 2.6x at 128, 1.6x at
+# 256, and the two break even at ~512.
+REGEX_MIN_KEYWORDS = 512
+
+# Built-in keyword lists; the config file overrides them per category
+DEFAULT_KEYWORDS = {
+    "experience_score": ["years of experience", "worked at", "senior", "junior", "intern"],
+    "soft_skill_score": ["communication", "teamwork", "leadership", "problem-solving", "adaptability", "collaboration"],
+    "adaptability_score": ["fast learner", "adapt", "new skills", "multitasking", "cross-functional"],
+}
+
+
+def trie_pattern(keywords):
+    """Regex alternation with shared prefixes factored out, longest match first."""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return build(trie)
+
+
+class KeywordScorer:
+    """Score several keyword categories from one lowercased copy of the text.
+
+    Every distinct keyword is counted once and shared by all categories.
+    Large keyword sets are matched in a single scan: one trie-shaped regex
+    inside a lookahead reports each position where some keyword starts
+    (its longest match), and the keywords that are prefixes of that match
+    occur there too. Per keyword, an occurrence only counts when it starts
+    after the end of the previous counted one, which reproduces the
+    non-overlapping counts of text.lower().count(keyword) exactly.
+    """
+
+    def __init__(self, categories, points=KEYWORD_POINTS, max_score=MAX_KEYWORD_SCORE,
+                 regex_min_keywords=REGEX_MIN_KEYWORDS):
+        # categories: {score field: [keywords]}; matching is case-insensitive
+        self.categories = {
+            field: [keyword.lower() for keyword in keywords if keyword]
+            for field, keywords in categories.items()
+        }
+        self.points = points
+        self.max_score = max_score
+        self._keywords = sorted({kw for keywords in self.categories.values() for kw in keywords}, key=len, reverse=True)
+        self._pattern = None
+        if len(self._keywords) >= regex_min_keywords:
+            self._prefixes = {kw: [p for p in self._keywords if kw.startswith(p)] for kw in self._keywords}
+            self._pattern = re.compile("(?=(" + trie_pattern(self._keywords) + "))")
+
+    def counts(self, text):
+        """Non-overlapping occurrence count of every keyword."""
+        text = text.lower()
+        if self._pattern is None:
+            return {keyword: text.count(keyword) for keyword in self._keywords}
+        counts = dict.fromkeys(self._keywords, 0)
+        next_free = dict.fromkeys(self._keywords, 0)
+        for match in self._pattern.finditer(text):
+            position = match.start()
+            for keyword in self._prefixes[match.group(1)]:
+                if position >= next_free[keyword]:
+                    counts[keyword] += 1
+                    next_free[keyword] = position + len(keyword)
+        return counts
+
+    def score(self, text):
+        counts = self.counts(text)
+        return {
+            field: min(sum(counts[kw] for kw in keywords) * self.points, self.max_score)
+            for field, keywords in self.categories.items()
+        }
+
+    def score_many(self, texts):
+        return [self.score(text) for text in texts]
+
+
+def load_keyword_config(path=KEYWORD_CONFIG_PATH):
+    """DEFAULT_KEYWORDS with the categories of the config file merged over them."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return dict(DEFAULT_KEYWORDS, **json.load(f))
+    except Exception as e:
+        print(f"Error loading keyword config {path}: {e}; using built-in keywords")
+        return dict(DEFAULT_KEYWORDS)
+
+
+# Compiled once at startup and shared by every scorer
+keyword_scorer = KeywordScorer(load_keyword_config())
+
+# === FastAPI Router ===
+router = APIRouter()
+
+
+@router.post("/keyword-scores")
+async def keyword_scores(resume: ResumeData):
+    return dict(keyword_scorer.score(resume.text), filename=resume.filename)
+
+
+@router.post("/keyword-scores/batch")
+async def keyword_scores_batch(resumes: List[ResumeData]):
+    # One scan per resume for all three scores, off the event loop
+    scores = await run_in_threadpool(keyword_scorer.score_many, [resume.text for resume in resumes])
+    return [dict(score, filename=resume.filename) for resume, score in zip(resumes, scores)]
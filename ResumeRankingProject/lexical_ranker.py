@@ -0,0 +1,235 @@
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from scipy import sparse
+
+# === Configuration ===
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+# Cascade ranking: the share of a pool (and at least this many resumes) that
+# goes on to the embedding and BiLSTM stages; resumes whose lexical score is
+# at least CASCADE_MIN_LEXICAL_SCORE always do (0 disables the cutoff)
+CASCADE_TOP_FRACTION = float(os.getenv("CASCADE_TOP_FRACTION", "0.1"))
+CASCADE_MIN_CANDIDATES = int(os.getenv("CASCADE_MIN_CANDIDATES", "50"))
+CASCADE_MIN_LEXICAL_SCORE = float(os.getenv("CASCADE_MIN_LEXICAL_SCORE", "0"))
+# Terms are hashed into 2**TFIDF_HASH_BITS columns; collisions are negligible
+# next to the size of a JD's vocabulary
+TFIDF_HASH_BITS = int(os.getenv("TFIDF_HASH_BITS", "20"))
+TFIDF_CACHE_SIZE = 16  # fitted query sets (JD + criteria) kept
+HASH_CHUNK_BYTES = 1 << 20  # text bytes hashed per numpy pass, bounds the temporary arrays
+
+# A term is a run of ASCII letters, digits, "+", "#" or non-ASCII characters,
+# so "c++", "c#" and "résumé" stay whole. TOKEN_PATTERN and _term_bytes are
+# the same rule over str and over lowercased UTF-8 bytes.
+TOKEN_PATTERN = re.compile("[a-z0-9+#\u0080-\U0010ffff]+")
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our the this to we will with you your".split()
+)
+
+_HASH_BASE = 16777619  # FNV-1 32-bit prime
+_HASH_MIX = np.uint32(0x9E3779B9)  # Fibonacci hashing multiplier
+_powers = np.ones(0, dtype=np.uint32)
+_inverse_powers = np.ones(0, dtype=np.uint32)
+_powers_lock = threading.Lock()
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def _term_bytes(data):
+    # Comparisons rather than a 256-entry lookup table: a fancy-index gather
+    # costs several times more per byte than these vectorized compares
+    is_term = (data - np.uint8(ord("a"))) <= np.uint8(25)
+    is_term |= (data - np.uint8(ord("0"))) <= np.uint8(9)
+    is_term |= data >= 128
+    is_term |= data == ord("+")
+    is_term |= data == ord("#")
+    return is_term
+
+
+def _power_tables(size):
+    # BASE**i and BASE**-i mod 2**32 for i < size, grown on demand and shared
+    global _powers, _inverse_powers
+    with _powers_lock:
+        if len(_powers) < size:
+            size = max(size, HASH_CHUNK_BYTES)
+            _powers = np.cumprod(np.full(size, _HASH_BASE, dtype=np.uint32), dtype=np.uint32)
+            inverse = pow(_HASH_BASE, -1, 1 << 32)
+            _inverse_powers = np.cumprod(np.full(size, inverse, dtype=np.uint32), dtype=np.uint32)
+        return _powers, _inverse_powers
+
+
+def _hash_chunk(encoded, bits):
+    # Every term of every text becomes (text index, column) without a Python
+    # loop over terms. The texts are one byte array; a term starting at byte s
+    # hashes to sum(byte[k] * BASE**k) * BASE**-s over its bytes, the same
+    # polynomial wherever it occurs, so all hashes are one multiply and one
+    # reduceat over the array (non-term bytes are 0 and add nothing).
+    data = np.frombuffer(b"\n".join(encoded), dtype=np.uint8)
+    is_term = _term_bytes(data)
+    term_starts = is_term.copy()
+    term_starts[1:] &= ~is_term[:-1]
+    start_offsets = np.flatnonzero(term_starts)
+    if len(start_offsets) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    powers, inverse_powers = _power_tables(len(data))
+    values = np.multiply(data * is_term, powers[:len(data)], dtype=np.uint32)
+    hashes = np.add.reduceat(values, start_offsets, dtype=np.uint32)
+    hashes *= inverse_powers[start_offsets]
+    columns = ((hashes * _HASH_MIX) >> np.uint32(32 - bits)).astype(np.int64)
+
+    text_offsets = np.cumsum([0] + [len(e) + 1 for e in encoded[:-1]])
+    # Terms per text from where each text's offset falls among the term starts
+    terms_per_text = np.diff(np.searchsorted(start_offsets, np.append(text_offsets, len(data))))
+    rows = np.repeat(np.arange(len(encoded)), terms_per_text)
+    return rows, columns
+
+
+def term_counts(texts, bits=TFIDF_HASH_BITS):
+    """(len(texts), 2**bits) CSR matrix of hashed term counts."""
+    encoded = [text.lower().encode("utf-8") for text in texts]
+    all_rows, all_columns = [], []
+    start = 0
+    while start < len(encoded):
+        # Chunks of about HASH_CHUNK_BYTES bound the temporary arrays
+        end, size = start, 0
+        while end < len(encoded) and (end == start or size + len(encoded[end]) < HASH_CHUNK_BYTES):
+            size += len(encoded[end]) + 1
+            end += 1
+        rows, columns = _hash_chunk(encoded[start:end], bits)
+        all_rows.append(rows + start)
+        all_columns.append(columns)
+        start = end
+
+    # Sorting the (row, column) keys groups repeated terms and yields the
+    # canonical CSR layout directly
+    keys = np.concatenate(all_rows) << bits | np.concatenate(all_columns) if all_rows else np.zeros(0, dtype=np.int64)
+    keys, counts = np.unique(keys, return_counts=True)
+    indptr = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys >> bits, minlength=len(encoded)), out=indptr[1:])
+    return sparse.csr_matrix(
+        (counts.astype(np.float64), keys & ((1 << bits) - 1), indptr), shape=(len(encoded), 1 << bits)
+    )
+
+
+def _normalize_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    matrix.data /= np.repeat(norms, np.diff(matrix.indptr))
+    return matrix
+
+
+class TfidfEngine:
+    """Hashed TF-IDF cosine similarity of texts to a fixed set of queries.
+
+    Fitted once per query set (a JD and the criterion prompts): the
+    queries' term counts are hashed and the IDF is fixed from the queries'
+    document frequencies, smoothed like ln((1 + n) / (1 + df)) + 1. A term
+    no query contains gets the IDF of df = 0 and stop words weigh nothing.
+    A resume's score therefore depends only on its own text, never on the
+    batch it is scored in. A batch of texts becomes one sparse count matrix
+    and all similarities are one sparse product with the query matrix.
+    """
+
+    def __init__(self, queries, bits=TFIDF_HASH_BITS):
+        self.bits = bits
+        self.queries = list(queries)
+        query_counts = term_counts(self.queries, bits)
+        n = len(self.queries)
+        columns, df = np.unique(query_counts.indices, return_counts=True)
+        stop_columns = np.unique(term_counts([" ".join(STOP_WORDS)], bits).indices)
+        # Only the query columns and stop words differ from the unseen-term IDF
+        self._columns = np.union1d(columns, stop_columns)
+        self._column_idf = np.full(len(self._columns), math.log(1 + n) + 1)
+        self._column_idf[np.searchsorted(self._columns, columns)] = np.log((1 + n) / (1 + df)) + 1
+        self._column_idf[np.searchsorted(self._columns, stop_columns)] = 0.0
+        self._unseen_idf = math.log(1 + n) + 1
+        self._query_weights = self._weight(query_counts)
+
+    def idf(self, columns):
+        positions = np.minimum(np.searchsorted(self._columns, columns), len(self._columns) - 1)
+        known = self._columns[positions] == columns
+        return np.where(known, self._column_idf[positions], self._unseen_idf)
+
+    def _weight(self, counts):
+        weighted = counts.copy()
+        weighted.data = (1 + np.log(weighted.data)) * self.idf(weighted.indices)  # sublinear tf
+        return _normalize_rows(weighted)
+
+    def similarities(self, texts):
+        """(len(texts), len(queries)) cosine similarities in [0, 1]."""
+        counts = term_counts(texts, self.bits)
+        if counts.shape[0] == 0:
+            return np.zeros((0, len(self.queries)), dtype=np.float64)
+        return (self._weight(counts) @ self._query_weights.T).toarray()
+
+
+_engines = OrderedDict()
+_engines_lock = threading.Lock()
+
+
+def tfidf_engine(queries):
+    # Fitted engines are reused while their JD stays in use
+    key = tuple(queries)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is not None:
+            _engines.move_to_end(key)
+            return engine
+    engine = TfidfEngine(key)
+    with _engines_lock:
+        _engines[key] = engine
+        while len(_engines) > TFIDF_CACHE_SIZE:
+            _engines.popitem(last=False)
+    return engine
+
+
+def bm25_scores(query_text, texts, k1=BM25_K1, b=BM25_B):
+    """BM25 relevance of every text to query_text, with IDF taken over the texts.
+
+    The texts' hashed term counts are restricted to the query's columns,
+    so the saturation and length normalization are a few array operations
+    on the non-zeros of one sparse matrix for the whole pool at once.
+    """
+    terms = [term for term in dict.fromkeys(tokenize(query_text)) if term not in STOP_WORDS]
+    n = len(texts)
+    if not terms or n == 0:
+        return np.zeros(n, dtype=np.float64)
+
+    query_columns = np.unique(term_counts([" ".join(terms)]).indices)
+    counts = term_counts(texts)
+    lengths = np.asarray(counts.sum(axis=1)).ravel()
+    tf = counts[:, query_columns].tocsr()
+
+    df = np.bincount(tf.indices, minlength=len(query_columns))
+    idf = np.log1p((n - df + 0.5) / (df + 0.5))
+    average_length = lengths.mean() or 1.0
+    row_norm = np.repeat(k1 * (1 - b + b * lengths / average_length), np.diff(tf.indptr))
+    tf.data = idf[tf.indices] * tf.data * (k1 + 1) / (tf.data + row_norm)
+    return np.asarray(tf.sum(axis=1)).ravel()
+
+
+def lexical_scores(query_text, texts):
+    # BM25 rescaled to 0-100 against the best text in the pool
+    scores = bm25_scores(query_text, texts)
+    best = scores.max() if len(scores) else 0.0
+    return np.round(scores / best * 100, 2) if best > 0 else np.zeros_like(scores)
+
+
+def select_candidates(scores, top_fraction=CASCADE_TOP_FRACTION, min_candidates=CASCADE_MIN_CANDIDATES,
+                      min_score=CASCADE_MIN_LEXICAL_SCORE):
+    """Boolean mask of the resumes that go on to the expensive stages."""
+    scores = np.asarray(scores, dtype=np.float64)
+    budget = max(min_candidates, math.ceil(top_fraction * len(scores)))
+    keep = np.zeros(len(scores), dtype=bool)
+    # Stable sort, so ties keep upload order
+    keep[np.argsort(-scores, kind="stable")[:budget]] = True
+    if min_score > 0:
+        keep |= scores >= min_score
+    return keep
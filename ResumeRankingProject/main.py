@@ -1,43 +1,59 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+import asyncio
+import importlib.util
+from contextlib import asynccontextmanager
 import os
 import json
-from typing import List
+import uuid
+from typing import List, Optional
 import numpy as np
 
-# Try to import optional dependencies
-try:
-    import pdfplumber
-    PDF_AVAILABLE = True
-except ImportError:
-    PDF_AVAILABLE = False
-    print("pdfplumber not available - PDF processing disabled")
-
-try:
-    from sentence_transformers import SentenceTransformer, util
-    SENTENCE_TRANSFORMER_AVAILABLE = True
-except ImportError:
-    SENTENCE_TRANSFORMER_AVAILABLE = False
-    print("sentence-transformers not available - using fallback similarity")
-
-try:
-    import spacy
-    SPACY_AVAILABLE = True
-except ImportError:
-    SPACY_AVAILABLE = False
-    print("spaCy not available - using fallback NLP")
-
-try:
-    from tensorflow.keras.models import load_model
-    from tensorflow.keras.preprocessing.sequence import pad_sequences
-    import pickle
-    TENSORFLOW_AVAILABLE = True
-except ImportError:
-    TENSORFLOW_AVAILABLE = False
-    print("TensorFlow not available - using fallback BiLSTM")
-
-app = FastAPI()
+import db
+from bilstm_inference import predict_probabilities
+from embedding_cache import get_embedding_cache
+from feature_store import get_feature_store
+from final_score import router as final_score_router
+from jd_registry import DEFAULT_JD_ID, JDRegistry, is_valid_id
+from keyword_scorer import router as keyword_router
+from lexical_ranker import lexical_scores, select_candidates, tfidf_engine
+from micro_batcher import router as micro_batch_router
+from model_registry import MODEL_WARMUP, bilstm_model_loader, pickle_loader, registry as models, router as health_router
+from pdf_extraction import PDF_AVAILABLE, extract_text_async, extract_texts, shutdown_pool, start_pool
+from ranking_jobs import RankingJobManager
+from resume_classifier import router as classifier_router
+from resume_index import get_resume_index
+from results_store import get_results_store
+from scoring_engine import (
+    CRITERIA_PROMPTS, encode_job, encode_texts, score_resumes, scorer_name, scores_to_records
+)
+from skill_lexicon import skill_lexicon
+from skill_match import router as skill_router
+from upload_store import MAX_REQUEST_BYTES, RequestBudget, UploadTooLarge, extension, store_upload, stream_upload
+
+# Heavy libraries (spaCy, sentence-transformers, TensorFlow) are imported
+# by the model registry on first use, so importing this module is fast.
+@asynccontextmanager
+async def lifespan(app):
+    # The PDF pool forks before any other thread exists in this process
+    if PDF_AVAILABLE:
+        start_pool()
+    if MODEL_WARMUP:
+        models.start_warm_up()
+    yield
+    shutdown_pool()
+
+
+app = FastAPI(lifespan=lifespan)
+app.include_router(health_router)
+app.include_router(keyword_router)
+app.include_router(skill_router)
+# Classifier and score endpoints are served through micro-batchers; /micro-batch-stats reports on them
+app.include_router(classifier_router)
+app.include_router(final_score_router)
+app.include_router(micro_batch_router)
 
 # Configure CORS to allow requests from your frontend
 app.add_middleware(
@@ -48,210 +64,742 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# File paths
-JD_PATH = "job_description.txt"
+
+@app.middleware("http")
+async def limit_request_size(request: Request, call_next):
+    # Oversized bodies are refused from the header, before the multipart
+    # parser spools them; uploads without a Content-Length are still held to
+    # the same budget while they are streamed to disk
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_REQUEST_BYTES:
+        return JSONResponse(status_code=413, content={"error": f"Request exceeds {MAX_REQUEST_BYTES} bytes."})
+    return await call_next(request)
+
+# File paths (job descriptions and their rankings live in the JD registry)
 RESUME_FOLDER = "resumes"
-RESULT_PATH = "ranked_results.json"
 MODEL_PATH = "saved_models/bilstm_model.h5"
 TOKENIZER_PATH = "saved_models/tokenizer.pkl"
 
 # Constants for text preprocessing
-max_len = 100  # must match your training max_len
 threshold = 0.5108  # Threshold for BiLSTM model
+FALLBACK_MATCH_PROBABILITY = 0.55  # Used for the label when the BiLSTM is unavailable
+
+# Streaming ranking responses
+STREAM_MAX_CHUNK_SIZE = 32
+STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+# Stored resumes scored by another encoder or BiLSTM are rescored in batches of this size
+RESCORE_BATCH_SIZE = 256
 
 # Create necessary directories
 os.makedirs(RESUME_FOLDER, exist_ok=True)
 os.makedirs("saved_models", exist_ok=True)
 
-# Load NLP models with error handling
-nlp = None
-embed_model = None
-bilstm_model = None
-tokenizer = None
+# Models are loaded on first use (or by the background warm-up)
+models.register("bilstm_model", bilstm_model_loader(MODEL_PATH))
+models.register("bilstm_tokenizer", pickle_loader(TOKENIZER_PATH))
+
+
+def get_embed_model():
+    return models.get("sentence_transformer")
 
-if SPACY_AVAILABLE:
+
+def bilstm_version():
+    # Artifact key of the BiLSTM and tokenizer behind match probabilities, or None without them
+    return models.artifact_version("bilstm_model", "bilstm_tokenizer")
+
+
+def scoring_versions():
+    # (scorer, bilstm) that would score a resume now; stored features from anything else are stale
+    return scorer_name(get_embed_model()), bilstm_version()
+
+
+def score_resume_texts(jd, resume_texts):
+    # The JD's stored embeddings are reused, all resumes are encoded in one batch.
+    # Returns the score records and the resume embeddings (None on fallback).
+    embed_model = get_embed_model()
+    if embed_model is not None:
+        try:
+            scores, embeddings = score_resumes(
+                embed_model, jd.text, resume_texts, return_embeddings=True, queries=jd.queries
+            )
+            return scores_to_records(scores), embeddings
+        except Exception as e:
+            print(f"Error in batched similarity scoring: {e}")
+
+    # Fallback: every resume against the JD and all criteria in one sparse product
+    engine = tfidf_engine([jd.text] + list(CRITERIA_PROMPTS.values()))
+    return scores_to_records(np.round(engine.similarities(resume_texts) * 100, 2)), None
+
+
+def index_resumes(resume_ids, filenames, embeddings):
+    # Keep every uploaded resume searchable against future JDs
     try:
-        nlp = spacy.load("en_core_web_sm")
-        print("spaCy model loaded successfully")
+        get_resume_index().add(
+            resume_ids,
+            embeddings,
+            [
+                {"resume_filename": filename, "path": os.path.join(RESUME_FOLDER, resume_id)}
+                for resume_id, filename in zip(resume_ids, filenames)
+            ]
+        )
     except Exception as e:
-        print(f"Error loading spaCy model: {e}")
+        print(f"Error adding resumes to index: {e}")
 
-if SENTENCE_TRANSFORMER_AVAILABLE:
+
+def predict_match_probabilities(resume_texts):
+    # One batched BiLSTM forward pass for every resume in the request;
+    # None per resume when no BiLSTM prediction could be made
+    bilstm_model = models.get("bilstm_model")
+    tokenizer = models.get("bilstm_tokenizer")
+    if tokenizer and bilstm_model:
+        try:
+            return predict_probabilities(bilstm_model, tokenizer, resume_texts)
+        except Exception as e:
+            print(f"Error in BiLSTM prediction: {e}")
+    return [None] * len(resume_texts)
+
+
+def embed_jd(jd_text):
+    embed_model = get_embed_model()
+    if embed_model is not None:
+        return encode_job(embed_model, jd_text)
+    return None
+
+
+def extract_jd_skills(jd_text):
+    # Canonical taxonomy skills, no spaCy pass needed
+    return skill_lexicon.extract(jd_text)
+
+
+# Each JD has its own id, text, embedding, skills and ranking
+jd_registry = JDRegistry(embed_fn=embed_jd, skills_fn=extract_jd_skills)
+
+
+def get_jd(jd_id=None):
+    # Ranking endpoints default to the JD written by the legacy /upload-jd
+    return jd_registry.get(jd_id or DEFAULT_JD_ID)
+
+
+def jd_not_found(jd_id=None):
+    if jd_id is None:
+        return JSONResponse(status_code=400, content={"error": "Job description not uploaded yet."})
+    return JSONResponse(status_code=404, content={"error": f"Job description {jd_id} not found."})
+
+
+def jd_summary(jd):
+    return dict(jd.summary(), ranked_resumes=get_results_store().count(jd.id))
+
+
+async def read_jd_upload(file):
+    # Streamed to a uniquely named temporary copy, never held in memory whole
+    temp_path = os.path.join(jd_registry.directory, f"upload_{uuid.uuid4().hex}{extension(file.filename)}")
+    await stream_upload(file, temp_path)
     try:
-        embed_model = SentenceTransformer("paraphrase-MiniLM-L6-v2")
-        print("SentenceTransformer model loaded successfully")
+        if not file.filename.lower().endswith('.pdf'):
+            with open(temp_path, "r", encoding="utf-8") as f:
+                return f.read()
+        return await extract_text_async(temp_path)
+    finally:
+        os.remove(temp_path)
+
+
+async def store_jd(file, jd_id=None):
+    print(f"Received JD file: {file.filename}")
+    jd_text = await read_jd_upload(file)
+    jd = await run_in_threadpool(jd_registry.put, jd_text, file.filename, jd_id)
+    await run_in_threadpool(mirror_to_mongo, db.save_job, jd.id, jd.text, jd.meta)
+    
+    # Refresh the stored ranking for the new JD text from persisted features
+    results = await run_in_threadpool(rerank_current_ranking, jd)
+    if results:
+        await run_in_threadpool(save_results, jd, results)
+    return jd, len(results)
+
+
+@app.post("/upload-jd")
+async def upload_jd(file: UploadFile = File(...), jd_id: Optional[str] = None):
+    # Replaces the default JD, or the given one, and re-ranks its stored ranking
+    if jd_id is not None and not is_valid_id(jd_id):
+        raise HTTPException(status_code=400, detail=f"Invalid job description id: {jd_id}")
+    try:
+        jd, reranked = await store_jd(file, jd_id or DEFAULT_JD_ID)
+        return {
+            "message": "Job description uploaded successfully.",
+            "filename": file.filename,
+            "jd_id": jd.id,
+            "reranked": reranked
+        }
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
-        print(f"Error loading SentenceTransformer model: {e}")
+        print(f"Error in upload_jd: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-if TENSORFLOW_AVAILABLE:
+
+@app.post("/job-descriptions")
+async def create_job_description(file: UploadFile = File(...)):
     try:
-        if os.path.exists(MODEL_PATH):
-            bilstm_model = load_model(MODEL_PATH)
-            print("BiLSTM model loaded successfully")
-        else:
-            print(f"BiLSTM model not found at {MODEL_PATH}")
-            
-        if os.path.exists(TOKENIZER_PATH):
-            with open(TOKENIZER_PATH, "rb") as f:
-                tokenizer = pickle.load(f)
-            print("Tokenizer loaded successfully")
-        else:
-            print(f"Tokenizer not found at {TOKENIZER_PATH}")
+        jd, _ = await store_jd(file)
+        return jd_summary(jd)
+    except UploadTooLarge as e:
+        return JSONResponse(status_code=413, content={"error": str(e)})
     except Exception as e:
-        print(f"Error loading BiLSTM model or tokenizer: {e}")
+        print(f"Error in create_job_description: {e}")
+        return JSONResponse(status_code=500, content={"error": f"Error creating job description: {str(e)}"})
+
+
+@app.get("/job-descriptions")
+async def list_job_descriptions():
+    return [jd_summary(jd) for jd in await run_in_threadpool(jd_registry.list)]
 
 
-def extract_text_from_pdf(file_path):
-    if not PDF_AVAILABLE:
-        return "PDF processing not available"
+@app.get("/job-descriptions/{jd_id}")
+async def get_job_description(jd_id: str):
+    jd = jd_registry.get(jd_id)
+    if jd is None:
+        return jd_not_found(jd_id)
+    return dict(jd_summary(jd), text=jd.text)
+
+
+def build_result(filename, scores, prediction_prob):
+    # prediction_prob is None when no BiLSTM ran; the fallback then decides the label
+    label_prob = FALLBACK_MATCH_PROBABILITY if prediction_prob is None else prediction_prob
+    skill_match = scores["skill_match"]
+    experience_score = scores["experience_score"]
+    soft_skills = scores["soft_skills_score"]
+    adaptability = scores["adaptability_score"]
+    
+    final_score = round(
+        (0.4 * skill_match) +
+        (0.3 * experience_score) +
+        (0.2 * soft_skills) +
+        (0.1 * adaptability), 2
+    )
     
+    # Combined logic to decide label
+    if final_score < 35 and label_prob < threshold:
+        label = "Not Matched"
+        predicted_class = 0
+    else:
+        label = "Matched"
+        predicted_class = 1
+    
+    return {
+        "resume_filename": filename,
+        "skill_match": skill_match,
+        "experience_score": experience_score,
+        "soft_skills_score": soft_skills,
+        "adaptability_score": adaptability,
+        "final_ats_score": final_score,
+        "bilstm_predicted_class": predicted_class,
+        "bilstm_prediction_probability": None if prediction_prob is None else round(prediction_prob, 4),
+        "bilstm_label": label
+    }
+
+
+def mirror_to_mongo(write, *args):
+    # MongoDB is an optional secondary store; its failures never fail a ranking
+    if not db.MONGO_ENABLED:
+        return
     try:
-        with pdfplumber.open(file_path) as pdf:
-            texts = [p.extract_text() for p in pdf.pages if p.extract_text()]
-            return "\n".join(texts)
+        write(*args)
     except Exception as e:
-        print(f"Error extracting text from PDF: {e}")
-        return ""
-
-
-def calculate_similarity(text1, text2):
-    if not SENTENCE_TRANSFORMER_AVAILABLE or embed_model is None:
-        # Simple fallback similarity based on common words
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
-        if len(words1) == 0 or len(words2) == 0:
-            return 50.0
-        intersection = len(words1.intersection(words2))
-        union = len(words1.union(words2))
-        similarity = (intersection / union) * 100 if union > 0 else 50.0
-        return round(similarity, 2)
-    
+        print(f"Error writing to MongoDB: {e}")
+
+
+def store_features(resume_ids, filenames, resume_texts, score_records, prediction_probs, scorer, bilstm):
+    # JD-independent features, so a JD change never re-parses or re-runs the BiLSTM
+    features = [dict(scores, bilstm_prediction_probability=prob) for scores, prob in zip(score_records, prediction_probs)]
     try:
-        emb1 = embed_model.encode(text1, convert_to_tensor=True)
-        emb2 = embed_model.encode(text2, convert_to_tensor=True)
-        score = util.pytorch_cos_sim(emb1, emb2).item()
-        return round(score * 100, 2)
+        get_feature_store().upsert(resume_ids, filenames, resume_texts, features, scorer, bilstm)
     except Exception as e:
-        print(f"Error calculating similarity: {e}")
-        return 50.0
+        print(f"Error storing resume features: {e}")
+    mirror_to_mongo(db.save_resumes, resume_ids, filenames, resume_texts, features)
 
 
-@app.post("/upload-jd")
-async def upload_jd(file: UploadFile = File(...)):
+def rank_resume_texts(jd, filenames, resume_texts, resume_ids=None):
+    # Similarity scores and BiLSTM probabilities for the whole batch;
+    # resumes are keyed by resume_ids (content hashes for uploads), or by filename
+    resume_ids = list(resume_ids or filenames)
+    score_records, embeddings = score_resume_texts(jd, resume_texts)
+    prediction_probs = predict_match_probabilities(resume_texts)
+    if embeddings is not None:
+        index_resumes(resume_ids, filenames, embeddings)
+    # Record what actually produced the scores: a failed encoder or BiLSTM falls back
+    scorer = scorer_name(get_embed_model() if embeddings is not None else None)
+    bilstm = bilstm_version() if prediction_probs and prediction_probs[0] is not None else None
+    store_features(resume_ids, filenames, resume_texts, score_records, prediction_probs, scorer, bilstm)
+    return [
+        dict(build_result(filename, scores, prediction_prob), resume_id=resume_id)
+        for resume_id, filename, scores, prediction_prob in zip(resume_ids, filenames, score_records, prediction_probs)
+    ]
+
+
+def decided_by(record):
+    # A final score of 35+ is Matched whatever the BiLSTM says; below it the
+    # BiLSTM probability decides the label, or the fixed fallback when no
+    # BiLSTM prediction was made
+    if record["final_ats_score"] >= 35:
+        return "embedding"
+    return "fallback" if record["bilstm_prediction_probability"] is None else "bilstm"
+
+
+def build_lexical_result(resume_id, filename, lexical_score):
+    # Cut by the lexical pre-filter: no similarity or BiLSTM scores were computed
+    return {
+        "resume_id": resume_id,
+        "resume_filename": filename,
+        "skill_match": None,
+        "experience_score": None,
+        "soft_skills_score": None,
+        "adaptability_score": None,
+        "final_ats_score": 0.0,
+        "bilstm_predicted_class": 0,
+        "bilstm_prediction_probability": None,
+        "bilstm_label": "Not Matched",
+        "lexical_score": lexical_score,
+        "decided_by": "lexical"
+    }
+
+
+def cascade_rank_resume_texts(jd, filenames, resume_texts, resume_ids=None):
+    """Rank a pool with a BM25 pre-filter in front of the full pipeline.
+
+    Every resume gets a lexical score against the JD; only the candidates
+    picked by select_candidates are embedded and run through the BiLSTM.
+    The rest follow them in lexical order with decided_by="lexical".
+    """
+    resume_ids = list(resume_ids or filenames)
+    lexical = lexical_scores(jd.text, resume_texts)
+    keep = select_candidates(lexical)
+    selected = np.flatnonzero(keep)
+    results = rank_resume_texts(
+        jd, [filenames[i] for i in selected], [resume_texts[i] for i in selected], [resume_ids[i] for i in selected]
+    )
+    for i, record in zip(selected, results):
+        record["lexical_score"] = float(lexical[i])
+        record["decided_by"] = decided_by(record)
+    rejected = sorted(np.flatnonzero(~keep), key=lambda i: -lexical[i])
+    results.extend(build_lexical_result(resume_ids[i], filenames[i], float(lexical[i])) for i in rejected)
+    return results
+
+
+def cascade_summary(results):
+    tiers = {"lexical": 0, "embedding": 0, "bilstm": 0, "fallback": 0}
+    for record in results:
+        tiers[record["decided_by"]] += 1
+    return {"candidates": len(results), "fully_scored": len(results) - tiers["lexical"], "decided_by": tiers}
+
+
+def index_missing_resumes(embed_model, index, ids, positions):
+    # Resumes first stored while the encoder was unavailable: encode (through
+    # the embedding cache) and index just those, once
+    missing = [ids[i] for i in np.flatnonzero(positions < 0)]
+    if not missing:
+        return positions
+    missing_ids, filenames, texts, _ = get_feature_store().load(missing, include_text=True)
+    index_resumes(missing_ids, filenames, encode_texts(embed_model, texts))
+    return index.positions(ids)
+
+
+def embedding_skill_match(jd, ids):
+    # skill_match from the resume index for every id, or None without the encoder
+    embed_model = get_embed_model()
+    if embed_model is None:
+        return None
     try:
-        print(f"Received JD file: {file.filename}")
-        
-        # Save the file
-        file_path = JD_PATH
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
-        
-        # If it's a PDF, extract text
-        if file.filename.lower().endswith('.pdf'):
-            jd_text = extract_text_from_pdf(file_path)
-            with open(JD_PATH, "w", encoding="utf-8") as f:
-                f.write(jd_text)
-        
-        return {"message": "Job description uploaded successfully.", "filename": file.filename}
+        index = get_resume_index()
+        positions = index_missing_resumes(embed_model, index, ids, index.positions(ids))
+        if (positions < 0).any():
+            return None
+        query = (jd.queries if jd.queries is not None else encode_job(embed_model, jd.text))[0]
+        return np.round(index.similarities(query)[positions].astype(np.float64) * 100, 2)
     except Exception as e:
-        print(f"Error in upload_jd: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        print(f"Error in vectorized re-rank: {e}")
+        return None
+
+
+def refresh_stale_features(jd, resume_ids=None):
+    store = get_feature_store()
+    stale = store.stale(*scoring_versions(), resume_ids)
+    for start in range(0, len(stale), RESCORE_BATCH_SIZE):
+        ids, filenames, texts, _ = store.load(stale[start:start + RESCORE_BATCH_SIZE], include_text=True)
+        rank_resume_texts(jd, filenames, texts, ids)
+
+
+def rerank_stored_resumes(jd, resume_ids=None):
+    """Re-rank stored resumes against a new JD from their persisted features.
+
+    Only skill_match and the final score depend on the JD: skill_match is
+    one matrix product between the JD embedding and the stored resume
+    embeddings, and everything else comes from the feature store. Stored
+    texts are read only for resumes missing from the index, or for the
+    TF-IDF fallback when there is no encoder. Resumes whose features came
+    from another scorer or BiLSTM (e.g. the fallbacks, before the models
+    were available) are first rescored from their stored text, so criterion
+    scores and skill_match are always on the same scale.
+    """
+    refresh_stale_features(jd, resume_ids)
+    ids, filenames, _, features = get_feature_store().load(resume_ids)
+    if not ids:
+        return []
+    
+    skill_match = embedding_skill_match(jd, ids)
+    if skill_match is None:
+        # Fallback: no embedding model
+        texts = get_feature_store().texts(ids)
+        skill_match = np.round(tfidf_engine([jd.text]).similarities(texts)[:, 0] * 100, 2)
+    
+    results = []
+    for i, filename in enumerate(filenames):
+        scores = {"skill_match": float(skill_match[i])}
+        for column in CRITERIA_PROMPTS:
+            scores[column] = float(features[column][i])
+        prob = features["bilstm_prediction_probability"][i]
+        record = build_result(filename, scores, None if np.isnan(prob) else float(prob))
+        results.append(dict(record, resume_id=ids[i]))
+    results.sort(key=lambda x: x["final_ats_score"], reverse=True)
+    return results
+
+
+def rerank_current_ranking(jd, all_resumes=False):
+    """Re-rank a JD's stored ranking (or every stored resume) against its current text.
+
+    Resumes with stored features are re-ranked from them. Ranking rows without
+    features were cut by the cascade's lexical tier and never fully
+    scored: the cascade runs again on their uploaded files, so they are
+    re-evaluated against the new JD too. Rows whose file is gone are
+    removed from the ranking.
+    """
+    ranked = get_results_store().filenames(jd.id)
+    if not ranked and not all_resumes:
+        return []
+    scored = get_feature_store().existing(ranked)
+    results = rerank_stored_resumes(jd, None if all_resumes else [resume_id for resume_id in ranked if resume_id in scored])
+
+    unscored = [resume_id for resume_id in ranked if resume_id not in scored]
+    paths = {resume_id: os.path.join(RESUME_FOLDER, resume_id) for resume_id in unscored}
+    present = [resume_id for resume_id in unscored if os.path.exists(paths[resume_id])]
+    gone = [resume_id for resume_id in unscored if resume_id not in present]
+    if gone:
+        get_results_store().delete(jd.id, gone)
+    if present:
+        texts = read_resume_texts([paths[resume_id] for resume_id in present])
+        results.extend(cascade_rank_resume_texts(jd, [ranked[resume_id] for resume_id in present], texts, present))
+    return results
+
+
+def read_resume_texts(resume_paths):
+    resume_texts = []
+    pdf_positions = []
+    pdf_paths = []
+    
+    for resume_path in resume_paths:
+        # Extract text if it's a PDF (done below, in parallel across the pool)
+        if resume_path.lower().endswith('.pdf'):
+            pdf_positions.append(len(resume_texts))
+            pdf_paths.append(resume_path)
+            resume_texts.append("")
+        else:
+            with open(resume_path, "r", encoding="utf-8") as f:
+                resume_texts.append(f.read())
+    
+    for position, pdf_text in zip(pdf_positions, extract_texts(pdf_paths)):
+        resume_texts[position] = pdf_text
+    return resume_texts
+
+
+async def read_resume_text_async(resume_path):
+    if resume_path.lower().endswith('.pdf'):
+        return await extract_text_async(resume_path)
+    with open(resume_path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def process_resume_files(jd, filenames, resume_paths, cascade=False):
+    # Uploads are stored under their resume id (see upload_store)
+    rank = cascade_rank_resume_texts if cascade else rank_resume_texts
+    resume_ids = [os.path.basename(path) for path in resume_paths]
+    return rank(jd, filenames, read_resume_texts(resume_paths), resume_ids)
+
+
+def save_results(jd, results):
+    # Incremental: only these resumes' rows for the JD are inserted or replaced
+    results.sort(key=lambda x: x["final_ats_score"], reverse=True)
+    get_results_store().upsert(jd.id, results)
+    mirror_to_mongo(db.save_scores, jd.id, results)
+
+
+async def save_uploads(files):
+    # Streamed to disk under their content hash, within one request budget
+    budget = RequestBudget()
+    saved = []
+    for file in files:
+        print(f"Processing resume: {file.filename}")
+        saved.append(await store_upload(file, RESUME_FOLDER, budget=budget))
+    return saved
+
+
+def split_uploads(saved):
+    """Sort a request's uploads by whether their content needs processing.
+
+    Returns (new, known, duplicates): content to extract and score,
+    content whose features are already stored by the current encoder and
+    BiLSTM (so extraction and scoring are skipped), and repeats of content
+    earlier in the same request. Features stored by a fallback or by other
+    models do not count: that content is processed again as new.
+    """
+    unique = {}
+    duplicates = []
+    for upload in saved:
+        if upload.resume_id in unique:
+            duplicates.append(upload)
+        else:
+            unique[upload.resume_id] = upload
+    store = get_feature_store()
+    stored = store.existing(unique) - set(store.stale(*scoring_versions(), list(unique)))
+    new = [upload for resume_id, upload in unique.items() if resume_id not in stored]
+    known = [upload for resume_id, upload in unique.items() if resume_id in stored]
+    return new, known, duplicates
+
+
+def rank_known_resumes(jd, uploads):
+    # Only the JD-dependent part is recomputed, from the stored features
+    if not uploads:
+        return []
+    filenames = {upload.resume_id: upload.filename for upload in uploads}
+    results = rerank_stored_resumes(jd, list(filenames))
+    for record in results:
+        record["resume_filename"] = filenames[record["resume_id"]]
+    return results
+
+
+def dedupe_summary(known, duplicates):
+    return {"reused": [upload.filename for upload in known], "duplicates": [upload.filename for upload in duplicates]}
+
+
+# Background ranking for large uploads; a completed job's results, or a
+# cancelled job's results so far, are merged into its JD's stored ranking,
+# same as a synchronous upload.
+ranking_jobs = RankingJobManager(process_resume_files, on_complete=lambda job: save_results(job.jd, list(job.results)))
 
 
 @app.post("/upload-resumes")
-async def upload_resumes(files: List[UploadFile] = File(...)):
+async def upload_resumes(
+    files: List[UploadFile] = File(...), background: bool = False, jd_id: Optional[str] = None, cascade: bool = False
+):
+    # cascade=true puts a lexical pre-filter in front of the embedding and
+    # BiLSTM stages (see cascade_rank_resume_texts)
     try:
         print(f"Received {len(files)} resume files")
         
-        if not os.path.exists(JD_PATH):
-            return JSONResponse(status_code=400, content={"error": "Job description not uploaded yet."})
-        
-        with open(JD_PATH, "r", encoding="utf-8") as f:
-            jd_text = f.read()
+        jd = get_jd(jd_id)
+        if jd is None:
+            return jd_not_found(jd_id)
+        if background and cascade:
+            # Background jobs score fixed-size chunks, too small to pre-filter
+            return JSONResponse(status_code=400, content={"error": "cascade is only supported for synchronous uploads."})
         
-        results = []
+        saved = await save_uploads(files)
+        new, known, duplicates = await run_in_threadpool(split_uploads, saved)
+        reused = await run_in_threadpool(rank_known_resumes, jd, known)
         
-        for file in files:
-            print(f"Processing resume: {file.filename}")
-            resume_path = os.path.join(RESUME_FOLDER, file.filename)
-            
-            # Save the file
-            with open(resume_path, "wb") as f:
-                content = await file.read()
-                f.write(content)
-            
-            # Extract text if it's a PDF
-            if file.filename.lower().endswith('.pdf'):
-                resume_text = extract_text_from_pdf(resume_path)
-            else:
-                with open(resume_path, "r", encoding="utf-8") as f:
-                    resume_text = f.read()
-            
-            # Calculate similarity scores
-            skill_match = calculate_similarity(jd_text, resume_text)
-            experience_score = calculate_similarity("Experience in AI and ML", resume_text)
-            soft_skills = calculate_similarity("Strong communication and collaboration", resume_text)
-            adaptability = calculate_similarity("Adaptable to cross-industry roles", resume_text)
-            
-            final_score = round(
-                (0.4 * skill_match) +
-                (0.3 * experience_score) +
-                (0.2 * soft_skills) +
-                (0.1 * adaptability), 2
-            )
-            
-            # Prepare text input for BiLSTM model using tokenizer and padding
-            if TENSORFLOW_AVAILABLE and tokenizer and bilstm_model:
-                try:
-                    seq = tokenizer.texts_to_sequences([resume_text])
-                    padded_seq = pad_sequences(seq, maxlen=max_len, padding='post')
-                    prediction_prob = float(bilstm_model.predict(padded_seq)[0][0])
-                    predicted_class = int(prediction_prob > threshold)
-                except Exception as e:
-                    print(f"Error in BiLSTM prediction: {e}")
-                    prediction_prob = 0.55
-                    predicted_class = 1
-            else:
-                # Fallback if models aren't loaded
-                prediction_prob = 0.55
-                predicted_class = 1
-
-            # Combined logic to decide label
-            if final_score < 35 and prediction_prob < threshold:
-                label = "Not Matched"
-                predicted_class = 0
-            else:
-                label = "Matched"
-                predicted_class = 1
-            
-            results.append({
-                "resume_filename": file.filename,
-                "skill_match": skill_match,
-                "experience_score": experience_score,
-                "soft_skills_score": soft_skills,
-                "adaptability_score": adaptability,
-                "final_ats_score": final_score,
-                "bilstm_predicted_class": predicted_class,
-                "bilstm_prediction_probability": round(prediction_prob, 4),
-                "bilstm_label": label
+        if background:
+            # Previously seen content is ranked now; only new content is queued
+            if reused:
+                await run_in_threadpool(save_results, jd, list(reused))
+            job = ranking_jobs.submit(jd, [(upload.filename, upload.path) for upload in new])
+            return JSONResponse(status_code=202, content={
+                "message": "Resumes queued for ranking.",
+                "job_id": job.id,
+                "status_url": f"/jobs/{job.id}",
+                "deduplicated": dedupe_summary(known, duplicates)
             })
         
+        # Heavy work runs in a worker thread so other endpoints stay responsive
+        filenames = [upload.filename for upload in new]
+        resume_paths = [upload.path for upload in new]
+        results = await run_in_threadpool(process_resume_files, jd, filenames, resume_paths, cascade)
+        if cascade:
+            for record in reused:
+                record["decided_by"] = decided_by(record)
+        results.extend(reused)
+        
         # Sort and save results
-        results.sort(key=lambda x: x["final_ats_score"], reverse=True)
-        with open(RESULT_PATH, "w", encoding="utf-8") as f:
-            json.dump(results, f, indent=2)
+        await run_in_threadpool(save_results, jd, results)
         
-        return {"message": "Resumes processed and ranked successfully.", "results": results}
+        response = {
+            "message": "Resumes processed and ranked successfully.",
+            "results": results,
+            "deduplicated": dedupe_summary(known, duplicates)
+        }
+        if cascade:
+            response["cascade"] = cascade_summary(results)
+        return response
+    except UploadTooLarge as e:
+        return JSONResponse(status_code=413, content={"error": str(e)})
     except Exception as e:
         print(f"Error in upload_resumes: {e}")
         return JSONResponse(status_code=500, content={"error": f"Error processing resumes: {str(e)}"})
 
 
+def format_stream_event(event, data, stream_format):
+    if stream_format == "sse":
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps({"type": event, "data": data}) + "\n"
+
+
+async def stream_rankings(jd, new, known, stream_format):
+    # Start parsing every new file now so extraction overlaps with scoring
+    text_tasks = [asyncio.ensure_future(read_resume_text_async(upload.path)) for upload in new]
+    try:
+        # Previously seen content needs no extraction or scoring: sent first
+        results = await run_in_threadpool(rank_known_resumes, jd, known)
+        for record in results:
+            yield format_stream_event("result", record, stream_format)
+        if results:
+            await run_in_threadpool(save_results, jd, list(results))
+        # Score the first resume alone for a fast first result, then grow
+        # the chunks so later resumes still get batched inference.
+        start, chunk_size = 0, 1
+        while start < len(new):
+            chunk = new[start:start + chunk_size]
+            resume_texts = await asyncio.gather(*text_tasks[start:start + chunk_size])
+            records = await run_in_threadpool(
+                rank_resume_texts, jd, [upload.filename for upload in chunk], resume_texts,
+                [upload.resume_id for upload in chunk]
+            )
+            for record in records:
+                yield format_stream_event("result", record, stream_format)
+            # Stored as emitted, so a client that disconnects midway keeps what it was sent
+            await run_in_threadpool(save_results, jd, list(records))
+            results.extend(records)
+            start += len(chunk)
+            chunk_size = min(chunk_size * 2, STREAM_MAX_CHUNK_SIZE)
+        
+        results.sort(key=lambda x: x["final_ats_score"], reverse=True)
+        yield format_stream_event("ranking", results, stream_format)
+    except Exception as e:
+        print(f"Error in stream_rankings: {e}")
+        yield format_stream_event("error", {"error": f"Error processing resumes: {str(e)}"}, stream_format)
+    finally:
+        # On disconnect or error, stop extracting files nobody will score
+        for task in text_tasks:
+            task.cancel()
+
+
+@app.post("/upload-resumes/stream")
+async def upload_resumes_stream(
+    files: List[UploadFile] = File(...), format: str = "ndjson", jd_id: Optional[str] = None
+):
+    if format not in STREAM_MEDIA_TYPES:
+        return JSONResponse(status_code=400, content={"error": "format must be 'ndjson' or 'sse'."})
+    jd = get_jd(jd_id)
+    if jd is None:
+        return jd_not_found(jd_id)
+    
+    try:
+        saved = await save_uploads(files)
+    except UploadTooLarge as e:
+        return JSONResponse(status_code=413, content={"error": str(e)})
+    new, known, _ = await run_in_threadpool(split_uploads, saved)
+    # Each score record is emitted as soon as it is computed, then the final ordered ranking
+    return StreamingResponse(
+        stream_rankings(jd, new, known, format),
+        media_type=STREAM_MEDIA_TYPES[format],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/rerank")
+async def rerank(all_resumes: bool = False, jd_id: Optional[str] = None):
+    # Re-score the JD's current ranking (or every stored resume) against it
+    jd = get_jd(jd_id)
+    if jd is None:
+        return jd_not_found(jd_id)
+    try:
+        results = await run_in_threadpool(rerank_current_ranking, jd, all_resumes)
+        await run_in_threadpool(save_results, jd, results)
+        return {"message": "Resumes re-ranked successfully.", "results": results}
+    except Exception as e:
+        print(f"Error in rerank: {e}")
+        return JSONResponse(status_code=500, content={"error": f"Error re-ranking resumes: {str(e)}"})
+
+
+@app.get("/jobs")
+async def list_ranking_jobs():
+    return await run_in_threadpool(ranking_jobs.list)
+
+
+@app.get("/jobs/{job_id}")
+async def get_ranking_job(job_id: str, top: Optional[int] = None):
+    job = await run_in_threadpool(ranking_jobs.snapshot, job_id, True, top)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": f"Job {job_id} not found."})
+    return job
+
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_ranking_job(job_id: str):
+    job = await run_in_threadpool(ranking_jobs.cancel, job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": f"Job {job_id} not found."})
+    return job
+
+
+@app.get("/search")
+async def search_resumes(jd: Optional[str] = None, k: int = 10, jd_id: Optional[str] = None):
+    # Top-k stored resumes for a JD text or a registered JD without re-encoding any resume
+    embed_model = await run_in_threadpool(get_embed_model)
+    if embed_model is None:
+        return JSONResponse(status_code=503, content={"error": "Embedding model not available."})
+    
+    queries = None
+    if jd is None:
+        registered = get_jd(jd_id)
+        if registered is None:
+            return jd_not_found(jd_id)
+        jd, queries = registered.text, registered.queries
+    
+    try:
+        if queries is None:
+            queries = await run_in_threadpool(encode_job, embed_model, jd)
+        query = queries[0]
+        matches = get_resume_index().search(query, max(1, k))
+        return {
+            "total_indexed": len(get_resume_index()),
+            "results": [
+                dict(metadata, resume_id=resume_id, similarity=round(score * 100, 2))
+                for resume_id, score, metadata in matches
+            ]
+        }
+    except Exception as e:
+        print(f"Error in search_resumes: {e}")
+        return JSONResponse(status_code=500, content={"error": f"Error searching resumes: {str(e)}"})
+
+
 @app.get("/ranked-results")
-async def get_ranked_results():
+async def get_ranked_results(
+    jd_id: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    label: Optional[str] = None
+):
+    # Best-first ranking for a JD; with limit, the X-Next-Cursor response
+    # header carries the cursor of the next page when there is one.
     try:
-        if not os.path.exists(RESULT_PATH):
+        jd = get_jd(jd_id)
+        if jd_id is not None and jd is None:
+            return jd_not_found(jd_id)
+        if limit is not None and limit < 1:
+            return JSONResponse(status_code=400, content={"error": "limit must be at least 1."})
+        
+        store = get_results_store()
+        filtered = any(value is not None for value in (cursor, min_score, max_score, label))
+        if jd is None or (not filtered and store.count(jd.id) == 0):
             # For testing, return dummy data if no results exist
             dummy_results = [
                 {
@@ -268,10 +816,14 @@ async def get_ranked_results():
             ]
             return dummy_results
         
-        with open(RESULT_PATH, "r", encoding="utf-8") as f:
-            results = json.load(f)
-        
-        return results
+        try:
+            results, next_cursor = await run_in_threadpool(
+                store.query, jd.id, limit, cursor, min_score, max_score, label
+            )
+        except ValueError as e:
+            return JSONResponse(status_code=400, content={"error": str(e)})
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        return JSONResponse(content=results, headers=headers)
     except Exception as e:
         print(f"Error in get_ranked_results: {e}")
         return JSONResponse(status_code=500, content={"error": f"Error retrieving results: {str(e)}"})
@@ -284,15 +836,21 @@ async def root():
         "status": "API is running", 
         "models_loaded": {
             "pdfplumber": PDF_AVAILABLE,
-            "spacy": nlp is not None,
-            "sentence_transformer": embed_model is not None,
-            "tensorflow": TENSORFLOW_AVAILABLE,
-            "bilstm": bilstm_model is not None,
-            "tokenizer": tokenizer is not None
-        }
+            "skill_taxonomy": len(skill_lexicon) > 0,
+            "sentence_transformer": models.is_loaded("sentence_transformer"),
+            "tensorflow": importlib.util.find_spec("tensorflow") is not None,
+            "bilstm": models.is_loaded("bilstm_model"),
+            "tokenizer": models.is_loaded("bilstm_tokenizer")
+        },
+        "embedding_cache": embedding_cache_stats()
     }
 
 
+def embedding_cache_stats():
+    cache = get_embedding_cache()
+    return cache.stats() if cache is not None else None
+
+
 # If you're running this file directly
 if __name__ == "__main__":
     import uvicorn
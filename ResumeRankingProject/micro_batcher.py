@@ -0,0 +1,140 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import APIRouter
+
+# === Configuration ===
+MAX_BATCH_SIZE = int(os.getenv("MICRO_BATCH_MAX_SIZE", "32"))
+MAX_WAIT_MS = float(os.getenv("MICRO_BATCH_MAX_WAIT_MS", "5"))
+
+# Every batcher created in this process, by name, for the stats endpoint
+BATCHERS = {}
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-item requests into batched model calls.
+
+    Callers await submit(item). A background task collects items until
+    max_batch_size are queued or max_wait_ms has passed since the first
+    one, runs batch_fn(items) -> results on a dedicated worker thread
+    (off the event loop), and resolves each caller with its own result.
+    """
+
+    def __init__(self, name, batch_fn, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        # One thread: model objects are called from a single thread only
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"batcher-{name}")
+        self._queue = None
+        self._loop = None
+        self._worker = None
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self.max_queue_depth = 0
+        self.batch_size_histogram = {}
+        self.total_batch_seconds = 0.0
+        BATCHERS[name] = self
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            # (Re)start when first used or when running under a new event loop
+            if self._loop is not loop or self._worker is None or self._worker.done():
+                self._loop = loop
+                self._queue = asyncio.Queue()
+                self._worker = loop.create_task(self._run())
+
+    async def submit(self, item):
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self._queue.put_nowait((item, future))
+        self.requests += 1
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return await future
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            # Callers that went away (client disconnect) are dropped before the model runs
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if not batch:
+                continue
+            items = [item for item, _ in batch]
+
+            started = time.perf_counter()
+            try:
+                results = await self._loop.run_in_executor(self._executor, self.batch_fn, items)
+            except Exception as e:
+                self.errors += 1
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            finally:
+                self.batches += 1
+                self.total_batch_seconds += time.perf_counter() - started
+                self.batch_size_histogram[len(batch)] = self.batch_size_histogram.get(len(batch), 0) + 1
+
+            if results is None or len(results) != len(batch):
+                # A short result list would leave the unmatched callers waiting forever
+                self.errors += 1
+                error = RuntimeError(
+                    f"{self.name}: batch_fn returned {0 if results is None else len(results)} results "
+                    f"for {len(batch)} items"
+                )
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def stats(self):
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "requests": self.requests,
+            "batches": self.batches,
+            "errors": self.errors,
+            "mean_batch_size": round(
+                sum(size * count for size, count in self.batch_size_histogram.items()) / self.batches, 2
+            ) if self.batches else 0.0,
+            "mean_batch_ms": round(1000 * self.total_batch_seconds / self.batches, 2) if self.batches else 0.0,
+            "batch_size_histogram": dict(sorted(self.batch_size_histogram.items())),
+        }
+
+
+# === FastAPI Router ===
+router = APIRouter()
+
+@router.get("/micro-batch-stats")
+async def micro_batch_stats():
+    return {name: batcher.stats() for name, batcher in BATCHERS.items()}
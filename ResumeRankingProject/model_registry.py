@@ -0,0 +1,390 @@
+import gc
+import hashlib
+import os
+import pickle
+import threading
+import time
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from tflite_backend import exported_path
+
+# === Configuration ===
+# Load every registered model in a background thread once the server is up
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "1") == "1"
+# preload() also loads models that are not fork-safe (TensorFlow/Keras)
+MODEL_PRELOAD_ALL = os.getenv("MODEL_PRELOAD_ALL", "0") == "1"
+# BiLSTM runtime: "auto" serves the TFLite export (export_bilstm.py) when it
+# exists and loads, and the Keras .h5 otherwise; "tflite" or "keras" force one
+BILSTM_BACKEND = os.getenv("BILSTM_BACKEND", "auto")
+
+NOT_LOADED = "not_loaded"
+LOADING = "loading"
+LOADED = "loaded"
+UNAVAILABLE = "unavailable"  # library or model file missing; callers use their fallback
+FAILED = "failed"
+SETTLED_STATES = {LOADED, UNAVAILABLE, FAILED}
+
+
+# === Memory accounting (Linux /proc; None elsewhere) ===
+def current_rss():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def process_memory():
+    """RSS split into pages shared with other workers and pages private to this one."""
+    memory = {"pid": os.getpid(), "rss_bytes": current_rss()}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line and not line.startswith(" "))
+    except OSError:
+        return memory
+
+    def kb(name):
+        return int(fields[name].split()[0]) * 1024 if name in fields else None
+
+    memory.update(
+        pss_bytes=kb("Pss"),
+        shared_bytes=(kb("Shared_Clean") or 0) + (kb("Shared_Dirty") or 0),
+        private_bytes=(kb("Private_Clean") or 0) + (kb("Private_Dirty") or 0),
+    )
+    return memory
+
+
+class ModelEntry:
+    def __init__(self, name, loader, warm=True):
+        self.name = name
+        self.loader = loader
+        self.warm = warm  # loaded by warm_up()/preload(); otherwise only on first get()
+        self.state = NOT_LOADED
+        self.value = None
+        self.error = None
+        self.load_seconds = None
+        self.loaded_at = None
+        self.rss_bytes = None  # growth of process RSS while this model loaded
+        self.shared_with = None  # entry that already held the same artifact
+        self.loaded_in_pid = None
+        self.artifact = None  # "<kind>:<content hash>" of the loaded file, when the loader has one
+
+    def snapshot(self):
+        return {
+            "state": self.state,
+            "load_seconds": round(self.load_seconds, 3) if self.load_seconds is not None else None,
+            "loaded_at": self.loaded_at,
+            "rss_bytes": self.rss_bytes,
+            "shared_with": self.shared_with,
+            "preloaded": self.loaded_in_pid is not None and self.loaded_in_pid != os.getpid(),
+            "error": self.error,
+        }
+
+
+class FileLoader:
+    """Loader for a model stored in one file, identified by its content.
+
+    Registry entries whose files have identical bytes (e.g. copies of the
+    same tokenizer under different directories) share one loaded object.
+    """
+
+    def __init__(self, path, load_fn, kind, fork_safe=True):
+        self.path = path
+        self.load_fn = load_fn
+        self.kind = kind
+        self.fork_safe = fork_safe
+        self._digest = None  # (mtime_ns, size, sha256) of the last hashed file
+
+    def available(self):
+        return os.path.exists(self.path)
+
+    def artifact_key(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        if self._digest is None or self._digest[:2] != (stat.st_mtime_ns, stat.st_size):
+            digest = hashlib.sha256()
+            with open(self.path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+            self._digest = (stat.st_mtime_ns, stat.st_size, digest.hexdigest())
+        return (self.kind, self._digest[2])
+
+    def __call__(self):
+        if not os.path.exists(self.path):
+            return None
+        return self.load_fn(self.path)
+
+
+class FirstAvailableLoader:
+    """Loads the first of several FileLoaders that loads successfully.
+
+    Loaders whose file is missing are skipped, and one whose load raises
+    (e.g. a TFLite export needing Flex ops the runtime lacks) falls back
+    to the next. The error of the last one is raised if none loads.
+    """
+
+    def __init__(self, *loaders):
+        self.loaders = loaders
+        self.loaded = None  # the loader whose model was returned
+
+    def _choice(self):
+        if self.loaded is not None:
+            return self.loaded
+        return next((loader for loader in self.loaders if os.path.exists(loader.path)), None)
+
+    @property
+    def fork_safe(self):
+        choice = self._choice()
+        return choice is None or choice.fork_safe
+
+    def available(self):
+        return self._choice() is not None
+
+    def artifact_key(self):
+        choice = self._choice()
+        return choice.artifact_key() if choice is not None else None
+
+    def __call__(self):
+        error = None
+        for loader in self.loaders:
+            try:
+                value = loader()
+            except Exception as e:
+                print(f"Loading {loader.path} failed ({e}); trying the next model file")
+                error = e
+                continue
+            if value is not None:
+                self.loaded = loader
+                return value
+        if error is not None:
+            raise error
+        return None
+
+
+class ModelRegistry:
+    """Process-wide registry of named models, each loaded at most once.
+
+    loader() imports its heavy library and returns the model, or None when
+    the model file does not exist. An ImportError or a None result marks
+    the model unavailable and any other exception marks it failed; get()
+    then returns None so callers keep their existing fallbacks.
+
+    Loads are serialized, so the RSS growth recorded per model is not
+    mixed with another model's. Calling preload() in a server's master
+    process before it forks workers (gunicorn --preload) lets every worker
+    share the loaded weights copy-on-write instead of loading its own copy.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._artifacts = {}  # artifact key -> name of the entry that loaded it
+        self._lock = threading.Lock()
+        self._load_lock = threading.RLock()
+        self._warm_up_thread = None
+
+    def register(self, name, loader, warm=True):
+        # Modules sharing a model register it under the same name; the first loader wins.
+        # warm=False keeps a model out of warm-up and preload: it loads on first use only.
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = ModelEntry(name, loader, warm)
+
+    def get(self, name):
+        entry = self._entries[name]
+        if entry.state not in SETTLED_STATES:
+            with self._load_lock:
+                if entry.state not in SETTLED_STATES:
+                    self._load(entry)
+        return entry.value
+
+    def artifact_version(self, *names):
+        """Combined artifact keys of the named models (loading them), or None if any is not loaded."""
+        artifacts = []
+        for name in names:
+            self.get(name)
+            artifact = self._entries[name].artifact
+            if artifact is None:
+                return None
+            artifacts.append(artifact)
+        return "+".join(artifacts)
+
+    def is_loaded(self, name):
+        entry = self._entries.get(name)
+        return entry is not None and entry.state == LOADED
+
+    def _load(self, entry):
+        entry.state = LOADING
+        start = time.perf_counter()
+        rss_before = current_rss()
+        key = None
+        try:
+            artifact_key = getattr(entry.loader, "artifact_key", None)
+            key = artifact_key() if artifact_key is not None else None
+            owner = self._entries.get(self._artifacts.get(key)) if key is not None else None
+            if owner is not None and owner.state == LOADED:
+                entry.value = owner.value
+                entry.shared_with = owner.name
+            else:
+                entry.value = entry.loader()
+            entry.state = LOADED if entry.value is not None else UNAVAILABLE
+            if entry.value is None:
+                entry.error = "model file not found"
+        except ImportError as e:
+            entry.state = UNAVAILABLE
+            entry.error = str(e)
+        except Exception as e:
+            entry.state = FAILED
+            entry.error = str(e)
+        entry.load_seconds = time.perf_counter() - start
+        entry.loaded_at = time.time()
+        entry.loaded_in_pid = os.getpid()
+        rss_after = current_rss()
+        if rss_before is not None and rss_after is not None:
+            entry.rss_bytes = max(0, rss_after - rss_before)
+        if entry.state == LOADED and entry.shared_with is None and artifact_key is not None:
+            # A fallback loader may have loaded another file than the one keyed up front
+            key = artifact_key()
+        if entry.state == LOADED and key is not None:
+            entry.artifact = f"{key[0]}:{key[1][:16]}"
+            if entry.shared_with is None:
+                self._artifacts[key] = entry.name
+        if entry.shared_with is not None:
+            print(f"Model {entry.name} shares the artifact loaded by {entry.shared_with}")
+        elif entry.state == LOADED:
+            print(f"Model {entry.name} loaded in {entry.load_seconds:.2f}s")
+        else:
+            print(f"Model {entry.name} {entry.state}: {entry.error}")
+
+    def status(self):
+        with self._lock:
+            entries = list(self._entries.values())
+        return {entry.name: entry.snapshot() for entry in entries}
+
+    def memory(self):
+        return {
+            "process": process_memory(),
+            "models": {name: snapshot["rss_bytes"] for name, snapshot in self.status().items()},
+        }
+
+    def ready(self):
+        # Without warm-up, models load on demand and the replica is ready at once
+        if not MODEL_WARMUP:
+            return True
+        with self._lock:
+            entries = list(self._entries.values())
+        return all(entry.state in SETTLED_STATES for entry in entries if entry.warm)
+
+    def warm_up(self):
+        with self._lock:
+            names = [name for name, entry in self._entries.items() if entry.warm]
+        for name in names:
+            self.get(name)
+
+    def start_warm_up(self):
+        """Load every registered model in a daemon thread; returns immediately."""
+        with self._lock:
+            if self._warm_up_thread is not None:
+                return
+            self._warm_up_thread = threading.Thread(target=self.warm_up, name="model-warm-up", daemon=True)
+        self._warm_up_thread.start()
+
+    def preload(self):
+        """Load models in the calling (pre-fork) process, then freeze the heap.
+
+        Loaders marked fork_safe=False (TensorFlow starts thread pools that
+        do not survive fork) are skipped unless MODEL_PRELOAD_ALL=1; workers
+        load those themselves. gc.freeze() keeps the collector from writing
+        to the preloaded objects, which would otherwise un-share their pages.
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+        for entry in entries:
+            if not entry.warm:
+                continue
+            if MODEL_PRELOAD_ALL or getattr(entry.loader, "fork_safe", True):
+                self.get(entry.name)
+        gc.collect()
+        gc.freeze()
+
+
+registry = ModelRegistry()
+
+
+# === Loaders ===
+def load_sentence_transformer():
+    from onnx_encoder import EMBED_BACKEND, ONNX_MODEL_DIR, load_onnx_encoder
+    if EMBED_BACKEND == "onnx":
+        encoder = load_onnx_encoder()
+        if encoder is not None:
+            return encoder
+        print(f"No exported encoder in {ONNX_MODEL_DIR} (run export_encoder.py); using PyTorch")
+    from sentence_transformers import SentenceTransformer
+    from scoring_engine import EMBED_MODEL_NAME
+    return SentenceTransformer(EMBED_MODEL_NAME)
+
+
+def _load_keras_model(path):
+    from tensorflow.keras.models import load_model
+    return load_model(path)
+
+
+def _load_tflite_model(path):
+    from tflite_backend import load_tflite_model
+    return load_tflite_model(path)
+
+
+def _load_pickle(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def keras_model_loader(path):
+    return FileLoader(path, _load_keras_model, "keras", fork_safe=False)
+
+
+def bilstm_model_loader(path):
+    """Loader for a Keras BiLSTM .h5 that honours BILSTM_BACKEND."""
+    keras = keras_model_loader(path)
+    # The interpreter's thread pool is not fork-safe either
+    tflite = FileLoader(exported_path(path), _load_tflite_model, "tflite", fork_safe=False)
+    if BILSTM_BACKEND == "keras":
+        return keras
+    if BILSTM_BACKEND == "tflite":
+        return tflite
+    return FirstAvailableLoader(tflite, keras)
+
+
+def pickle_loader(path):
+    return FileLoader(path, _load_pickle, "pickle")
+
+
+registry.register("sentence_transformer", load_sentence_transformer)
+
+
+# === Health endpoints ===
+router = APIRouter()
+
+
+@router.get("/health/live")
+async def health_live():
+    # Never touches a model, so it answers as soon as the port is bound
+    return {"status": "alive"}
+
+
+@router.get("/health/ready")
+async def health_ready():
+    ready = registry.ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "loading", "models": registry.status()},
+    )
+
+
+@router.get("/health/memory")
+async def health_memory():
+    # Per-model RSS growth at load time plus this worker's shared/private split
+    return registry.memory()
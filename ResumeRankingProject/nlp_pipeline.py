@@ -0,0 +1,73 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from model_registry import registry as models
+
+# === Configuration ===
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+SPACY_BATCH_SIZE = int(os.getenv("SPACY_BATCH_SIZE", "64"))
+SPACY_N_PROCESS = int(os.getenv("SPACY_N_PROCESS", "1"))  # >1 forks nlp.pipe workers for bulk ingestion
+SPACY_CACHE_SIZE = int(os.getenv("SPACY_CACHE_SIZE", "10000"))
+
+# Only POS tags are read: tok2vec, tagger and attribute_ruler produce them,
+# so the dependency parser, NER and lemmatizer are never even loaded.
+SPACY_EXCLUDE = ["parser", "ner", "lemmatizer"]
+SKILL_POS_TAGS = {"NOUN", "PROPN"}
+
+
+def load_tagger():
+    import spacy
+    return spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE)
+
+
+models.register("spacy_tagger", load_tagger)
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cache_key(text):
+    return hashlib.sha1(text.encode("utf-8")).digest()
+
+
+def extract_noun_tokens(texts, batch_size=SPACY_BATCH_SIZE, n_process=SPACY_N_PROCESS):
+    """NOUN/PROPN token texts of each text, as one frozenset per input.
+
+    Texts seen before are answered from an LRU cache keyed by content
+    hash; the rest go through nlp.pipe in batches in a single call.
+    """
+    keys = [_cache_key(text) for text in texts]
+    results = [None] * len(texts)
+    with _cache_lock:
+        for i, key in enumerate(keys):
+            tokens = _cache.get(key)
+            if tokens is not None:
+                _cache.move_to_end(key)
+                results[i] = tokens
+
+    misses = {}
+    for i, tokens in enumerate(results):
+        if tokens is None:
+            misses.setdefault(keys[i], []).append(i)
+    if not misses:
+        return results
+
+    nlp = models.get("spacy_tagger")
+    if nlp is None:
+        raise RuntimeError(f"spaCy model {SPACY_MODEL} not available")
+    miss_texts = [texts[positions[0]] for positions in misses.values()]
+    token_sets = [
+        frozenset(token.text for token in doc if token.pos_ in SKILL_POS_TAGS)
+        for doc in nlp.pipe(miss_texts, batch_size=batch_size, n_process=n_process)
+    ]
+
+    with _cache_lock:
+        for (key, positions), tokens in zip(misses.items(), token_sets):
+            for i in positions:
+                results[i] = tokens
+            _cache[key] = tokens
+        while len(_cache) > SPACY_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return results
@@ -0,0 +1,160 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+# === Configuration ===
+# "torch": SentenceTransformer on PyTorch; "onnx": the export written by
+# export_encoder.py, run by onnxruntime (falls back to torch when missing)
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch")
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join("saved_models", "minilm_onnx"))
+ONNX_QUANTIZED = os.getenv("ONNX_QUANTIZED", "1") == "1"  # serve model.int8.onnx when exported
+ONNX_NUM_THREADS = int(os.getenv("ONNX_NUM_THREADS", "0"))  # 0 = onnxruntime default
+# Batches are padded up to the smallest bucket that fits their longest text,
+# so the runtime sees a handful of input shapes instead of one per batch
+ONNX_LENGTH_BUCKETS = [int(n) for n in os.getenv("ONNX_LENGTH_BUCKETS", "16,32,64,128").split(",")]
+
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model.int8.onnx"
+CONFIG_FILE = "encoder.json"
+TOKENIZER_FILE = "tokenizer.json"
+
+
+def export_encoder(model_name, out_dir=ONNX_MODEL_DIR, quantize=True, opset=14):
+    """Export a SentenceTransformer (transformer + mean pooling) to out_dir.
+
+    Writes the transformer graph with dynamic batch and sequence axes, its
+    dynamic int8 quantization, the fast tokenizer and the pooling config.
+    Needs torch, sentence_transformers and (for quantize) onnxruntime.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    st = SentenceTransformer(model_name, device="cpu")
+    pooling = st[1]
+    if not getattr(pooling, "pooling_mode_mean_tokens", False) or len(st) != 2:
+        raise ValueError(f"{model_name} is not a transformer + mean pooling model")
+    transformer = st[0].auto_model.eval()
+    tokenizer = st.tokenizer
+
+    os.makedirs(out_dir, exist_ok=True)
+    sample = tokenizer(["export the sentence encoder"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]}
+    model_path = os.path.join(out_dir, MODEL_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            tuple(sample[name] for name in input_names),
+            model_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+    tokenizer.save_pretrained(out_dir)
+    with open(os.path.join(out_dir, CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump({"model_name": model_name, "max_seq_length": st.max_seq_length, "pooling": "mean"}, f)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(model_path, os.path.join(out_dir, QUANTIZED_MODEL_FILE), weight_type=QuantType.QInt8)
+    return out_dir
+
+
+class OnnxSentenceEncoder:
+    """SentenceTransformer.encode() on an exported graph, without PyTorch.
+
+    Texts are tokenized by the Rust tokenizers library, sorted by length
+    and run in batches padded to a length bucket; token embeddings are
+    mean-pooled over the attention mask exactly like the Pooling module.
+    The onnxruntime session is created on first use in each process, so a
+    pre-fork master never starts thread pools that its workers inherit.
+    """
+
+    def __init__(self, model_dir=ONNX_MODEL_DIR, quantized=ONNX_QUANTIZED, num_threads=ONNX_NUM_THREADS,
+                 buckets=ONNX_LENGTH_BUCKETS):
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(model_dir, CONFIG_FILE), "r", encoding="utf-8") as f:
+            config = json.load(f)
+        quantized_path = os.path.join(model_dir, QUANTIZED_MODEL_FILE)
+        self.quantized = quantized and os.path.exists(quantized_path)
+        self.model_path = quantized_path if self.quantized else os.path.join(model_dir, MODEL_FILE)
+        self.max_seq_length = config["max_seq_length"]
+        # Embedding-cache namespace: vectors from this graph are close to, not equal to, PyTorch's
+        self.cache_name = f"{config['model_name']}:onnx" + ("-int8" if self.quantized else "")
+        self.buckets = sorted({min(b, self.max_seq_length) for b in buckets} | {self.max_seq_length})
+        self.num_threads = num_threads
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.no_padding()
+        self.tokenizer.enable_truncation(max_length=self.max_seq_length)
+        self.pad_id = self.tokenizer.token_to_id("[PAD]") or 0
+
+        self._session = None
+        self._session_pid = None
+        self._lock = threading.Lock()
+
+    def session(self):
+        if self._session is None or self._session_pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._session_pid != os.getpid():
+                    import onnxruntime as ort
+
+                    options = ort.SessionOptions()
+                    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+                    if self.num_threads:
+                        options.intra_op_num_threads = self.num_threads
+                    self._session = ort.InferenceSession(
+                        self.model_path, options, providers=["CPUExecutionProvider"]
+                    )
+                    self._input_names = {i.name for i in self._session.get_inputs()}
+                    self._session_pid = os.getpid()
+        return self._session
+
+    def bucket(self, length):
+        return next((b for b in self.buckets if b >= length), self.max_seq_length)
+
+    def _run(self, encodings):
+        length = self.bucket(max(len(encoding.ids) for encoding in encodings))
+        input_ids = np.full((len(encodings), length), self.pad_id, dtype=np.int64)
+        attention_mask = np.zeros((len(encodings), length), dtype=np.int64)
+        token_type_ids = np.zeros((len(encodings), length), dtype=np.int64)
+        for row, encoding in enumerate(encodings):
+            n = len(encoding.ids)
+            input_ids[row, :n] = encoding.ids
+            attention_mask[row, :n] = encoding.attention_mask
+            token_type_ids[row, :n] = encoding.type_ids
+        session = self.session()
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask, "token_type_ids": token_type_ids}
+        hidden = session.run(None, {name: value for name, value in feeds.items() if name in self._input_names})[0]
+        mask = attention_mask[:, :, None].astype(np.float32)
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, normalize_embeddings=False,
+               show_progress_bar=False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        encodings = self.tokenizer.encode_batch(texts)
+        # Longest first, like SentenceTransformer, so each batch pads to a tight bucket
+        order = sorted(range(len(texts)), key=lambda i: -len(encodings[i].ids))
+        embeddings = None
+        for start in range(0, len(order), batch_size):
+            rows = order[start:start + batch_size]
+            pooled = self._run([encodings[i] for i in rows])
+            if embeddings is None:
+                embeddings = np.empty((len(texts), pooled.shape[1]), dtype=np.float32)
+            embeddings[rows] = pooled
+        if normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings[0] if single else embeddings
+
+
+def load_onnx_encoder(model_dir=ONNX_MODEL_DIR):
+    if not os.path.exists(os.path.join(model_dir, CONFIG_FILE)):
+        return None
+    return OnnxSentenceEncoder(model_dir)
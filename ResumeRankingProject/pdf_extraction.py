@@ -0,0 +1,153 @@
+import asyncio
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import pdfplumber
+    PDF_AVAILABLE = True
+except ImportError:
+    PDF_AVAILABLE = False
+    print("pdfplumber not available - PDF processing disabled")
+
+# === Limits ===
+MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "50"))  # pages read per file
+MAX_SECONDS = float(os.getenv("PDF_MAX_SECONDS", "30"))  # wall time per file
+WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+# "fork" keeps workers cheap: spawn/forkserver children re-import __main__,
+# which for `python main.py` would load every model again in each worker.
+# The apps fork the pool at startup (start_pool), before any other thread runs.
+START_METHOD = os.getenv("PDF_START_METHOD", "fork")
+
+
+class ExtractionTimeout(Exception):
+    pass
+
+
+def iter_pdf_pages(file_path, max_pages=MAX_PAGES, deadline=None):
+    """Yield the text of each non-empty page, parsing one page at a time.
+
+    Every page is extracted once and its layout objects are released
+    before the next page is opened, so only one page is alive at a time.
+    """
+    with pdfplumber.open(file_path, pages=range(1, max_pages + 1)) as pdf:
+        for page in pdf.pages:
+            if deadline is not None and time.monotonic() > deadline:
+                print(f"PDF time cap reached for {file_path}, keeping pages read so far")
+                break
+            text = page.extract_text()
+            page.close()
+            if text:
+                yield text
+
+
+def extract_text_from_pdf(file_path, max_pages=MAX_PAGES, max_seconds=MAX_SECONDS):
+    if not PDF_AVAILABLE:
+        return "PDF processing not available"
+
+    texts = []
+    try:
+        for text in iter_pdf_pages(file_path, max_pages, time.monotonic() + max_seconds):
+            texts.append(text)
+    except ExtractionTimeout:
+        print(f"PDF extraction timed out after {max_seconds}s: {file_path}")
+    except Exception as e:
+        print(f"Error extracting text from PDF: {e}")
+        return ""
+    return "\n".join(texts)
+
+
+def _on_alarm(signum, frame):
+    raise ExtractionTimeout()
+
+
+def _extract_in_worker(file_path, max_pages, max_seconds):
+    # Pool workers run tasks on their main thread, so a real-time alarm can
+    # interrupt a single pathological page that ignores the soft deadline.
+    if hasattr(signal, "setitimer"):
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, max_seconds + 1)
+    try:
+        return extract_text_from_pdf(file_path, max_pages, max_seconds)
+    finally:
+        if hasattr(signal, "setitimer"):
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+# === Process pool ===
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                method = START_METHOD
+                if method not in multiprocessing.get_all_start_methods():
+                    method = "spawn"
+                context = multiprocessing.get_context(method)
+                _pool = ProcessPoolExecutor(max_workers=WORKERS, mp_context=context)
+    return _pool
+
+
+def start_pool():
+    """Create the pool and its workers now, while the process has no other threads.
+
+    Called at startup before the model warm-up thread starts: forking from
+    a process that already runs threads (warm-up, ranking jobs, torch/TF
+    pools) can hand the children locks that were held at fork time. With
+    "fork", ProcessPoolExecutor starts all its workers on the first task.
+    """
+    pool = get_pool()
+    pool.submit(os.getpid).result()
+    return pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+async def extract_text_async(file_path, max_pages=MAX_PAGES, max_seconds=MAX_SECONDS):
+    """Extract one PDF on the process pool without blocking the event loop."""
+    if not PDF_AVAILABLE:
+        return "PDF processing not available"
+    loop = asyncio.get_running_loop()
+    try:
+        # The time cap is enforced inside the worker, so queueing behind other
+        # files in a large batch does not count against this file.
+        return await loop.run_in_executor(get_pool(), _extract_in_worker, file_path, max_pages, max_seconds)
+    except Exception as e:
+        print(f"Error extracting text from PDF: {e}")
+        return ""
+
+
+async def extract_texts_async(file_paths, max_pages=MAX_PAGES, max_seconds=MAX_SECONDS):
+    """Extract many PDFs in parallel across the pool; results keep the input order."""
+    return await asyncio.gather(
+        *(extract_text_async(path, max_pages, max_seconds) for path in file_paths)
+    )
+
+
+def extract_texts(file_paths, max_pages=MAX_PAGES, max_seconds=MAX_SECONDS):
+    """Blocking counterpart of extract_texts_async for scripts and worker threads."""
+    if not PDF_AVAILABLE:
+        return ["PDF processing not available" for _ in file_paths]
+    pool = get_pool()
+    futures = [pool.submit(_extract_in_worker, path, max_pages, max_seconds) for path in file_paths]
+    texts = []
+    for path, future in zip(file_paths, futures):
+        try:
+            texts.append(future.result())
+        except Exception as e:
+            print(f"Error extracting text from PDF {path}: {e}")
+            texts.append("")
+    return texts
@@ -0,0 +1,351 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# === Configuration ===
+JOB_WORKERS = int(os.getenv("RANKING_JOB_WORKERS", "2"))
+JOB_CHUNK_SIZE = int(os.getenv("RANKING_JOB_CHUNK_SIZE", "32"))  # files scored per batch
+MAX_FINISHED_JOBS = int(os.getenv("RANKING_JOB_HISTORY", "100"))
+JOB_DB_PATH = os.getenv("RANKING_JOB_DB_PATH", os.path.join("cache", "ranking_jobs.sqlite3"))
+# Workers refresh their unfinished jobs' heartbeat this often; a queued or
+# running job whose heartbeat is older than JOB_STALE_SECONDS belongs to a
+# worker that died and is marked failed.
+JOB_HEARTBEAT_SECONDS = float(os.getenv("RANKING_JOB_HEARTBEAT_SECONDS", "10"))
+JOB_STALE_SECONDS = float(os.getenv("RANKING_JOB_STALE_SECONDS", "60"))
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = {COMPLETED, FAILED, CANCELLED}
+STALE_JOB_ERROR = "worker stopped before the job finished"
+
+
+class RankingJob:
+    """A job as held by the worker process that runs it."""
+
+    def __init__(self, jd, files):
+        self.id = uuid.uuid4().hex
+        # The job description being ranked against (opaque to the manager)
+        self.jd = jd
+        # files: list of (filename, saved path)
+        self.files = [{"filename": filename, "path": path, "status": QUEUED} for filename, path in files]
+        self.results = []
+        self.created_at = time.time()
+
+
+class JobStore:
+    """Job status, per-file progress, partial results and cancel requests.
+
+    SQLite in WAL mode next to the results store, so every uvicorn or
+    gunicorn worker sees the jobs that any of them accepted: status and
+    cancel requests work whichever worker a request lands on, while the
+    job itself runs in the worker that accepted it. That worker's pid and
+    heartbeat are recorded per job; jobs left queued or running by a dead
+    worker are marked failed when the store opens and when they are read.
+    """
+
+    def __init__(self, path=JOB_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                jd_id TEXT,
+                status TEXT NOT NULL,
+                error TEXT,
+                cancel_requested INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                owner_pid INTEGER,
+                heartbeat_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS job_files (
+                job_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                filename TEXT NOT NULL,
+                status TEXT NOT NULL,
+                PRIMARY KEY (job_id, position)
+            );
+            CREATE TABLE IF NOT EXISTS job_results (
+                job_id TEXT NOT NULL,
+                final_ats_score REAL NOT NULL,
+                record TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_job_results_score ON job_results (job_id, final_ats_score DESC);
+            """
+        )
+        # Job tables created before owners were recorded
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, kind in (("owner_pid", "INTEGER"), ("heartbeat_at", "REAL")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        self._conn.commit()
+        self.fail_stale()
+
+    def create(self, job, jd_id):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, jd_id, status, created_at, owner_pid, heartbeat_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job.id, jd_id, QUEUED, job.created_at, os.getpid(), time.time()),
+            )
+            self._conn.executemany(
+                "INSERT INTO job_files (job_id, position, filename, status) VALUES (?, ?, ?, ?)",
+                [(job.id, i, f["filename"], QUEUED) for i, f in enumerate(job.files)],
+            )
+
+    def start(self, job_id):
+        """Mark a queued job running; False when it was cancelled first."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ?, heartbeat_at = ?"
+                " WHERE job_id = ? AND status = ? AND cancel_requested = 0",
+                (RUNNING, time.time(), time.time(), job_id, QUEUED),
+            )
+            return cursor.rowcount == 1
+
+    def heartbeat(self, pid=None):
+        """Refresh the heartbeat of every unfinished job owned by this process."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE owner_pid = ? AND status IN (?, ?)",
+                (time.time(), pid if pid is not None else os.getpid(), QUEUED, RUNNING),
+            )
+
+    def fail_stale(self, job_ids=None, stale_seconds=JOB_STALE_SECONDS):
+        """Mark queued/running jobs whose owner stopped heartbeating as failed."""
+        query = "SELECT job_id FROM jobs WHERE status IN (?, ?) AND (heartbeat_at IS NULL OR heartbeat_at < ?)"
+        params = [QUEUED, RUNNING, time.time() - stale_seconds]
+        if job_ids is not None:
+            query += f" AND job_id IN ({', '.join('?' * len(job_ids))})"
+            params.extend(job_ids)
+        with self._lock:
+            stale = [row[0] for row in self._conn.execute(query, params)]
+        for job_id in stale:
+            print(f"Ranking job {job_id} lost its worker; marking it failed")
+            self.finish(job_id, FAILED, STALE_JOB_ERROR)
+        return stale
+
+    def set_file_status(self, job_id, positions, status):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE job_files SET status = ? WHERE job_id = ? AND position = ?",
+                [(status, job_id, position) for position in positions],
+            )
+
+    def add_results(self, job_id, records, positions):
+        # One transaction, so a chunk's results and its COMPLETED files appear together
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO job_results (job_id, final_ats_score, record) VALUES (?, ?, ?)",
+                [(job_id, record["final_ats_score"], json.dumps(record)) for record in records],
+            )
+            self._conn.executemany(
+                "UPDATE job_files SET status = ? WHERE job_id = ? AND position = ?",
+                [(COMPLETED, job_id, position) for position in positions],
+            )
+
+    def request_cancel(self, job_id):
+        """Flag a job for cancellation; a job no worker has started is cancelled outright."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE job_id = ? AND status NOT IN (?, ?, ?)",
+                (job_id, *FINISHED_STATES),
+            )
+            found = cursor.rowcount == 1 or self._conn.execute(
+                "SELECT 1 FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone() is not None
+        if found:
+            self.finish(job_id, CANCELLED, only_if=QUEUED)
+        return found
+
+    def cancel_requested(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT cancel_requested FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return row is None or bool(row[0])
+
+    def finish(self, job_id, status, error=None, only_if=None):
+        with self._lock, self._conn:
+            query = "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE job_id = ?"
+            params = [status, error, time.time(), job_id]
+            if only_if is not None:
+                query += " AND status = ?"
+                params.append(only_if)
+            if self._conn.execute(query, params).rowcount == 0:
+                return
+            self._conn.execute(
+                "UPDATE job_files SET status = ? WHERE job_id = ? AND status IN (?, ?)",
+                (CANCELLED if status == CANCELLED else FAILED, job_id, QUEUED, RUNNING),
+            )
+
+    def prune(self, keep=MAX_FINISHED_JOBS):
+        with self._lock, self._conn:
+            stale = [row[0] for row in self._conn.execute(
+                f"SELECT job_id FROM jobs WHERE status IN ({', '.join('?' * len(FINISHED_STATES))})"
+                " ORDER BY finished_at DESC LIMIT -1 OFFSET ?",
+                (*FINISHED_STATES, keep),
+            )]
+            for table in ("job_results", "job_files", "jobs"):
+                self._conn.executemany(f"DELETE FROM {table} WHERE job_id = ?", [(job_id,) for job_id in stale])
+
+    def snapshot(self, job_id, include_results=True, top=None):
+        self.fail_stale([job_id])
+        with self._lock:
+            job = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if job is None:
+                return None
+            files = self._conn.execute(
+                "SELECT filename, status FROM job_files WHERE job_id = ? ORDER BY position", (job_id,)
+            ).fetchall()
+            results = None
+            if include_results:
+                query = "SELECT record FROM job_results WHERE job_id = ? ORDER BY final_ats_score DESC"
+                params = [job_id]
+                if top is not None:
+                    query += " LIMIT ?"
+                    params.append(top)
+                results = [json.loads(row[0]) for row in self._conn.execute(query, params)]
+
+        total = len(files)
+        processed = sum(f["status"] in (COMPLETED, FAILED) for f in files)
+        data = {
+            "job_id": job["job_id"],
+            "jd_id": job["jd_id"],
+            "status": job["status"],
+            "error": job["error"],
+            "total_files": total,
+            "processed_files": processed,
+            "progress": round(processed / total, 4) if total else 1.0,
+            "created_at": job["created_at"],
+            "started_at": job["started_at"],
+            "finished_at": job["finished_at"],
+            "owner_pid": job["owner_pid"],
+            "heartbeat_at": job["heartbeat_at"],
+            "files": [{"filename": f["filename"], "status": f["status"]} for f in files],
+        }
+        if include_results:
+            data["results"] = results
+        return data
+
+    def job_ids(self):
+        self.fail_stale()
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT job_id FROM jobs ORDER BY created_at")]
+
+
+class RankingJobManager:
+    """Run resume ranking in background worker threads.
+
+    process_chunk(jd, filenames, paths) -> list of result records is
+    called for successive chunks of a job's files, so progress and partial
+    rankings are visible while the job runs and cancellation takes effect
+    between chunks. on_complete(job) runs once a job finishes successfully,
+    and also when a running job is cancelled, with the results of the
+    chunks scored before the cancel. Job state lives in a JobStore shared
+    by all worker processes; the lookups return snapshot dicts, or None
+    for an unknown job. A daemon thread keeps this process's jobs'
+    heartbeats fresh while it is alive.
+    """
+
+    def __init__(self, process_chunk, on_complete=None, max_workers=JOB_WORKERS, chunk_size=JOB_CHUNK_SIZE,
+                 store=None):
+        self.process_chunk = process_chunk
+        self.on_complete = on_complete
+        self.chunk_size = chunk_size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ranking-job")
+        self._store = store
+        self._store_lock = threading.Lock()
+        self._heartbeat_thread = None
+
+    @property
+    def store(self):
+        # Opened on first use, so importing the app never touches the database
+        if self._store is None:
+            with self._store_lock:
+                if self._store is None:
+                    self._store = JobStore()
+        return self._store
+
+    def submit(self, jd, files):
+        job = RankingJob(jd, files)
+        self.store.create(job, getattr(jd, "id", None))
+        self.store.prune()
+        self._start_heartbeat()
+        self._executor.submit(self._run, job)
+        return job
+
+    def _start_heartbeat(self):
+        with self._store_lock:
+            if self._heartbeat_thread is not None:
+                return
+            self._heartbeat_thread = threading.Thread(target=self._beat, name="ranking-job-heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+
+    def _beat(self):
+        while True:
+            time.sleep(JOB_HEARTBEAT_SECONDS)
+            try:
+                self.store.heartbeat()
+            except Exception as e:
+                print(f"Error refreshing ranking job heartbeats: {e}")
+
+    def snapshot(self, job_id, include_results=True, top=None):
+        return self.store.snapshot(job_id, include_results, top)
+
+    def list(self):
+        return [self.store.snapshot(job_id, include_results=False) for job_id in self.store.job_ids()]
+
+    def cancel(self, job_id):
+        if not self.store.request_cancel(job_id):
+            return None
+        return self.store.snapshot(job_id, include_results=False)
+
+    def _run(self, job):
+        store = self.store
+        if not store.start(job.id):
+            return  # cancelled while queued
+        try:
+            for start in range(0, len(job.files), self.chunk_size):
+                if store.cancel_requested(job.id):
+                    self._cancel(job)
+                    return
+                positions = list(range(start, min(start + self.chunk_size, len(job.files))))
+                chunk = [job.files[i] for i in positions]
+                store.set_file_status(job.id, positions, RUNNING)
+                try:
+                    records = self.process_chunk(job.jd, [f["filename"] for f in chunk], [f["path"] for f in chunk])
+                except Exception as e:
+                    print(f"Error processing ranking job {job.id} chunk: {e}")
+                    store.set_file_status(job.id, positions, FAILED)
+                    continue
+                job.results.extend(records)
+                store.add_results(job.id, records, positions)
+            if store.cancel_requested(job.id):
+                self._cancel(job)
+                return
+            if self.on_complete is not None:
+                self.on_complete(job)
+            store.finish(job.id, COMPLETED)
+        except Exception as e:
+            print(f"Error in ranking job {job.id}: {e}")
+            store.finish(job.id, FAILED, str(e))
+
+    def _cancel(self, job):
+        # Chunks already scored are kept, like the results of a finished job
+        if job.results and self.on_complete is not None:
+            self.on_complete(job)
+        self.store.finish(job.id, CANCELLED)
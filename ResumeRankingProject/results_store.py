@@ -0,0 +1,178 @@
+import base64
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# === Configuration ===
+RESULTS_DB_PATH = os.getenv("RESULTS_DB_PATH", os.path.join("cache", "ranked_results.sqlite3"))
+
+# Columns of a ranking record stored as real columns; any other keys of a
+# record are kept in the JSON "extra" column and merged back on read.
+RESULT_COLUMNS = [
+    "resume_filename",
+    "skill_match",
+    "experience_score",
+    "soft_skills_score",
+    "adaptability_score",
+    "final_ats_score",
+    "bilstm_predicted_class",
+    "bilstm_prediction_probability",
+    "bilstm_label",
+]
+
+
+def encode_cursor(score, resume_id):
+    return base64.urlsafe_b64encode(json.dumps([score, resume_id]).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    try:
+        score, resume_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return float(score), str(resume_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+class ResultsStore:
+    """Transactional store of ranking results, one row per (JD, resume).
+
+    SQLite in WAL mode, so readers never block the writer and several
+    uvicorn workers can share the file. Rankings are read in
+    (final_ats_score DESC, resume_id ASC) order with keyset cursors,
+    served straight from the (jd_id, final_ats_score) index.
+    """
+
+    def __init__(self, path=RESULTS_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                jd_id TEXT NOT NULL,
+                resume_id TEXT NOT NULL,
+                resume_filename TEXT NOT NULL,
+                skill_match REAL,
+                experience_score REAL,
+                soft_skills_score REAL,
+                adaptability_score REAL,
+                final_ats_score REAL NOT NULL,
+                bilstm_predicted_class INTEGER,
+                bilstm_prediction_probability REAL,
+                bilstm_label TEXT,
+                extra TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (jd_id, resume_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_results_score ON results (jd_id, final_ats_score DESC, resume_id);
+            CREATE INDEX IF NOT EXISTS idx_results_label ON results (jd_id, bilstm_label, final_ats_score DESC, resume_id);
+            """
+        )
+        self._conn.commit()
+
+    def upsert(self, jd_id, records):
+        """Insert or replace the given records for a JD in one transaction."""
+        now = time.time()
+        rows = []
+        for record in records:
+            extra = {key: value for key, value in record.items() if key not in RESULT_COLUMNS}
+            rows.append(
+                (jd_id, record.get("resume_id", record["resume_filename"]))
+                + tuple(record.get(column) for column in RESULT_COLUMNS)
+                + (json.dumps(extra) if extra else None, now)
+            )
+        columns = ["jd_id", "resume_id"] + RESULT_COLUMNS + ["extra", "updated_at"]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO results ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                rows,
+            )
+
+    def delete(self, jd_id, resume_ids=None):
+        with self._lock, self._conn:
+            if resume_ids is None:
+                self._conn.execute("DELETE FROM results WHERE jd_id = ?", (jd_id,))
+            else:
+                self._conn.executemany(
+                    "DELETE FROM results WHERE jd_id = ? AND resume_id = ?",
+                    [(jd_id, resume_id) for resume_id in resume_ids],
+                )
+
+    def query(self, jd_id, limit=None, cursor=None, min_score=None, max_score=None, label=None):
+        """Return (records, next_cursor) for one page of a JD's ranking, best first."""
+        clauses = ["jd_id = ?"]
+        params = [jd_id]
+        if min_score is not None:
+            clauses.append("final_ats_score >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            clauses.append("final_ats_score <= ?")
+            params.append(max_score)
+        if label is not None:
+            clauses.append("bilstm_label = ?")
+            params.append(label)
+        if cursor is not None:
+            score, resume_id = decode_cursor(cursor)
+            clauses.append("(final_ats_score < ? OR (final_ats_score = ? AND resume_id > ?))")
+            params.extend([score, score, resume_id])
+
+        sql = (
+            f"SELECT resume_id, {', '.join(RESULT_COLUMNS)}, extra FROM results"
+            f" WHERE {' AND '.join(clauses)} ORDER BY final_ats_score DESC, resume_id ASC"
+        )
+        if limit is not None:
+            # One extra row tells whether another page exists
+            sql += " LIMIT ?"
+            params.append(limit + 1)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["final_ats_score"], rows[-1]["resume_id"])
+        return [self._to_record(row) for row in rows], next_cursor
+
+    def resume_ids(self, jd_id):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT resume_id FROM results WHERE jd_id = ?", (jd_id,))]
+
+    def filenames(self, jd_id):
+        """{resume_id: resume_filename} of a JD's ranking."""
+        with self._lock:
+            return dict(self._conn.execute(
+                "SELECT resume_id, resume_filename FROM results WHERE jd_id = ?", (jd_id,)
+            ).fetchall())
+
+    def count(self, jd_id):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results WHERE jd_id = ?", (jd_id,)).fetchone()[0]
+
+    @staticmethod
+    def _to_record(row):
+        record = {column: row[column] for column in RESULT_COLUMNS}
+        if row["extra"]:
+            record.update(json.loads(row["extra"]))
+        return record
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_results_store():
+    global _default_store
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                _default_store = ResultsStore()
+    return _default_store
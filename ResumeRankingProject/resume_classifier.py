@@ -1,27 +1,32 @@
-import os
-import pickle
-import numpy as np
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.sequence import pad_sequences
 from fastapi import APIRouter
 from pydantic import BaseModel
+from bilstm_inference import CLASSIFIER_MAX_LEN, CLASSIFIER_PADDING, pad_texts, predict_labels, predict_multi_labels
+from micro_batcher import MicroBatcher
+from model_registry import bilstm_model_loader, pickle_loader, registry as models
 
-# === Load Tokenizer and Encoders ===
-with open("encoders/tokenizer.pkl", "rb") as f:
-    tokenizer = pickle.load(f)
+# === Register Tokenizer, Encoders and Trained Models (loaded on first use) ===
+models.register("classifier_tokenizer", pickle_loader("encoders/tokenizer.pkl"))
+models.register("domain_encoder", pickle_loader("encoders/domain_encoder.pkl"))
+models.register("experience_encoder", pickle_loader("encoders/experience_encoder.pkl"))
+# Optional multi-task model (CLASSIFIER_TRAIN_MODE=multitask): one shared trunk,
+# domain and experience heads; preferred over the two models when present
+profile_loader = bilstm_model_loader("models/profile_model.h5")
+models.register("profile_model", profile_loader)
+# With the multi-task model present the single-task models are never warmed
+# or preloaded, so a worker holds one classifier BiLSTM instead of three
+single_task_warm = not profile_loader.available()
+models.register("domain_model", bilstm_model_loader("models/domain_model.h5"), warm=single_task_warm)
+models.register("experience_model", bilstm_model_loader("models/experience_model.h5"), warm=single_task_warm)
 
-with open("encoders/domain_encoder.pkl", "rb") as f:
-    domain_encoder = pickle.load(f)
-
-with open("encoders/experience_encoder.pkl", "rb") as f:
-    experience_encoder = pickle.load(f)
-
-# === Load Trained Models ===
-domain_model = load_model("models/domain_model.h5")
-experience_model = load_model("models/experience_model.h5")
+def get_models(*names):
+    loaded = [models.get(name) for name in names]
+    missing = [name for name, model in zip(names, loaded) if model is None]
+    if missing:
+        raise RuntimeError(f"Models not available: {', '.join(missing)}")
+    return loaded
 
 # === Constants ===
-MAX_SEQ_LENGTH = 200
+MAX_SEQ_LENGTH = CLASSIFIER_MAX_LEN
 
 # === API Input Schema ===
 class ResumeText(BaseModel):
@@ -29,23 +34,58 @@ class ResumeText(BaseModel):
 
 # === Preprocessing Function ===
 def preprocess_text(text: str):
-    sequence = tokenizer.texts_to_sequences([text])
-    padded = pad_sequences(sequence, maxlen=MAX_SEQ_LENGTH)
-    return padded
+    tokenizer, = get_models("classifier_tokenizer")
+    return pad_texts(tokenizer, [text], MAX_SEQ_LENGTH, CLASSIFIER_PADDING)
+
+# === Batched Prediction ===
+def predict_profiles(texts):
+    """(domains, experience_levels) for texts.
+
+    One forward pass of the multi-task model when it is available,
+    otherwise one pass of each single-task model.
+    """
+    profile_model = models.get("profile_model")
+    if profile_model is not None:
+        tokenizer, domain_encoder, experience_encoder = get_models("classifier_tokenizer", "domain_encoder", "experience_encoder")
+        domains, levels = predict_multi_labels(
+            profile_model, tokenizer, [domain_encoder, experience_encoder], texts, MAX_SEQ_LENGTH, CLASSIFIER_PADDING
+        )
+        return domains, levels
+    return predict_domains(texts), predict_experience_levels(texts)
+
+def predict_domains(texts):
+    if models.get("profile_model") is not None:
+        return predict_profiles(texts)[0]
+    model, tokenizer, encoder = get_models("domain_model", "classifier_tokenizer", "domain_encoder")
+    return predict_labels(model, tokenizer, encoder, texts, MAX_SEQ_LENGTH, CLASSIFIER_PADDING)
+
+def predict_experience_levels(texts):
+    if models.get("profile_model") is not None:
+        return predict_profiles(texts)[1]
+    model, tokenizer, encoder = get_models("experience_model", "classifier_tokenizer", "experience_encoder")
+    return predict_labels(model, tokenizer, encoder, texts, MAX_SEQ_LENGTH, CLASSIFIER_PADDING)
+
+def predict_profile_batch(texts):
+    domains, levels = predict_profiles(texts)
+    return list(zip(domains, levels))
+
+# Concurrent requests are coalesced into one forward pass off the event loop
+domain_batcher = MicroBatcher("predict-domain", predict_domains)
+experience_batcher = MicroBatcher("predict-experience", predict_experience_levels)
+profile_batcher = MicroBatcher("predict-profile", predict_profile_batch)
 
 # === FastAPI Router ===
 router = APIRouter()
 
 @router.post("/predict-domain")
-def predict_domain(data: ResumeText):
-    processed = preprocess_text(data.resume_text)
-    prediction = domain_model.predict(processed)
-    label = domain_encoder.inverse_transform([np.argmax(prediction)])
-    return {"predicted_domain": label[0]}
+async def predict_domain(data: ResumeText):
+    return {"predicted_domain": await domain_batcher.submit(data.resume_text)}
 
 @router.post("/predict-experience")
-def predict_experience(data: ResumeText):
-    processed = preprocess_text(data.resume_text)
-    prediction = experience_model.predict(processed)
-    label = experience_encoder.inverse_transform([np.argmax(prediction)])
-    return {"predicted_experience_level": label[0]}
+async def predict_experience(data: ResumeText):
+    return {"predicted_experience_level": await experience_batcher.submit(data.resume_text)}
+
+@router.post("/predict-profile")
+async def predict_profile(data: ResumeText):
+    domain, experience_level = await profile_batcher.submit(data.resume_text)
+    return {"predicted_domain": domain, "predicted_experience_level": experience_level}
@@ -0,0 +1,207 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process deployments only
+    fcntl = None
+
+# === Configuration ===
+INDEX_DIR = os.getenv("RESUME_INDEX_DIR", "resume_index")
+INITIAL_CAPACITY = 1024
+SEARCH_CHUNK_ROWS = 16384  # rows upcast to float32 at a time during search
+
+
+class ResumeIndex:
+    """Persistent embedding index over every resume ever uploaded.
+
+    Vectors are unit-length float16 rows in a raw memory-mapped file
+    (vectors.f16) that grows by doubling; ids and metadata live in a
+    JSON sidecar (meta.json) written atomically after each add. Search
+    is one matrix product against the query followed by a top-k partial
+    sort, so no stored resume is ever re-encoded.
+    """
+
+    def __init__(self, directory=INDEX_DIR):
+        self.directory = directory
+        self.vectors_path = os.path.join(directory, "vectors.f16")
+        self.meta_path = os.path.join(directory, "meta.json")
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.RLock()
+        self._meta_mtime = None
+        self._vectors = None
+        self.dim = None
+        self.ids = []
+        self.metadata = []
+        self._positions = {}
+        self._load()
+
+    # --- persistence ---
+    def _load(self):
+        if not os.path.exists(self.meta_path):
+            return
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.dim = meta["dim"]
+        self.ids = meta["ids"]
+        self.metadata = meta["metadata"]
+        self._positions = {resume_id: i for i, resume_id in enumerate(self.ids)}
+        self._meta_mtime = os.stat(self.meta_path).st_mtime_ns
+        self._open_vectors()
+
+    def _refresh(self):
+        # Pick up rows added by other worker processes sharing the directory
+        if os.path.exists(self.meta_path) and os.stat(self.meta_path).st_mtime_ns != self._meta_mtime:
+            self._load()
+
+    def _capacity(self):
+        if self.dim is None or not os.path.exists(self.vectors_path):
+            return 0
+        return os.path.getsize(self.vectors_path) // (2 * self.dim)
+
+    def _open_vectors(self):
+        capacity = self._capacity()
+        self._vectors = (
+            np.memmap(self.vectors_path, dtype=np.float16, mode="r+", shape=(capacity, self.dim))
+            if capacity else None
+        )
+
+    def _ensure_capacity(self, rows):
+        capacity = self._capacity()
+        if rows <= capacity:
+            return
+        new_capacity = max(INITIAL_CAPACITY, capacity)
+        while new_capacity < rows:
+            new_capacity *= 2
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(new_capacity * self.dim * 2)
+        self._open_vectors()
+
+    def _save_meta(self):
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "ids": self.ids, "metadata": self.metadata}, f)
+        os.replace(tmp_path, self.meta_path)
+        self._meta_mtime = os.stat(self.meta_path).st_mtime_ns
+
+    @contextmanager
+    def _write_lock(self):
+        # Serializes writers across worker processes sharing the directory
+        with self._lock, open(os.path.join(self.directory, ".lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # --- public API ---
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, ids, embeddings, metadata=None):
+        """Insert or overwrite rows; embeddings are expected to be L2-normalized."""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if len(ids) == 0:
+            return
+        metadata = metadata or [{} for _ in ids]
+        with self._write_lock():
+            self._refresh()
+            if self.dim is None:
+                self.dim = embeddings.shape[1]
+            elif embeddings.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {embeddings.shape[1]} does not match index dimension {self.dim}")
+
+            rows = []
+            for resume_id, meta in zip(ids, metadata):
+                meta = dict(meta, indexed_at=time.time())
+                position = self._positions.get(resume_id)
+                if position is None:
+                    position = len(self.ids)
+                    self._positions[resume_id] = position
+                    self.ids.append(resume_id)
+                    self.metadata.append(meta)
+                else:
+                    self.metadata[position] = meta
+                rows.append(position)
+
+            self._ensure_capacity(len(self.ids))
+            self._vectors[rows] = embeddings.astype(np.float16)
+            self._vectors.flush()
+            self._save_meta()
+
+    def get(self, resume_id):
+        with self._lock:
+            self._refresh()
+            position = self._positions.get(resume_id)
+            if position is None:
+                return None
+            return np.asarray(self._vectors[position], dtype=np.float32)
+
+    def positions(self, resume_ids):
+        """Row of each id in matrix()/similarities(), or -1 when not indexed."""
+        with self._lock:
+            self._refresh()
+            return np.array([self._positions.get(resume_id, -1) for resume_id in resume_ids], dtype=np.int64)
+
+    def matrix(self):
+        """The float16 (len(self), dim) view of every stored vector."""
+        with self._lock:
+            self._refresh()
+            if self._vectors is None:
+                return np.zeros((0, self.dim or 0), dtype=np.float16)
+            return self._vectors[:len(self.ids)]
+
+    def _snapshot(self):
+        # Vectors, ids and metadata of one consistent moment, for a search
+        # racing with add() in this or another process
+        with self._lock:
+            self._refresh()
+            count = len(self.ids)
+            vectors = self._vectors[:count] if self._vectors is not None else np.zeros((0, self.dim or 0), dtype=np.float16)
+            return vectors, self.ids[:count], self.metadata[:count]
+
+    @staticmethod
+    def _scores(vectors, query):
+        query = np.asarray(query, dtype=np.float32)
+        scores = np.empty(len(vectors), dtype=np.float32)
+        for start in range(0, len(vectors), SEARCH_CHUNK_ROWS):
+            block = np.asarray(vectors[start:start + SEARCH_CHUNK_ROWS], dtype=np.float32)
+            scores[start:start + len(block)] = block @ query
+        return scores
+
+    def similarities(self, query):
+        """Cosine similarity of every stored resume to a normalized query vector."""
+        return self._scores(self.matrix(), query)
+
+    def search(self, query, k=10):
+        """Return up to k (id, score, metadata) tuples, best first."""
+        vectors, ids, metadata = self._snapshot()
+        scores = self._scores(vectors, query)
+        if len(scores) == 0:
+            return []
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(ids[i], float(scores[i]), metadata[i]) for i in top]
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def get_resume_index():
+    global _default_index
+    if _default_index is None:
+        with _default_index_lock:
+            if _default_index is None:
+                _default_index = ResumeIndex()
+    return _default_index
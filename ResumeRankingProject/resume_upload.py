@@ -1,30 +1,27 @@
 import os
 from fastapi import APIRouter, UploadFile, File
-import pdfplumber
+from pdf_extraction import extract_text_async
+from upload_store import UploadTooLarge, store_upload
 
 router = APIRouter()
 
 UPLOAD_FOLDER = "uploaded_resumes"
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-def extract_text_from_pdf(pdf_file):
-    with pdfplumber.open(pdf_file) as pdf:
-        text = "\n".join(page.extract_text() for page in pdf.pages if page.extract_text())
-    return text
-
 @router.post("/upload-resume")
 async def upload_resume(file: UploadFile = File(...)):
     if not file.filename.endswith(".pdf"):
         return {"error": "Only PDF files are allowed."}
 
-    file_path = os.path.join(UPLOAD_FOLDER, file.filename)
-    with open(file_path, "wb") as f:
-        f.write(await file.read())
+    try:
+        upload = await store_upload(file, UPLOAD_FOLDER)
+    except UploadTooLarge as e:
+        return {"error": str(e)}
 
-    resume_text = extract_text_from_pdf(file_path)
+    resume_text = await extract_text_async(upload.path)
 
     return {
         "filename": file.filename,
-        "saved_path": file_path,
+        "saved_path": upload.path,
         "extracted_text": resume_text
     }
\ No newline at end of file
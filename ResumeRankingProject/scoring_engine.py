@@ -0,0 +1,98 @@
+import numpy as np
+
+from embedding_cache import encode_cached, get_embedding_cache
+
+EMBED_MODEL_NAME = "paraphrase-MiniLM-L6-v2"
+
+# Fixed criterion prompts scored against every resume by the /upload-resumes handlers.
+CRITERIA_PROMPTS = {
+    "experience_score": "Experience in AI and ML",
+    "soft_skills_score": "Strong communication and collaboration",
+    "adaptability_score": "Adaptable to cross-industry roles",
+}
+
+# Column order of the score matrix returned by score_resumes
+SCORE_COLUMNS = ["skill_match"] + list(CRITERIA_PROMPTS)
+
+# scorer_name of scores from the hashed TF-IDF fallback (no encoder)
+TFIDF_SCORER = "tfidf"
+
+ENCODE_BATCH_SIZE = 64
+MAX_CACHED_JOBS = 16
+
+# Normalized JD + criterion embeddings, keyed by (model name, JD text)
+_job_embeddings = {}
+
+
+def embedding_name(embed_model):
+    # Embedding-cache namespace of a loaded encoder; exported runtimes carry their own
+    return getattr(embed_model, "cache_name", EMBED_MODEL_NAME)
+
+
+def scorer_name(embed_model):
+    # What produced a resume's criterion scores, as recorded in the feature store
+    return embedding_name(embed_model) if embed_model is not None else TFIDF_SCORER
+
+
+def _encode_batch(embed_model, texts, batch_size=ENCODE_BATCH_SIZE):
+    # One batched forward pass; unit-length rows so cosine similarity is a dot product
+    embeddings = embed_model.encode(
+        list(texts),
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+    )
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+def encode_texts(embed_model, texts, model_name=None):
+    # Texts already in the persistent embedding cache skip the encoder
+    model_name = model_name or embedding_name(embed_model)
+    return encode_cached(get_embedding_cache(), embed_model, model_name, texts, _encode_batch)
+
+
+def pair_similarity(embed_model, text1, text2, model_name=None):
+    emb1, emb2 = encode_texts(embed_model, [text1, text2], model_name)
+    return round(float(emb1 @ emb2) * 100, 2)
+
+
+def encode_job(embed_model, jd_text, model_name=None):
+    """Return the (1 + len(CRITERIA_PROMPTS), dim) query matrix for a JD, encoded once per job."""
+    model_name = model_name or embedding_name(embed_model)
+    key = (model_name, jd_text)
+    queries = _job_embeddings.get(key)
+    if queries is None:
+        queries = encode_texts(embed_model, [jd_text] + list(CRITERIA_PROMPTS.values()), model_name)
+        if len(_job_embeddings) >= MAX_CACHED_JOBS:
+            _job_embeddings.pop(next(iter(_job_embeddings)))
+        _job_embeddings[key] = queries
+    return queries
+
+
+def score_embeddings(queries, resume_embeddings):
+    scores = np.asarray(resume_embeddings, dtype=np.float32) @ queries.T
+    return np.round(scores.astype(np.float64) * 100, 2)
+
+
+def score_resumes(embed_model, jd_text, resume_texts, model_name=None, return_embeddings=False,
+                  queries=None):
+    """Score every resume against the JD and criterion prompts.
+
+    Returns an (n_resumes, len(SCORE_COLUMNS)) array of cosine similarities
+    in percent, rounded to two decimals like pair_similarity. With
+    return_embeddings=True, also returns the normalized resume embeddings.
+    queries may carry a JD's precomputed encode_job matrix.
+    """
+    if len(resume_texts) == 0:
+        scores = np.zeros((0, len(SCORE_COLUMNS)), dtype=np.float32)
+        return (scores, np.zeros((0, 0), dtype=np.float32)) if return_embeddings else scores
+    if queries is None:
+        queries = encode_job(embed_model, jd_text, model_name)
+    resumes = encode_texts(embed_model, resume_texts, model_name)
+    scores = score_embeddings(queries, resumes)
+    return (scores, resumes) if return_embeddings else scores
+
+
+def scores_to_records(scores):
+    return [dict(zip(SCORE_COLUMNS, map(float, row))) for row in scores]
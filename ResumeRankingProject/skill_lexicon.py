@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from scipy import sparse
+
+from keyword_scorer import trie_pattern
+
+# === Configuration ===
+SKILL_TAXONOMY_PATH = os.getenv("SKILL_TAXONOMY_PATH", "skills_taxonomy.json")
+SKILL_CACHE_SIZE = int(os.getenv("SKILL_CACHE_SIZE", "50000"))  # texts whose skills are memoized
+
+
+def normalize(text):
+    # Hyphens, underscores and runs of whitespace are one separator, so
+    # "problem-solving", "problem solving" and "problem\nsolving" all match
+    return " ".join(text.lower().replace("-", " ").replace("_", " ").split())
+
+
+class SkillLexicon:
+    """Skill taxonomy compiled into one regex and a skill -> column index.
+
+    taxonomy maps each canonical skill to the phrases that indicate it
+    (synonyms, abbreviations, multi-word phrases). A text is scanned once
+    by a trie-shaped regex of every phrase and becomes a binary row over
+    the canonical skills; a batch of resumes is a sparse CSR matrix, so
+    scoring them all against a JD is one sparse matrix-vector product.
+    The skills of recently seen texts are memoized by content hash, so
+    matching the same pool against another JD skips the scan entirely.
+    """
+
+    def __init__(self, taxonomy):
+        self.skills = sorted(taxonomy)
+        self._skill_names = np.array(self.skills, dtype=object)
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.columns = {skill: i for i, skill in enumerate(self.skills)}
+        self._phrase_columns = {}
+        for skill, phrases in taxonomy.items():
+            for phrase in phrases:
+                phrase = normalize(phrase).strip()
+                if phrase:
+                    self._phrase_columns.setdefault(phrase, self.columns[skill])
+        # A phrase must not be glued to a word or to a symbol that is part of
+        # another skill name ("java" in "javascript", "c" in "c++")
+        self._pattern = re.compile(
+            r"(?<![\w+#.])(" + trie_pattern(sorted(self._phrase_columns, key=len, reverse=True)) + r")(?![\w+#])"
+        ) if self._phrase_columns else None
+
+    def __len__(self):
+        return len(self.skills)
+
+    def skill_columns(self, text):
+        """Sorted tuple of the columns of every skill found in text."""
+        if self._pattern is None:
+            return ()
+        key = hashlib.sha1(text.encode("utf-8")).digest()
+        with self._cache_lock:
+            columns = self._cache.get(key)
+            if columns is not None:
+                self._cache.move_to_end(key)
+                return columns
+        columns = tuple(sorted({self._phrase_columns[match] for match in self._pattern.findall(normalize(text))}))
+        with self._cache_lock:
+            self._cache[key] = columns
+            if len(self._cache) > SKILL_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return columns
+
+    def extract(self, text):
+        return [self.skills[column] for column in self.skill_columns(text)]
+
+    def vectorize(self, texts):
+        """Binary (len(texts), len(self)) CSR matrix of the skills found in each text."""
+        indptr = [0]
+        indices = []
+        for text in texts:
+            indices.extend(self.skill_columns(text))
+            indptr.append(len(indices))
+        data = np.ones(len(indices), dtype=np.float32)
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, len(self)))
+
+    def match(self, jd_text, resume_texts, resume_matrix=None):
+        """Score resumes by the share of the JD's skills they contain.
+
+        Returns one {"skill_score", "matched_skills", "missing_skills"}
+        dict per resume; resume_matrix can be passed when the resumes were
+        already vectorized.
+        """
+        jd_vector = self.vectorize([jd_text])
+        resumes = resume_matrix if resume_matrix is not None else self.vectorize(resume_texts)
+        jd_skills = jd_vector.indices
+        if len(jd_skills) == 0:
+            return [{"skill_score": 0.0, "matched_skills": [], "missing_skills": []} for _ in range(resumes.shape[0])]
+
+        # One sparse product for every resume's matched-skill count; the
+        # element-wise product and its complement say which skills those are
+        matched_counts = (resumes @ jd_vector.T).toarray().ravel().astype(np.float64)
+        scores = np.round(matched_counts / len(jd_skills) * 100, 2).tolist()
+        matched = resumes.multiply(jd_vector).tocsr()
+        missing = (sparse.csr_matrix(np.ones((resumes.shape[0], 1), dtype=np.float32)) @ jd_vector - matched).tocsr()
+        missing.eliminate_zeros()
+        matched.sort_indices()
+        missing.sort_indices()
+
+        names = self._skill_names
+        return [
+            {
+                "skill_score": scores[i],
+                "matched_skills": names[matched.indices[matched.indptr[i]:matched.indptr[i + 1]]].tolist(),
+                "missing_skills": names[missing.indices[missing.indptr[i]:missing.indptr[i + 1]]].tolist(),
+            }
+            for i in range(resumes.shape[0])
+        ]
+
+
+def load_taxonomy(path=SKILL_TAXONOMY_PATH):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error loading skill taxonomy {path}: {e}")
+        return {}
+
+
+# Compiled once at startup and shared by every caller
+skill_lexicon = SkillLexicon(load_taxonomy())
@@ -1,10 +1,52 @@
-from fastapi import APIRouter
+import threading
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from jd_registry import DEFAULT_JD_ID, JDRegistry
 from resume_data import ResumeData
+from skill_lexicon import skill_lexicon
 
 router = APIRouter()
 
+_jd_registry = None
+_jd_registry_lock = threading.Lock()
+
+
+def default_job_description():
+    # Text of the JD uploaded through /upload-jd, for requests that don't carry one
+    global _jd_registry
+    if _jd_registry is None:
+        with _jd_registry_lock:
+            if _jd_registry is None:
+                _jd_registry = JDRegistry()
+    jd = _jd_registry.get(DEFAULT_JD_ID)
+    return jd.text if jd is not None else None
+
+
+class SkillMatchRequest(ResumeData):
+    # Optional, so plain ResumeData payloads keep working against the uploaded JD
+    job_description: Optional[str] = None
+
+class SkillMatchBatchRequest(BaseModel):
+    job_description: str
+    resumes: List[ResumeData]
+
 @router.post("/match-skills")
-async def match_skills(resume: ResumeData):
-    # Placeholder AI logic (replace with actual NLP model)
-    score = 85  # Example score
-    return {"filename": resume.filename, "skill_score": score}
\ No newline at end of file
+async def match_skills(resume: SkillMatchRequest):
+    # Share of the JD's taxonomy skills found in the resume, plus which ones
+    job_description = resume.job_description
+    if job_description is None:
+        job_description = await run_in_threadpool(default_job_description)
+        if job_description is None:
+            raise HTTPException(status_code=400, detail="No job_description given and no job description uploaded.")
+    match, = await run_in_threadpool(skill_lexicon.match, job_description, [resume.text])
+    return dict(match, filename=resume.filename)
+
+@router.post("/match-skills/batch")
+async def match_skills_batch(request: SkillMatchBatchRequest):
+    # Every resume is scored against the JD with one sparse matrix product
+    matches = await run_in_threadpool(
+        skill_lexicon.match, request.job_description, [resume.text for resume in request.resumes]
+    )
+    return [dict(match, filename=resume.filename) for resume, match in zip(request.resumes, matches)]
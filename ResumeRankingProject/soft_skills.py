@@ -1,12 +1,12 @@
 from fastapi import APIRouter
+from keyword_scorer import keyword_scorer
 from resume_data import ResumeData
 
 router = APIRouter()
 
 def evaluate_soft_skills(text):
-    soft_skills = ["communication", "teamwork", "leadership", "problem-solving", "adaptability", "collaboration"]
-    score = sum(text.lower().count(skill) for skill in soft_skills) * 10  # Example scoring logic
-    return min(score, 100)
+    # Keywords come from scoring_keywords.json; 10 points per occurrence, capped at 100
+    return keyword_scorer.score(text)["soft_skill_score"]
 
 @router.post("/evaluate-soft-skills")
 async def evaluate_soft_skills_api(resume: ResumeData):
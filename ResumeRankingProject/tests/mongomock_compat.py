@@ -0,0 +1,14 @@
+"""mongomock shims for running db.py against "mongomock://" in tests and benchmarks."""
+import mongomock
+
+
+def patch_bulk_sort():
+    # pymongo >= 4.11 passes sort= to the bulk builder, which mongomock 4.x predates
+    builder = mongomock.collection.BulkOperationBuilder
+    if getattr(builder, "_accepts_sort", False):
+        return
+    for name in ("add_update", "add_replace"):
+        def patched(self, *args, _original=getattr(builder, name), sort=None, **kwargs):
+            return _original(self, *args, **kwargs)
+        setattr(builder, name, patched)
+    builder._accepts_sort = True
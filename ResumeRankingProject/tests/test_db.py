@@ -0,0 +1,73 @@
+import pytest
+
+import db
+from tests.mongomock_compat import patch_bulk_sort
+
+
+@pytest.fixture
+def database():
+    patch_bulk_sort()
+    client = db.create_client("mongomock://")
+    database = client["resume_ranking_test"]
+    db.ensure_indexes(database)
+    yield database
+    client.drop_database("resume_ranking_test")
+
+
+def record(filename, score, resume_id=None):
+    result = {
+        "resume_filename": filename,
+        "final_ats_score": score,
+        "bilstm_label": "Matched" if score >= 35 else "Not Matched",
+    }
+    if resume_id is not None:
+        result["resume_id"] = resume_id
+    return result
+
+
+def test_ensure_indexes(database):
+    db.ensure_indexes(database)  # idempotent
+    job_keys = [index["key"] for index in database[db.JOBS_COLLECTION].index_information().values()]
+    assert [("job_id", 1)] in job_keys
+    resume_keys = [index["key"] for index in database[db.RESUMES_COLLECTION].index_information().values()]
+    assert [("content_hash", 1)] in resume_keys
+    score_keys = [index["key"] for index in database[db.SCORES_COLLECTION].index_information().values()]
+    assert [("job_id", 1), ("final_ats_score", -1)] in score_keys
+    assert [("resume_id", 1)] in score_keys
+
+
+def test_get_client_creates_indexes(monkeypatch):
+    patch_bulk_sort()
+    monkeypatch.setattr(db, "MONGO_URI", "mongomock://")
+    monkeypatch.setattr(db, "_client", None)
+    monkeypatch.setattr(db, "_client_pid", None)
+    assert db.get_client() is db.get_client()
+    unique = [index for index in db.get_db()[db.JOBS_COLLECTION].index_information().values() if index.get("unique")]
+    assert [index["key"] for index in unique] == [[("job_id", 1)]]
+
+
+def test_save_resumes_upserts_by_id(database):
+    result = db.save_resumes(["a", "b"], ["a.pdf", "b.pdf"], ["python", "java"], [{"experience_score": 40.0}, {}],
+                             database=database)
+    assert result == {"upserted": 2, "modified": 0}
+    result = db.save_resumes(["a"], ["renamed.pdf"], ["python"], database=database)
+    assert result == {"upserted": 0, "modified": 1}
+
+    document = database[db.RESUMES_COLLECTION].find_one({"_id": "a"})
+    assert document["resume_filename"] == "renamed.pdf"
+    assert document["experience_score"] == 40.0
+    assert db.find_resumes_by_hash([db.content_hash("java")], database=database)[0]["_id"] == "b"
+
+
+def test_save_scores_and_top_scores(database, monkeypatch):
+    monkeypatch.setattr(db, "MONGO_WRITE_BATCH_SIZE", 2)  # several bulk_write batches
+    records = [record("a.pdf", 20.0, "a"), record("b.pdf", 80.0, "b"), record("c.pdf", 50.0)]
+    assert db.save_scores("job-1", records, database=database) == {"upserted": 3, "modified": 0}
+    db.save_scores("job-2", [record("d.pdf", 99.0)], database=database)
+    assert db.save_scores("job-1", [record("a.pdf", 90.0, "a")], database=database) == {"upserted": 0, "modified": 1}
+
+    top = db.top_scores("job-1", limit=2, database=database)
+    assert [(score["resume_id"], score["final_ats_score"]) for score in top] == [("a", 90.0), ("b", 80.0)]
+    assert all("_id" not in score and score["job_id"] == "job-1" for score in top)
+    # Records without a resume_id are keyed by filename
+    assert [score["resume_id"] for score in db.top_scores("job-1", database=database)][-1] == "c.pdf"
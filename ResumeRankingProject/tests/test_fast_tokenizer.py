@@ -0,0 +1,71 @@
+import random
+
+import numpy as np
+import pytest
+
+from bench_tokenizer import LAYOUTS, keras_backend, make_texts
+from fast_tokenizer import FastTokenizer, get_fast_tokenizer
+
+# Keras when TensorFlow is installed, otherwise bench_tokenizer's verbatim port
+Tokenizer, pad_sequences, BACKEND = keras_backend()
+
+
+@pytest.fixture(scope="module")
+def texts():
+    random.seed(0)
+    # Short texts plus ones far longer than max_len, which take the suffix scan
+    return make_texts(150, 60) + make_texts(20, 3000) + ["Python, C++ & node.js", "R&D\tmachine_learning (AWS)"]
+
+
+def fitted(texts, num_words, oov_token):
+    tokenizer = Tokenizer(num_words=num_words, oov_token=oov_token)
+    tokenizer.fit_on_texts(texts[::2])
+    return tokenizer
+
+
+@pytest.mark.parametrize("oov_token", ["<OOV>", None])
+@pytest.mark.parametrize("num_words", [None, 500])
+@pytest.mark.parametrize("layout", sorted(LAYOUTS))
+@pytest.mark.parametrize("truncating", ["pre", "post"])
+def test_encode_matches_keras(texts, oov_token, num_words, layout, truncating):
+    tokenizer = fitted(texts, num_words, oov_token)
+    max_len, padding = LAYOUTS[layout]
+
+    expected = pad_sequences(tokenizer.texts_to_sequences(texts), maxlen=max_len, padding=padding, truncating=truncating)
+    actual = FastTokenizer.from_keras(tokenizer).encode(texts, max_len, padding, truncating)
+
+    assert actual.dtype == np.int32
+    np.testing.assert_array_equal(actual, np.asarray(expected), err_msg=f"differs from {BACKEND}")
+
+
+@pytest.mark.parametrize("oov_token", ["<OOV>", None])
+def test_sequence_matches_texts_to_sequences(texts, oov_token):
+    tokenizer = fitted(texts, 500, oov_token)
+    fast = FastTokenizer.from_keras(tokenizer)
+    for text, expected in zip(texts, tokenizer.texts_to_sequences(texts)):
+        assert fast.sequence(text) == expected
+        if oov_token is not None:
+            assert fast.sequence(text, last=7) == expected[-7:]
+
+
+def test_encode_without_max_len_pads_to_longest(texts):
+    tokenizer = fitted(texts, None, "<OOV>")
+    sample = texts[:10] + [""]
+    sequences = tokenizer.texts_to_sequences(sample)
+    expected = pad_sequences(sequences, maxlen=max(map(len, sequences)), padding="post")
+    np.testing.assert_array_equal(FastTokenizer.from_keras(tokenizer).encode(sample, None, "post"), expected)
+
+
+def test_empty_batch_and_invalid_padding(texts):
+    fast = FastTokenizer.from_keras(fitted(texts, None, "<OOV>"))
+    assert fast.encode([], 100).shape == (0, 100)
+    with pytest.raises(ValueError):
+        fast.encode(texts[:1], 100, padding="middle")
+
+
+def test_get_fast_tokenizer_compiles_once_and_skips_char_level(texts):
+    tokenizer = fitted(texts, None, "<OOV>")
+    assert get_fast_tokenizer(tokenizer) is get_fast_tokenizer(tokenizer)
+    char_level = fitted(texts, None, "<OOV>")
+    char_level.char_level = True
+    assert get_fast_tokenizer(char_level) is None
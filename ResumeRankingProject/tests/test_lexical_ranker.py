@@ -0,0 +1,109 @@
+import math
+
+import numpy as np
+import pytest
+
+from lexical_ranker import (
+    TfidfEngine, bm25_scores, lexical_scores, select_candidates, term_counts, tfidf_engine, tokenize,
+)
+
+JD = "Senior Python engineer with Django, PostgreSQL and AWS experience"
+RESUMES = [
+    "Python developer: Django, PostgreSQL, AWS. Five years building Django services in Python.",
+    "Java engineer with Spring and Oracle experience",
+    "Chef with a passion for pastry and the kitchen",
+    "Sales manager who once automated weekly reports with a Python script",
+]
+
+
+def test_tokenize_keeps_symbols_and_non_ascii():
+    assert tokenize("C++, C# and Résumé/node.js") == ["c++", "c#", "and", "résumé", "node", "js"]
+
+
+def test_term_counts_count_repeated_terms_per_row():
+    counts = term_counts(["python python java", "", "Python"])
+    assert counts.shape[0] == 3
+    assert sorted(counts[0].data) == [1.0, 2.0]
+    assert counts[1].nnz == 0
+    assert counts[2].indices.tolist() == counts[0].indices[counts[0].data == 2].tolist()
+
+
+def test_tfidf_ranks_relevant_resumes_first():
+    scores = TfidfEngine([JD]).similarities(RESUMES)[:, 0]
+    assert scores.shape == (len(RESUMES),)
+    assert np.all((scores >= 0) & (scores <= 1 + 1e-9))
+    assert np.argmax(scores) == 0
+    assert scores[1] > 0 and scores[3] > 0
+    assert scores[2] == pytest.approx(0.0)
+
+
+def test_tfidf_score_does_not_depend_on_the_batch():
+    engine = TfidfEngine([JD, "Strong communication"])
+    together = engine.similarities(RESUMES)
+    alone = np.vstack([engine.similarities([text]) for text in RESUMES])
+    np.testing.assert_allclose(together, alone)
+    assert engine.similarities([]).shape == (0, 2)
+
+
+def test_tfidf_identical_text_scores_one_and_stop_words_weigh_nothing():
+    engine = TfidfEngine([JD])
+    assert engine.similarities([JD])[0, 0] == pytest.approx(1.0)
+    assert engine.similarities(["the and with of to"])[0, 0] == 0.0
+
+
+def test_tfidf_engine_is_cached_per_query_set():
+    assert tfidf_engine([JD, "x"]) is tfidf_engine([JD, "x"])
+    assert tfidf_engine([JD, "x"]) is not tfidf_engine([JD, "y"])
+
+
+def test_bm25_orders_by_relevance_and_handles_empty_input():
+    scores = bm25_scores(JD, RESUMES)
+    assert scores[0] > max(scores[1], scores[3])
+    assert scores[1] > 0 and scores[3] > 0
+    assert scores[2] == 0.0
+    assert bm25_scores("", RESUMES).tolist() == [0.0] * len(RESUMES)
+    assert bm25_scores("the and", RESUMES).tolist() == [0.0] * len(RESUMES)
+    assert len(bm25_scores(JD, [])) == 0
+
+
+def test_bm25_matches_reference_formula():
+    texts = ["python python aws", "aws", "java"]
+    scores = bm25_scores("python aws", texts, k1=1.2, b=0.75)
+    lengths = [3, 1, 1]
+    average = sum(lengths) / len(lengths)
+
+    def term(tf, df, length):
+        idf = math.log1p((len(texts) - df + 0.5) / (df + 0.5))
+        return idf * tf * 2.2 / (tf + 1.2 * (1 - 0.75 + 0.75 * length / average))
+
+    expected = [term(2, 1, 3) + term(1, 2, 3), term(1, 2, 1), 0.0]
+    np.testing.assert_allclose(scores, expected)
+
+
+def test_lexical_scores_rescale_to_best():
+    scores = lexical_scores(JD, RESUMES)
+    assert scores.max() == 100.0
+    assert scores[2] == 0.0
+    assert lexical_scores(JD, ["nothing relevant"]).tolist() == [0.0]
+
+
+def test_select_candidates_keeps_top_fraction_with_floor():
+    scores = np.arange(100, dtype=float)
+    keep = select_candidates(scores, top_fraction=0.1, min_candidates=5)
+    assert keep.sum() == 10
+    assert keep[90:].all()
+
+    keep = select_candidates(scores, top_fraction=0.01, min_candidates=5)
+    assert np.flatnonzero(keep).tolist() == [95, 96, 97, 98, 99]
+
+
+def test_select_candidates_breaks_ties_in_upload_order():
+    keep = select_candidates([5, 7, 7, 7, 1], top_fraction=0, min_candidates=2)
+    assert keep.tolist() == [False, True, True, False, False]
+
+
+def test_select_candidates_score_cutoff_adds_to_budget():
+    scores = [90, 80, 70, 60, 10]
+    keep = select_candidates(scores, top_fraction=0, min_candidates=1, min_score=65)
+    assert keep.tolist() == [True, True, True, False, False]
+    assert select_candidates([], min_candidates=3).tolist() == []
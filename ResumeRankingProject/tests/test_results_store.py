@@ -0,0 +1,70 @@
+import pytest
+
+from results_store import ResultsStore, decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultsStore(str(tmp_path / "results.sqlite3"))
+
+
+def record(resume_id, score, label="Matched"):
+    return {
+        "resume_id": resume_id,
+        "resume_filename": f"{resume_id}.pdf",
+        "final_ats_score": score,
+        "bilstm_label": label,
+    }
+
+
+def page_through(store, jd_id, limit, **filters):
+    pages = []
+    cursor = None
+    while True:
+        records, cursor = store.query(jd_id, limit, cursor, **filters)
+        pages.append([r["resume_filename"] for r in records])
+        if cursor is None:
+            return pages
+
+
+def test_paging_with_tied_scores_visits_every_row_once(store):
+    # Ties straddle every page boundary; resume_id breaks them
+    scores = {"e": 50.0, "a": 50.0, "d": 50.0, "c": 70.0, "b": 50.0, "f": 20.0, "g": 50.0}
+    store.upsert("jd", [record(resume_id, score) for resume_id, score in scores.items()])
+
+    pages = page_through(store, "jd", limit=2)
+
+    assert pages == [["c.pdf", "a.pdf"], ["b.pdf", "d.pdf"], ["e.pdf", "g.pdf"], ["f.pdf"]]
+    everything, cursor = store.query("jd")
+    assert cursor is None
+    assert [r["resume_filename"] for r in everything] == [name for page in pages for name in page]
+
+
+def test_exact_last_page_has_no_cursor(store):
+    store.upsert("jd", [record(resume_id, 10.0) for resume_id in "abcd"])
+    assert page_through(store, "jd", limit=2) == [["a.pdf", "b.pdf"], ["c.pdf", "d.pdf"]]
+
+
+def test_paging_respects_filters_and_jd(store):
+    store.upsert("jd", [
+        record("a", 80.0), record("b", 60.0, "Not Matched"), record("c", 60.0), record("d", 60.0), record("e", 30.0),
+    ])
+    store.upsert("other", [record("z", 60.0)])
+
+    assert page_through(store, "jd", limit=1, min_score=40, max_score=70, label="Matched") == [["c.pdf"], ["d.pdf"]]
+
+
+def test_cursor_round_trip_and_invalid_cursor(store):
+    assert decode_cursor(encode_cursor(50.0, "abc.pdf")) == (50.0, "abc.pdf")
+    with pytest.raises(ValueError):
+        store.query("jd", 2, cursor="not-a-cursor")
+
+
+def test_upsert_replaces_rows_and_keeps_extra_keys(store):
+    store.upsert("jd", [dict(record("a", 40.0), decided_by="embedding")])
+    store.upsert("jd", [dict(record("a", 90.0), decided_by="bilstm")])
+
+    records, _ = store.query("jd")
+    assert store.count("jd") == 1
+    assert records[0]["final_ats_score"] == 90.0
+    assert records[0]["decided_by"] == "bilstm"
@@ -0,0 +1,139 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+# === Configuration ===
+TFLITE_NUM_THREADS = int(os.getenv("TFLITE_NUM_THREADS", "1"))
+TFLITE_SUFFIX = ".tflite"
+
+# none: float32 weights; float16: half-size weights; int8: dynamic-range
+# quantization (int8 weights, float activations, no calibration data needed)
+QUANTIZATIONS = ("none", "float16", "int8")
+
+
+def exported_path(keras_path):
+    """Where export_bilstm.py writes the TFLite model for a Keras .h5 file."""
+    return os.path.splitext(keras_path)[0] + TFLITE_SUFFIX
+
+
+def output_names_path(tflite_path):
+    """Sidecar listing the Keras output names of an exported model, in model.outputs order."""
+    return os.path.splitext(tflite_path)[0] + ".outputs.json"
+
+
+def save_tflite_model(path, content, output_names):
+    with open(path, "wb") as f:
+        f.write(content)
+    with open(output_names_path(path), "w", encoding="utf-8") as f:
+        json.dump(list(output_names), f)
+
+
+def read_output_names(tflite_path):
+    try:
+        with open(output_names_path(tflite_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def interpreter_class():
+    # Prefer the standalone runtimes, which do not import TensorFlow at all
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    try:
+        from tflite_runtime.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    import tensorflow as tf
+    return tf.lite.Interpreter
+
+
+class TFLiteModel:
+    """TFLite interpreter behind the subset of the Keras Model API used for inference.
+
+    predict(x, batch_size, verbose) and output_shape behave like the Keras
+    model the file was exported from, so bilstm_inference uses either one
+    unchanged. Outputs are read through the model's signature, whose keys
+    are the Keras output names; multi-output models return them in
+    output_names order (by default the sidecar save_tflite_model writes),
+    i.e. the order of model.outputs.
+    """
+
+    def __init__(self, model_path=None, model_content=None, num_threads=TFLITE_NUM_THREADS, output_names=None):
+        self.model_path = model_path
+        self._interpreter = interpreter_class()(
+            model_path=model_path, model_content=model_content, num_threads=num_threads
+        )
+        # Resolves every op now, so a model needing the Flex delegate fails to
+        # load (and the registry falls back) rather than on its first predict
+        self._interpreter.allocate_tensors()
+        # The signature runner resizes and reallocates tensors for each batch shape
+        self._runner = self._interpreter.get_signature_runner()
+        inputs = self._runner.get_input_details()
+        self._input_name = next(iter(inputs))
+        self._input_dtype = inputs[self._input_name]["dtype"]
+        outputs = self._runner.get_output_details()
+        if output_names is None and model_path is not None:
+            output_names = read_output_names(model_path)
+        if output_names is None:
+            if len(outputs) > 1:
+                raise ValueError(
+                    f"{model_path or 'TFLite model'} has {len(outputs)} outputs but no output names; "
+                    "re-export it with export_bilstm.py"
+                )
+            output_names = list(outputs)
+        missing = [name for name in output_names if name not in outputs]
+        if missing:
+            raise ValueError(f"Outputs {', '.join(missing)} not in the model signature ({', '.join(outputs)})")
+        self.output_names = list(output_names)
+        # One interpreter holds one set of tensors; calls are serialized
+        self._lock = threading.Lock()
+        shapes = [(None,) + tuple(int(dim) for dim in outputs[name]["shape"][1:]) for name in self.output_names]
+        self.output_shape = shapes[0] if len(shapes) == 1 else shapes
+
+    def predict(self, x, batch_size=32, verbose=0):
+        x = np.asarray(x, dtype=self._input_dtype)
+        shapes = self.output_shape if isinstance(self.output_shape, list) else [self.output_shape]
+        if len(x) == 0:
+            outputs = [np.zeros((0,) + shape[1:], dtype=np.float32) for shape in shapes]
+            return outputs[0] if len(outputs) == 1 else outputs
+        results = [[] for _ in self.output_names]
+        with self._lock:
+            for start in range(0, len(x), batch_size):
+                named = self._runner(**{self._input_name: x[start:start + batch_size]})
+                for result, name in zip(results, self.output_names):
+                    result.append(named[name])
+        outputs = [np.concatenate(result) for result in results]
+        return outputs[0] if len(outputs) == 1 else outputs
+
+
+def load_tflite_model(path):
+    return TFLiteModel(model_path=path)
+
+
+def convert(model, quantization="none"):
+    """Serialized TFLite flatbuffer for a loaded Keras model (needs TensorFlow)."""
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"quantization must be one of {', '.join(QUANTIZATIONS)}")
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantization != "none":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    try:
+        return converter.convert()
+    except Exception as e:
+        # Builtin ops cover fused (Bi)LSTMs; anything else needs the Flex
+        # delegate, which only the full TensorFlow interpreter provides
+        print(f"Builtin-only TFLite conversion failed ({e}); retrying with select TF ops")
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS, tf.lite.OpsSet.SELECT_TF_OPS]
+        converter._experimental_lower_tensor_list_ops = False
+        return converter.convert()
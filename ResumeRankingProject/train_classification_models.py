@@ -1,18 +1,24 @@
 import json
 import os
 import re
-import numpy as np
 from datetime import datetime
 from sklearn.preprocessing import LabelEncoder
 from sklearn.model_selection import train_test_split
 from tensorflow.keras.preprocessing.text import Tokenizer
 from tensorflow.keras.preprocessing.sequence import pad_sequences
 from tensorflow.keras.utils import to_categorical
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Embedding, Bidirectional, LSTM, Dense
+from tensorflow.keras.models import Model, Sequential
+from tensorflow.keras.layers import Input, Embedding, Bidirectional, LSTM, Dense
 
 import pickle
 
+# "separate": domain_model.h5 + experience_model.h5
+# "multitask": profile_model.h5, one shared Embedding+BiLSTM trunk with a head per task
+# "both": all three
+TRAIN_MODE = os.getenv("CLASSIFIER_TRAIN_MODE", "separate")
+if TRAIN_MODE not in ("separate", "multitask", "both"):
+    raise SystemExit(f"Unknown CLASSIFIER_TRAIN_MODE {TRAIN_MODE!r}: use separate, multitask or both")
+
 # === Load dataset ===
 with open("resume_dataset.json", "r", encoding="utf-8") as f:
     data = json.load(f)
@@ -107,21 +113,53 @@ def build_model(output_dim):
     model.compile(loss='categorical_crossentropy', optimizer='adam', metrics=['accuracy'])
     return model
 
-# === Train Domain Model ===
-domain_model = build_model(y_domain.shape[1])
-domain_model.fit(X_train, y_domain_train, validation_data=(X_test, y_domain_test), epochs=10, batch_size=8)
-
-# === Train Experience Level Model ===
-experience_model = build_model(y_experience.shape[1])
-experience_model.fit(X_train, y_experience_train, validation_data=(X_test, y_experience_test), epochs=10, batch_size=8)
+def build_multitask_model(domain_dim, experience_dim):
+    # Same layers as build_model, but the embedding and BiLSTM are computed once
+    # and feed both heads; output order [domain, experience] is what
+    # resume_classifier.predict_profiles expects
+    inputs = Input(shape=(MAX_SEQ_LENGTH,))
+    trunk = Embedding(input_dim=MAX_NUM_WORDS, output_dim=128)(inputs)
+    trunk = Bidirectional(LSTM(64))(trunk)
+    domain = Dense(64, activation='relu')(trunk)
+    domain = Dense(domain_dim, activation='softmax', name='domain')(domain)
+    experience = Dense(64, activation='relu')(trunk)
+    experience = Dense(experience_dim, activation='softmax', name='experience')(experience)
+    model = Model(inputs=inputs, outputs=[domain, experience])
+    model.compile(
+        loss={'domain': 'categorical_crossentropy', 'experience': 'categorical_crossentropy'},
+        optimizer='adam',
+        metrics={'domain': ['accuracy'], 'experience': ['accuracy']},
+    )
+    return model
 
-# === Save models and encoders ===
 os.makedirs("models", exist_ok=True)
 os.makedirs("encoders", exist_ok=True)
 
-# Save models
-domain_model.save("models/domain_model.h5")
-experience_model.save("models/experience_model.h5")
+if TRAIN_MODE in ("separate", "both"):
+    # === Train Domain Model ===
+    domain_model = build_model(y_domain.shape[1])
+    domain_model.fit(X_train, y_domain_train, validation_data=(X_test, y_domain_test), epochs=10, batch_size=8)
+
+    # === Train Experience Level Model ===
+    experience_model = build_model(y_experience.shape[1])
+    experience_model.fit(X_train, y_experience_train, validation_data=(X_test, y_experience_test), epochs=10, batch_size=8)
+
+    domain_model.save("models/domain_model.h5")
+    experience_model.save("models/experience_model.h5")
+
+if TRAIN_MODE in ("multitask", "both"):
+    # === Train Multi-task Model (both splits use the same rows) ===
+    profile_model = build_multitask_model(y_domain.shape[1], y_experience.shape[1])
+    profile_model.fit(
+        X_train,
+        {'domain': y_domain_train, 'experience': y_experience_train},
+        validation_data=(X_test, {'domain': y_domain_test, 'experience': y_experience_test}),
+        epochs=10,
+        batch_size=8,
+    )
+    profile_model.save("models/profile_model.h5")
+
+# === Save encoders ===
 
 # Save encoders with pickle
 with open("encoders/domain_encoder.pkl", "wb") as f:
@@ -133,4 +171,4 @@ with open("encoders/experience_encoder.pkl", "wb") as f:
 with open("encoders/tokenizer.pkl", "wb") as f:
     pickle.dump(tokenizer, f)
 
-print("✅ Models and encoders saved with updated experience calculation!")
+print(f"✅ Models ({TRAIN_MODE}) and encoders saved with updated experience calculation!")
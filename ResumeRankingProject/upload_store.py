@@ -0,0 +1,93 @@
+import contextlib
+import hashlib
+import os
+import uuid
+
+# === Configuration ===
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(1 << 20)))  # read/hashed/written per step
+MAX_FILE_BYTES = int(os.getenv("UPLOAD_MAX_FILE_BYTES", str(10 << 20)))
+MAX_REQUEST_BYTES = int(os.getenv("UPLOAD_MAX_REQUEST_BYTES", str(256 << 20)))  # all files of one request
+
+
+class UploadTooLarge(Exception):
+    """An upload went over its per-file or per-request size limit."""
+
+
+class StoredUpload:
+    """One uploaded file, stored under the hash of its content.
+
+    resume_id is "<sha256><extension>", which is also the file's name in
+    its directory, so identical content uploaded under different names is
+    stored (and scored) once, and same-named files never overwrite each
+    other.
+    """
+
+    def __init__(self, filename, path, sha256, size):
+        self.filename = filename
+        self.path = path
+        self.sha256 = sha256
+        self.size = size
+
+    @property
+    def resume_id(self):
+        return os.path.basename(self.path)
+
+
+class RequestBudget:
+    """Bytes still allowed for the rest of a request's files."""
+
+    def __init__(self, max_bytes=MAX_REQUEST_BYTES):
+        self.max_bytes = max_bytes
+        self.used = 0
+
+    def take(self, size):
+        self.used += size
+        if self.used > self.max_bytes:
+            raise UploadTooLarge(f"Upload exceeds the {self.max_bytes}-byte request limit")
+
+
+def extension(filename):
+    return os.path.splitext(filename or "")[1].lower()
+
+
+async def stream_upload(file, path, max_bytes=MAX_FILE_BYTES, budget=None):
+    """Copy an UploadFile to path in fixed-size chunks; returns (sha256, size).
+
+    Only one chunk is held in memory at a time, and the hash is computed
+    on the fly. Over a limit, the partial file is removed and
+    UploadTooLarge is raised.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(path, "wb") as f:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"{file.filename} exceeds the {max_bytes}-byte file limit")
+                if budget is not None:
+                    budget.take(len(chunk))
+                digest.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        # open() itself may have failed, leaving nothing to remove
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+        raise
+    return digest.hexdigest(), size
+
+
+async def store_upload(file, directory, max_bytes=MAX_FILE_BYTES, budget=None):
+    """Stream an UploadFile into directory under its content hash."""
+    temp_path = os.path.join(directory, f".upload_{uuid.uuid4().hex}")
+    sha256, size = await stream_upload(file, temp_path, max_bytes, budget)
+    path = os.path.join(directory, sha256 + extension(file.filename))
+    if os.path.exists(path):
+        # Already stored: same bytes, nothing to write
+        os.remove(temp_path)
+    else:
+        os.replace(temp_path, path)
+    return StoredUpload(file.filename, path, sha256, size)